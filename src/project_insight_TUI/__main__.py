@@ -14,6 +14,12 @@ from .elements.send_sms_confirmation_screen import SendSMSConfirmationScreen  #
 from .elements.update_env_file_screen import UpdateEnvFileScreen  # Import the UpdateEnvFileScreen class from update_env_file_screen.py
 from .elements.generate_report_screen import GenerateReportScreen  # Import the GenerateReportScreen class from generate_report_screen.py
 from .elements.check_individual_compliance_screen import CheckIndividualComplianceScreen  # Import the CheckIndividualComplianceScreen class from check_individual_compliance_screen.py
+from .elements.bulk_tools_screen import BulkToolsScreen  # Import the BulkToolsScreen class from bulk_tools_screen.py
+from .methods.roster_mirror_methods import get_roster_mirror  # Local participant roster mirror
+from .methods.sms_queue_methods import get_sms_queue  # Durable outbound SMS queue
+from .methods.sms_scheduler_methods import get_sms_scheduler  # Send-later SMS scheduler
+from .methods.sns_topic_methods import topic_mode_enabled, get_schedule_topics  # Optional per-schedule SNS topics
+from .methods.async_methods import shutdown_executor  # Thread pool behind the async data-access functions
 
 class MainGUI(App):
     TITLE = "Project Insight GUI"
@@ -40,7 +46,40 @@ class MainGUI(App):
         self.install_screen(SendSMSScreen(), name = "send_test_sms")
         self.install_screen(SendSMSConfirmationScreen(participant_id=None, custom_message=None, premade_button_text=None, phone_number=None), name = "send_sms_confirmation")
         
+        self.install_screen(BulkToolsScreen(), name = "bulk_tools")
+        
         self.push_screen("menu")
+
+        # Load the local participant roster and keep it refreshed in the background
+        try:
+            get_roster_mirror().start()
+        except Exception as e:
+            print(f"Could not start roster mirror: {e}")
+
+        # Resume any SMS left in the outbound queue
+        try:
+            get_sms_queue().start()
+        except Exception as e:
+            print(f"Could not start SMS queue: {e}")
+
+        # Pick up send-later messages (anything that came due while the app was closed goes out now)
+        try:
+            get_sms_scheduler().start()
+        except Exception as e:
+            print(f"Could not start SMS scheduler: {e}")
+
+        # Keep the per-schedule SNS topics in sync with the roster (only if turned on in .env)
+        try:
+            if topic_mode_enabled():
+                get_schedule_topics().start()
+        except Exception as e:
+            print(f"Could not start schedule topics: {e}")
+
+    def on_unmount(self) -> None:
+        get_roster_mirror().stop()
+        get_sms_queue().stop()
+        get_sms_scheduler().stop()
+        shutdown_executor()
         
 
 def app():
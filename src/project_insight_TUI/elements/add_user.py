@@ -7,6 +7,7 @@ from textual import on
 import datetime
 from ..methods.dynamoDB_methods import add_item_to_dynamodb
 from ..elements.confirm_add_user import ConfirmAddUserScreen
+from ..methods.roster_methods import STUDY_END_OFFSET_DAYS
 
 class AddUserScreen(Screen):
     CSS_PATH = "add_user_screen.tcss"  # Path to the CSS file for styling
@@ -22,7 +23,7 @@ class AddUserScreen(Screen):
             # Convert study start into datetime object
             study_start_date_dt = datetime.datetime.strptime(study_start_date, "%Y-%m-%d")
             # Calculate end day 13 days after start date
-            study_end_date_dt = study_start_date_dt + datetime.timedelta(days=13)
+            study_end_date_dt = study_start_date_dt + datetime.timedelta(days=STUDY_END_OFFSET_DAYS)
             # Convert study end date into string format
             study_end_date = study_end_date_dt.strftime("%Y-%m-%d")
 
@@ -0,0 +1,204 @@
+from textual.app import ComposeResult
+from textual.screen import Screen
+from textual.widgets import Footer, Header, Button, Label, Input, Select, DataTable, ProgressBar, TextArea, Checkbox
+from textual.containers import HorizontalGroup
+from textual import work, on
+from ..methods.roster_methods import SCHEDULE_TYPES
+from ..methods.sms_methods import SURVEY_LABELS, select_recipients, broadcast_sms, render_survey_message
+from ..methods.sns_topic_methods import topic_mode_enabled, get_schedule_topics
+from ..methods.sms_segment_methods import analyze_message, transliterate_to_gsm7, project_cohort_cost
+
+CUSTOM_MESSAGE = "custom"
+
+class BroadcastSMSScreen(Screen):
+    CSS_PATH = "broadcast_sms_screen.tcss"  # Path to the CSS file for styling
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.recipients_df = None
+
+    def compose(self) -> ComposeResult:
+        yield Header(show_clock=True)  # Show the clock in the header
+        yield Label("Send a Survey to a Cohort", id="broadcast_title")
+        yield HorizontalGroup(
+            Select([(schedule, schedule) for schedule in SCHEDULE_TYPES], prompt="All schedules", id="schedule_select"),
+            Input(placeholder="Day(s) in study, e.g. 3 or 1,2,5 (blank = all)", id="days_input"),
+            Select([(label, survey) for survey, label in SURVEY_LABELS.items()] + [("Custom Message", CUSTOM_MESSAGE)], prompt="Select a message type", id="survey_select"),
+            Button("Find Recipients", id="find_recipients_button"),
+            id="filter_group"
+        )
+        yield TextArea(id="custom_message_input")
+        yield HorizontalGroup(
+            Label("", id="cost_projection"),
+            Button("Convert to GSM-7", id="convert_gsm7_button"),
+            id="cost_group"
+        )
+        yield Checkbox("Send as one group message to the schedule's SNS topic", id="use_topic_checkbox")
+        yield Label("", id="recipients_summary")
+        yield DataTable(id="recipients_table")
+        yield ProgressBar(id="broadcast_progress", show_eta=True)
+        yield Label("", id="broadcast_status")
+        yield HorizontalGroup(
+            Button("Back", id="back_button"),
+            Button("Send to All Recipients", id="send_button", disabled=True),
+            id="action_buttons"
+        )
+        yield Footer()
+
+    def on_mount(self) -> None:
+        try:
+            self.query_one("#use_topic_checkbox", Checkbox).display = topic_mode_enabled()
+        except Exception:
+            self.query_one("#use_topic_checkbox", Checkbox).display = False
+
+    @on(Select.Changed, "#survey_select")
+    def on_survey_changed(self, event: Select.Changed) -> None:
+        self.query_one("#custom_message_input", TextArea).display = event.select.value == CUSTOM_MESSAGE
+        self.update_cost_projection()
+
+    @on(TextArea.Changed, "#custom_message_input")
+    def on_custom_message_changed(self, event: TextArea.Changed) -> None:
+        self.update_cost_projection()
+
+    def update_cost_projection(self) -> None:
+        """Show the segments (and cost) the send will be billed for across the cohort."""
+        projection_label = self.query_one("#cost_projection", Label)
+        convert_button = self.query_one("#convert_gsm7_button", Button)
+        survey = self.query_one("#survey_select", Select).value
+        custom_message = self.query_one("#custom_message_input", TextArea).text
+        convert_button.display = False
+        if survey == Select.BLANK or (survey == CUSTOM_MESSAGE and not custom_message.strip()):
+            projection_label.update("")
+            return
+
+        if survey == CUSTOM_MESSAGE:
+            info = analyze_message(custom_message)
+            convert_button.display = info.encoding == "UCS-2"
+            text = info.summary()
+        else:
+            text = SURVEY_LABELS[survey]
+
+        if self.recipients_df is not None and self.recipients_df.height > 0:
+            if survey == CUSTOM_MESSAGE:
+                messages = [custom_message] * self.recipients_df.height
+            else:
+                messages = [message for message in (render_survey_message(survey, lb_link) for lb_link in self.recipients_df["lb_link"]) if message]
+            projection = project_cohort_cost(messages)
+            text += f" | {projection['recipients']} recipients: {projection['segments']} segments, about ${projection['cost']:.2f}"
+            if projection["ucs2_messages"]:
+                text += f" (GSM-7: {projection['gsm7_segments']} segments, ${projection['gsm7_cost']:.2f})"
+        projection_label.update(text)
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        button_id = event.button.id
+
+        if button_id == "find_recipients_button":
+            self.find_recipients()
+            self.update_cost_projection()
+        elif button_id == "convert_gsm7_button":
+            custom_message_input = self.query_one("#custom_message_input", TextArea)
+            custom_message_input.text = transliterate_to_gsm7(custom_message_input.text)
+            self.update_cost_projection()
+        elif button_id == "send_button":
+            survey = self.query_one("#survey_select", Select).value
+            custom_message = None
+            if survey == CUSTOM_MESSAGE:
+                custom_message = self.query_one("#custom_message_input", TextArea).text.strip()
+                survey = None
+                if not custom_message:
+                    self.query_one("#broadcast_status", Label).update("Please enter a custom message.")
+                    return
+            elif survey == Select.BLANK:
+                self.query_one("#broadcast_status", Label).update("Please select a survey to send.")
+                return
+            if self.query_one("#use_topic_checkbox", Checkbox).value:
+                self.send_to_topic(survey, custom_message)
+                return
+            self.query_one("#send_button", Button).disabled = True
+            self.query_one("#find_recipients_button", Button).disabled = True
+            self.query_one("#broadcast_progress", ProgressBar).update(total=self.recipients_df.height, progress=0)
+            self.query_one("#recipients_table", DataTable).clear(columns=True).add_columns("Participant ID", "Phone Number", "Status", "Message ID", "Error")
+            self.run_broadcast(self.recipients_df, survey, custom_message)
+        elif button_id == "back_button":
+            self.app.pop_screen()
+
+    def find_recipients(self) -> None:
+        summary_label = self.query_one("#recipients_summary", Label)
+        recipients_table = self.query_one("#recipients_table", DataTable)
+        send_button = self.query_one("#send_button", Button)
+        recipients_table.clear(columns=True)
+        send_button.disabled = True
+
+        schedule_type = self.query_one("#schedule_select", Select).value
+        schedule_type = None if schedule_type == Select.BLANK else schedule_type
+        days_text = self.query_one("#days_input", Input).value.strip()
+        try:
+            days_in_study = [int(day) for day in days_text.replace(" ", "").split(",") if day] if days_text else None
+        except ValueError:
+            summary_label.update("Day(s) in study must be whole numbers separated by commas.")
+            return
+
+        try:
+            self.recipients_df = select_recipients(schedule_type, days_in_study)
+        except Exception as e:
+            summary_label.update(f"Could not load the roster: {e}")
+            return
+
+        summary_label.update(f"{self.recipients_df.height} active participant(s) selected.")
+        recipients_table.add_columns("Participant ID", "Schedule Type", "Day in Study", "Phone Number", "Leaderboard Link")
+        for row in self.recipients_df.iter_rows(named=True):
+            recipients_table.add_row(row["participant_id"], row["schedule_type"], row["day_in_study"], row["phone_number"], row["lb_link"] or "")
+        send_button.disabled = self.recipients_df.height == 0
+
+    def send_to_topic(self, survey, custom_message) -> None:
+        status_label = self.query_one("#broadcast_status", Label)
+        schedule_type = self.query_one("#schedule_select", Select).value
+        # The topic holds everyone active on the schedule, with one shared text
+        if schedule_type == Select.BLANK:
+            status_label.update("Pick a schedule to send a group message.")
+            return
+        if self.query_one("#days_input", Input).value.strip():
+            status_label.update("Group messages go to the whole schedule; clear the day(s) in study filter.")
+            return
+        if survey == "1A":
+            status_label.update("Survey 1A has a different leaderboard link per participant and cannot be sent as a group message.")
+            return
+        self.query_one("#send_button", Button).disabled = True
+        self.run_topic_publish(schedule_type, custom_message or render_survey_message(survey))
+
+    @work(exclusive=True, thread=True)
+    def run_topic_publish(self, schedule_type: str, message: str) -> None:
+        """Publishes to the schedule topic in a background thread."""
+        status_label = self.query_one("#broadcast_status", Label)
+        self.app.call_from_thread(status_label.update, f"Syncing {schedule_type} subscriptions and sending...")
+        try:
+            message_id = get_schedule_topics().publish(schedule_type, message)
+            self.app.call_from_thread(status_label.update, f"Group message sent to {schedule_type} (MessageId {message_id}).")
+        except Exception as e:
+            self.app.call_from_thread(status_label.update, f"Group message failed: {e}")
+            self.app.call_from_thread(setattr, self.query_one("#send_button", Button), "disabled", False)
+
+    @work(exclusive=True, thread=True)
+    def run_broadcast(self, recipients_df, survey, custom_message) -> None:
+        """Sends in a background thread so the UI stays responsive."""
+        status_label = self.query_one("#broadcast_status", Label)
+        progress_bar = self.query_one("#broadcast_progress", ProgressBar)
+        results_table = self.query_one("#recipients_table", DataTable)
+
+        def on_progress(done: int, total: int, messages_per_second: float, result: dict) -> None:
+            self.app.call_from_thread(progress_bar.update, progress=done)
+            self.app.call_from_thread(results_table.add_row, result["participant_id"], result["phone_number"], result["status"], result["message_id"] or "", result["error"] or "")
+            self.app.call_from_thread(status_label.update, f"Sent {done}/{total} ({messages_per_second:.1f} messages per second)")
+
+        try:
+            results = broadcast_sms(recipients_df, survey=survey, custom_message=custom_message, progress_callback=on_progress)
+            sent = sum(result["status"] == "sent" for result in results)
+            failed = sum(result["status"] == "failed" for result in results)
+            skipped = sum(result["status"] == "skipped" for result in results)
+            duplicate = sum(result["status"] == "duplicate" for result in results)
+            opted_out = sum(result["status"] == "opted_out" for result in results)
+            self.app.call_from_thread(status_label.update, f"Broadcast finished: {sent} sent, {failed} failed, {skipped} skipped, {opted_out} opted out, {duplicate} already sent today.")
+        except Exception as e:
+            self.app.call_from_thread(status_label.update, f"Broadcast failed: {e}")
+        finally:
+            self.app.call_from_thread(setattr, self.query_one("#find_recipients_button", Button), "disabled", False)
@@ -0,0 +1,97 @@
+from textual.app import ComposeResult
+from textual.screen import Screen
+from textual.widgets import Footer, Header, Button, Label, Input, DataTable, ProgressBar
+from textual.containers import HorizontalGroup
+from textual import work
+from ..methods.bulk_import_methods import read_import_file, validate_import_df, import_participants
+from ..methods.async_methods import run_blocking
+
+class BulkImportScreen(Screen):
+    CSS_PATH = "bulk_import_screen.tcss"  # Path to the CSS file for styling
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.valid_df = None
+
+    def compose(self) -> ComposeResult:
+        yield Header(show_clock=True)  # Show the clock in the header
+        yield Label("Import Participants", id="import_title")
+        yield Label("Columns: participant_id, study_start_date (YYYY-MM-DD), phone_number (+1XXXXXXXXXX), schedule_type, lb_link. The study end date is set to 13 days after the start date.", id="import_instructions")
+        yield HorizontalGroup(
+            Input(placeholder="Path to .csv or .parquet file", id="file_path_input"),
+            Button("Choose File", id="choose_file_button"),
+            Button("Validate", id="validate_button"),
+            id="file_group"
+        )
+        yield Label("", id="validation_summary")
+        yield DataTable(id="invalid_rows_table")
+        yield ProgressBar(id="import_progress", show_eta=True)
+        yield Label("", id="import_status")
+        yield HorizontalGroup(
+            Button("Back", id="back_button"),
+            Button("Import Valid Rows", id="import_button", disabled=True),
+            id="action_buttons"
+        )
+        yield Footer()
+
+    async def on_button_pressed(self, event: Button.Pressed) -> None:
+        button_id = event.button.id
+
+        if button_id == "choose_file_button":
+            from tkinter import filedialog
+            path = filedialog.askopenfilename(title="Select Participant File", filetypes=[("Participant files", "*.csv *.parquet"), ("All files", "*.*")])
+            if path:
+                self.query_one("#file_path_input", Input).value = path
+        elif button_id == "validate_button":
+            await self.validate_file()
+        elif button_id == "import_button":
+            if self.valid_df is not None and self.valid_df.height > 0:
+                self.query_one("#import_button", Button).disabled = True
+                self.query_one("#import_progress", ProgressBar).update(total=self.valid_df.height, progress=0)
+                self.run_import(self.valid_df)
+        elif button_id == "back_button":
+            self.app.pop_screen()
+
+    async def validate_file(self) -> None:
+        path = self.query_one("#file_path_input", Input).value.strip()
+        summary_label = self.query_one("#validation_summary", Label)
+        import_button = self.query_one("#import_button", Button)
+        invalid_table = self.query_one("#invalid_rows_table", DataTable)
+        invalid_table.clear(columns=True)
+        self.valid_df = None
+        import_button.disabled = True
+
+        if not path:
+            summary_label.update("Please choose a file first.")
+            return
+
+        try:
+            # Validation looks up existing participant IDs in DynamoDB, so keep it off the UI thread
+            valid_df, invalid_df = await run_blocking(lambda: validate_import_df(read_import_file(path)))
+        except Exception as e:
+            summary_label.update(f"Could not read file: {e}")
+            return
+
+        self.valid_df = valid_df
+        summary_label.update(f"{valid_df.height} valid participant(s), {invalid_df.height} row(s) with errors.")
+        if invalid_df.height > 0:
+            invalid_table.add_columns(*invalid_df.columns)
+            for row in invalid_df.iter_rows():
+                invalid_table.add_row(*(value if value is not None else "" for value in row))
+        import_button.disabled = valid_df.height == 0
+
+    @work(exclusive=True, thread=True)
+    def run_import(self, valid_df) -> None:
+        """Runs the import in a background thread so the UI stays responsive."""
+        status_label = self.query_one("#import_status", Label)
+        progress_bar = self.query_one("#import_progress", ProgressBar)
+
+        def on_progress(written: int, total: int, items_per_second: float) -> None:
+            self.app.call_from_thread(progress_bar.update, progress=written)
+            self.app.call_from_thread(status_label.update, f"Imported {written}/{total} participants ({items_per_second:.1f} per second)")
+
+        try:
+            written = import_participants(valid_df, progress_callback=on_progress)
+            self.app.call_from_thread(status_label.update, f"Import finished: {written} participant(s) written.")
+        except Exception as e:
+            self.app.call_from_thread(status_label.update, f"Import failed: {e}")
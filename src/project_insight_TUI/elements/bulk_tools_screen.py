@@ -0,0 +1,38 @@
+from textual.app import ComposeResult
+from textual.screen import Screen
+from textual.widgets import Footer, Header, Button, Label
+from textual.containers import HorizontalGroup
+from ..elements.bulk_import_screen import BulkImportScreen
+from ..elements.export_screen import ExportScreen
+from ..elements.broadcast_sms_screen import BroadcastSMSScreen
+from ..elements.delivery_status_screen import DeliveryStatusScreen
+
+class BulkToolsScreen(Screen):
+    CSS_PATH = "bulk_tools_screen.tcss"  # Path to the CSS file for styling
+
+    def compose(self) -> ComposeResult:
+        yield Header(show_clock=True)  # Show the clock in the header
+        yield Label("Bulk Tools - work with many participants at once", id="bulk_tools_title")
+        yield HorizontalGroup(
+            Button("Import Participants (CSV/Parquet)", id="import_button"),
+            Button("Export Participant Table (Parquet/CSV)", id="export_button"),
+            Button("Send Survey to a Cohort", id="broadcast_button"),
+            Button("SMS Delivery Status", id="delivery_status_button"),
+            Button("Back to Main Menu", id="back_button"),
+            id="bulk_tools_buttons"
+        )
+        yield Footer()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        button_id = event.button.id
+
+        if button_id == "import_button":
+            self.app.push_screen(BulkImportScreen())
+        elif button_id == "export_button":
+            self.app.push_screen(ExportScreen())
+        elif button_id == "broadcast_button":
+            self.app.push_screen(BroadcastSMSScreen())
+        elif button_id == "delivery_status_button":
+            self.app.push_screen(DeliveryStatusScreen())
+        elif button_id == "back_button":
+            self.app.pop_screen()
@@ -3,9 +3,8 @@ from textual.screen import Screen
 from textual.containers import HorizontalGroup
 from textual.widgets import Label, Button, Footer, Header, Input, DataTable
 from ..elements.menu_screen import MenuScreen
-from ..methods.dynamoDB_methods import get_item_from_dynamodb
 import datetime
-from ..methods.compliance_methods import generate_compliance_tables
+from ..methods.async_methods import get_participant_async, generate_compliance_tables_async
 
 # First column should be date_range that we calculated
 
@@ -48,18 +47,28 @@ class CheckIndividualComplianceScreen(Screen):
         )
         yield Footer()
 
-    def on_button_pressed(self, event: Button.Pressed) -> None:
+    async def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "check_compliance_button":
             # Query the input field for the participant ID
             participant_id = self.query_one("#user_input", Input).value
             
-            user_data = get_item_from_dynamodb(participant_id)
+            try:
+                user_data = await get_participant_async(participant_id)
+            except Exception as e:
+                self.query_one("#compliance_result", Label).update(f"Error retrieving user data: {e}")
+                return
             print(user_data)
             
             if user_data:
+                # Only build the tables (CSV reads and log lookups) for a participant that exists
+                try:
+                    compliance_tables = await generate_compliance_tables_async(participant_id)
+                except Exception as e:
+                    self.query_one("#compliance_result", Label).update(f"Error generating compliance tables: {e}")
+                    return
                 start_date = user_data.get("study_start_date", "N/A")
                 end_date = user_data.get("study_end_date", "N/A")
-                compliance_rows, send_time_rows, ID, message, current_comp, total_comp, age = generate_compliance_tables(participant_id)
+                compliance_rows, send_time_rows, ID, message, current_comp, total_comp, age = compliance_tables
                 # Update the compliance result label
                 if message:
                     self.query_one("#compliance_result", Label).update(message)
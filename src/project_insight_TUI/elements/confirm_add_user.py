@@ -2,7 +2,7 @@ from textual.app import ComposeResult
 from textual.containers import Grid
 from textual.screen import Screen
 from textual.widgets import Button, Footer, Header, Label, DataTable
-from ..methods.dynamoDB_methods import add_item_to_dynamodb
+from ..methods.async_methods import add_item_to_dynamodb_async
 from textual.containers import VerticalGroup, HorizontalGroup
 from ..elements.success_screen import SuccessScreen
 import datetime
@@ -104,9 +104,9 @@ class ConfirmAddUserScreen(Screen):
                 ("11:50 AM", "3:18 PM - 3:48 PM", "7:14 PM - 7:44 PM", "11:12 PM - 11:42 PM")
             ])
 
-    def on_button_pressed(self, event: Button.Pressed) -> None:
+    async def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "confirm_button":
-            add_item_to_dynamodb(self.participant_id, self.study_start_date, self.study_end_date, self.phone_number, self.schedule_type, self.lb_link)
+            await add_item_to_dynamodb_async(self.participant_id, self.study_start_date, self.study_end_date, self.phone_number, self.schedule_type, self.lb_link)
             self.app.push_screen(SuccessScreen())
         elif event.button.id == "cancel_button":
             self.app.pop_screen()  # Close the confirmation screen
\ No newline at end of file
@@ -2,7 +2,7 @@ from textual.app import ComposeResult
 from textual.screen import Screen
 from textual.widgets import Label, Input, Button, Header
 from textual.containers import HorizontalGroup
-from ..methods.dynamoDB_methods import get_item_from_dynamodb, delete_item_from_dynamodb
+from ..methods.async_methods import get_participant_async, delete_item_from_dynamodb_async
 
 class DeleteUserScreen(Screen):
     CSS_PATH = "delete_user_screen.tcss"
@@ -18,12 +18,12 @@ class DeleteUserScreen(Screen):
             id="buttons_group"
         )
 
-    def on_button_pressed(self, event: Button.Pressed) -> None:
+    async def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "delete_user_button":
             participant_id = self.query_one("#participant_id_input").value
-            user_data = get_item_from_dynamodb(participant_id)
+            user_data = await get_participant_async(participant_id)
             if user_data is not None:
-                delete_item_from_dynamodb(participant_id)
+                await delete_item_from_dynamodb_async(participant_id)
                 self.query_one("#delete_user_message", Label).update("User deleted successfully.")
             else:
                 self.query_one("#delete_user_message", Label).update("User not found.")
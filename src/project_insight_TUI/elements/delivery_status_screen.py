@@ -0,0 +1,62 @@
+from datetime import datetime
+from textual.app import ComposeResult
+from textual.screen import Screen
+from textual.widgets import Footer, Header, Button, Label, DataTable
+from textual.containers import HorizontalGroup
+from textual import work
+from ..methods.sms_delivery_methods import get_delivery_tracker
+
+class DeliveryStatusScreen(Screen):
+    CSS_PATH = "delivery_status_screen.tcss"  # Path to the CSS file for styling
+
+    def compose(self) -> ComposeResult:
+        yield Header(show_clock=True)  # Show the clock in the header
+        yield Label("SMS Delivery Status", id="delivery_title")
+        yield Label("", id="delivery_summary")
+        yield DataTable(id="delivery_table")
+        yield HorizontalGroup(
+            Button("Back", id="back_button"),
+            Button("Refresh Delivery Status", id="refresh_button"),
+            id="action_buttons"
+        )
+        yield Footer()
+
+    def on_show(self) -> None:
+        # Show what is cached right away, then look up anything still pending
+        self.show_statuses()
+        self.refresh_statuses()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        button_id = event.button.id
+
+        if button_id == "refresh_button":
+            self.refresh_statuses()
+        elif button_id == "back_button":
+            self.app.pop_screen()
+
+    def show_statuses(self) -> None:
+        tracker = get_delivery_tracker()
+        counts = tracker.counts()
+        summary = ", ".join(f"{count} {status.lower()}" for status, count in sorted(counts.items())) or "No messages sent yet"
+        self.query_one("#delivery_summary", Label).update(summary)
+
+        table = self.query_one("#delivery_table", DataTable)
+        table.clear(columns=True)
+        table.add_columns("Sent At", "Participant ID", "Phone Number", "Survey", "Status", "Provider Response", "Price (USD)", "Message ID")
+        for row in tracker.recent():
+            sent_at = datetime.fromtimestamp(row["sent_at"]).strftime("%Y-%m-%d %H:%M:%S") if row["sent_at"] else ""
+            table.add_row(sent_at, row["participant_id"] or "", row["phone_number"] or "", row["survey"] or "",
+                          row["status"], row["provider_response"] or "",
+                          "" if row["price_usd"] is None else f"{row['price_usd']:.5f}", row["message_id"])
+
+    @work(exclusive=True, thread=True)
+    def refresh_statuses(self) -> None:
+        """Looks up delivery events in a background thread so the UI stays responsive."""
+        summary_label = self.query_one("#delivery_summary", Label)
+        self.app.call_from_thread(summary_label.update, "Checking delivery status...")
+        try:
+            resolved = get_delivery_tracker().refresh()
+            self.app.call_from_thread(self.show_statuses)
+            print(f"Resolved delivery status for {resolved} message(s).")
+        except Exception as e:
+            self.app.call_from_thread(summary_label.update, f"Could not check delivery status: {e}")
@@ -3,12 +3,19 @@ from textual.screen import Screen
 from textual.validation import Function
 from textual.widgets import Input, Label, Button, Select, Header
 from textual.containers import HorizontalGroup, VerticalGroup, Grid
-from ..methods.dynamoDB_methods import get_item_from_dynamodb, update_item_in_dynamodb
+from ..methods.dynamoDB_methods import ConcurrentUpdateError
+from ..methods.async_methods import get_participant_async, update_fields_in_dynamodb_async
 from textual import on
 
 class EditUserScreen(Screen):
     CSS_PATH = "edit_user_screen.tcss"
 
+    def __init__(self) -> None:
+        super().__init__()
+        self.staged_updates = {}  # field -> new value, written together on save
+        self.loaded_participant_id = None
+        self.loaded_version = None
+
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)  # Show the clock in the header
         yield Label("Enter the Participant ID to edit user details:", id="edit_user_label")
@@ -38,17 +45,24 @@ class EditUserScreen(Screen):
         yield HorizontalGroup(
             Button("Back", id="back_button"),
             Button("View User", id="view_user_button"),
-            Button("Update User", id="update_user_button", disabled=True),
+            Button("Stage Change", id="stage_change_button", disabled=True),
+            Button("Clear Staged", id="clear_staged_button", disabled=True),
+            Button("Save Changes", id="update_user_button", disabled=True),
             id="buttons_group"
         )
 
-    def on_button_pressed(self, event: Button.Pressed) -> None:
+    async def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "view_user_button":
             participant_id = self.query_one("#participant_id_input").value
-            user_data = get_item_from_dynamodb(participant_id)
+            # Read straight from DynamoDB so the version used for the save is current
+            user_data = await get_participant_async(participant_id, fresh=True)
             user_details_label = self.query_one("#user_details_label", Label)
+            self.staged_updates = {}
+            self.query_one("#new_details_label", Label).update("")
             #print(user_data)
             if user_data is not None and user_data != {}:
+                self.loaded_participant_id = participant_id
+                self.loaded_version = int(user_data.get('version', 0))
                 details =  "Current User Details:\n" \
                     f"Participant ID: {user_data['participant_id']}\n" \
                     f"Study Start Date: {user_data['study_start_date']}\n" \
@@ -63,38 +77,78 @@ class EditUserScreen(Screen):
                 # Show the new value input field
                 new_value_input = self.query_one("#new_value_input", Input)
                 new_value_input.styles.display = "block"
-                # Enable the update button
-                update_button = self.query_one("#update_user_button", Button)
-                update_button.disabled = False
+                # Enable staging changes
+                self.query_one("#stage_change_button", Button).disabled = False
             else:
+                self.loaded_participant_id = None
+                self.loaded_version = None
                 details = "User not found."
                 user_details_label.update(details)
-                
-        if event.button.id == "update_user_button":
-            participant_id = self.query_one("#participant_id_input").value
+            self.update_staged_buttons()
+
+        if event.button.id == "stage_change_button":
             field_select = self.query_one("#field_select", Select)
             new_value_input = self.query_one("#new_value_input", Input)
             new_schedule_type_select = self.query_one("#schedule_type_select", Select)
-            new_details_label = self.query_one("#new_details_label", Label)
 
             selected_field = field_select.value
-            
+
+            if selected_field == Select.BLANK:
+                self.query_one("#new_details_label", Label).update("Select a field to edit first.")
+                return
             if selected_field == "schedule_type":
                 # If the selected field is 'schedule_type', get the value from the schedule type select
                 new_value = new_schedule_type_select.value
+                if new_value == Select.BLANK:
+                    self.query_one("#new_details_label", Label).update("Select a schedule type first.")
+                    return
             else:
                 new_value = new_value_input.value
 
-            # Update the user in DynamoDB
-            update_item_in_dynamodb(participant_id, selected_field, new_value)
+            self.staged_updates[selected_field] = new_value
+            new_value_input.value = ""
+            self.show_staged_updates()
+            self.update_staged_buttons()
+
+        if event.button.id == "clear_staged_button":
+            self.staged_updates = {}
+            self.query_one("#new_details_label", Label).update("")
+            self.update_staged_buttons()
+
+        if event.button.id == "update_user_button":
+            participant_id = self.loaded_participant_id
+            new_details_label = self.query_one("#new_details_label", Label)
+
+            # Write every staged field in one request; fails if the participant changed since it was loaded
+            try:
+                item = await update_fields_in_dynamodb_async(participant_id, self.staged_updates, expected_version=self.loaded_version)
+            except ConcurrentUpdateError as e:
+                new_details_label.update(str(e))
+                return
+            except Exception as e:
+                new_details_label.update(f"Update failed: {e}")
+                return
 
             # Show confirmation message
-            new_details_label.update(f"Updated {selected_field} to {new_value} for Participant ID {participant_id}")
+            changes = ", ".join(f"{field} to {value}" for field, value in self.staged_updates.items())
+            new_details_label.update(f"Updated {changes} for Participant ID {participant_id}")
+            self.loaded_version = int(item.get('version', self.loaded_version + 1))
+            self.staged_updates = {}
+            self.update_staged_buttons()
 
         if event.button.id == "back_button":
             self.app.pop_screen()
         
         
+    def show_staged_updates(self) -> None:
+        staged = "\n".join(f"{field}: {value}" for field, value in self.staged_updates.items())
+        self.query_one("#new_details_label", Label).update(f"Staged changes (saved together):\n{staged}")
+
+    def update_staged_buttons(self) -> None:
+        has_staged = bool(self.staged_updates) and self.loaded_participant_id is not None
+        self.query_one("#update_user_button", Button).disabled = not has_staged
+        self.query_one("#clear_staged_button", Button).disabled = not has_staged
+
     @on(Select.Changed)
     def on_field_select_changed(self, event: Select.Changed) -> None:
         field_select = self.query_one("#field_select", Select)
@@ -0,0 +1,72 @@
+from textual.app import ComposeResult
+from textual.screen import Screen
+from textual.widgets import Footer, Header, Button, Label, Input, Select, Checkbox
+from textual.containers import HorizontalGroup
+from textual import work
+from ..methods.export_methods import export_participants, EXPORT_FORMATS
+from ..methods.initialize_methods import get_config
+
+class ExportScreen(Screen):
+    CSS_PATH = "export_screen.tcss"  # Path to the CSS file for styling
+
+    def compose(self) -> ComposeResult:
+        yield Header(show_clock=True)  # Show the clock in the header
+        yield Label("Export Participant Table", id="export_title")
+        yield HorizontalGroup(
+            Input(placeholder="Destination file (.parquet or .csv)", id="output_path_input"),
+            Button("Choose Location", id="choose_location_button"),
+            id="output_group"
+        )
+        yield HorizontalGroup(
+            Select([("Parquet (zstd)", "parquet"), ("CSV", "csv")], value="parquet", allow_blank=False, id="format_select"),
+            Checkbox("Leave out test participants", id="exclude_test_ids_checkbox"),
+            id="options_group"
+        )
+        yield Label("", id="export_status")
+        yield HorizontalGroup(
+            Button("Back", id="back_button"),
+            Button("Export", id="export_button"),
+            id="action_buttons"
+        )
+        yield Footer()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        button_id = event.button.id
+
+        if button_id == "choose_location_button":
+            from tkinter import filedialog
+            export_format = self.query_one("#format_select", Select).value
+            path = filedialog.asksaveasfilename(title="Save Participant Export", defaultextension=f".{export_format}", filetypes=[("Parquet", "*.parquet"), ("CSV", "*.csv")])
+            if path:
+                self.query_one("#output_path_input", Input).value = path
+        elif button_id == "export_button":
+            output_path = self.query_one("#output_path_input", Input).value.strip()
+            export_format = self.query_one("#format_select", Select).value
+            if not output_path:
+                self.query_one("#export_status", Label).update("Please choose a destination file first.")
+                return
+            if export_format not in EXPORT_FORMATS:
+                export_format = "parquet"
+            exclude_test_ids = self.query_one("#exclude_test_ids_checkbox", Checkbox).value
+            self.query_one("#export_button", Button).disabled = True
+            self.run_export(output_path, export_format, exclude_test_ids)
+        elif button_id == "back_button":
+            self.app.pop_screen()
+
+    @work(exclusive=True, thread=True)
+    def run_export(self, output_path: str, export_format: str, exclude_test_ids: bool) -> None:
+        """Runs the export in a background thread so the UI stays responsive."""
+        status_label = self.query_one("#export_status", Label)
+        export_button = self.query_one("#export_button", Button)
+
+        def on_progress(rows: int, pages: int, rows_per_second: float) -> None:
+            self.app.call_from_thread(status_label.update, f"Exported {rows} participants from {pages} page(s) ({rows_per_second:.0f} per second)")
+
+        try:
+            test_id_cutoff = get_config().test_id_cutoff if exclude_test_ids else None
+            rows = export_participants(output_path, export_format, test_id_cutoff, progress_callback=on_progress)
+            self.app.call_from_thread(status_label.update, f"Export finished: {rows} participant(s) written to {output_path}")
+        except Exception as e:
+            self.app.call_from_thread(status_label.update, f"Export failed: {e}")
+        finally:
+            self.app.call_from_thread(setattr, export_button, "disabled", False)
@@ -5,7 +5,7 @@ from textual.widgets import Label, Button, Footer, Header
 from ..elements.menu_screen import MenuScreen
 from ..elements.check_individual_compliance_screen import CheckIndividualComplianceScreen
 from ..elements.report_generation_screen import ReportGenerationScreen
-from ..methods.initialize_methods import get_env_variables
+from ..methods.initialize_methods import get_config, PATH_VARS
 class GenerateReportScreen(Screen):
     CSS_PATH = "generate_report_screen.tcss"
 
@@ -22,13 +22,8 @@ class GenerateReportScreen(Screen):
         yield Footer()
     
     def on_show(self) -> None:
-        env_vars = get_env_variables()
-        print(env_vars)
-        
         # Check if they have the required variables 
-        PATH_VARS = ["qualtrics_survey_1a_path", "qualtrics_survey_1b_path", "qualtrics_survey_2_path", 
-            "qualtrics_survey_3_path", "qualtrics_survey_4_path", "participant_db_path"]
-        missing_vars = [var for var in PATH_VARS if var not in env_vars or not env_vars[var]]
+        missing_vars = get_config().missing(PATH_VARS)
         if missing_vars:
             self.query_one("#report_message", Label).update(f"Missing environment variables: {', '.join(missing_vars)}. Please update them in the Update Env File section.")
             self.query_one("#generate_report_button", Button).disabled = True
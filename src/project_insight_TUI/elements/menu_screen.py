@@ -28,6 +28,8 @@ class MenuScreen(Screen):
             self.app.push_screen("initialize_credentials")
         elif button_id == "send_test_sms_button":
             self.app.push_screen("send_test_sms")
+        elif button_id == "bulk_tools_button":
+            self.app.push_screen("bulk_tools")
 
     # This is the main menu screen of the application (will include buttons for different functionalities)
     def compose(self) -> ComposeResult:
@@ -44,6 +46,7 @@ class MenuScreen(Screen):
             Button("Delete User from SMS Database", id="delete_button"),
             Button("Generate Report/Check Compliance (BETA)", id="report_button"), #TODO Implement this functionality
             Button("Send Test SMS or Manually Send Survey", id="send_test_sms_button"),
+            Button("Bulk Tools (Import/Export)", id="bulk_tools_button"),
             Button("Exit", id="exit_button"),
             id =  "main_menu_buttons_group"
         )
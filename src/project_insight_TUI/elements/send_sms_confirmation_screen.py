@@ -3,7 +3,8 @@ from textual.screen import Screen
 from textual.widgets import Button, Label
 from textual.containers import HorizontalGroup
 from ..elements.menu_screen import MenuScreen
-from ..methods.dynamoDB_methods import send_text_message
+from ..methods.async_methods import queue_text_message_async, is_opted_out_async
+from ..methods.sms_queue_methods import SENT, FAILED, OPTED_OUT
 
 class SendSMSConfirmationScreen(Screen):
     def __init__(
@@ -11,9 +12,11 @@ class SendSMSConfirmationScreen(Screen):
         participant_id: str,
         custom_message: str,
         phone_number: str,
-        premade_button_text: str
+        premade_button_text: str,
+        survey: str | None = None
     ):
         super().__init__()
+        self.survey = survey
         self.participant_id = participant_id
         self.custom_message = custom_message
         self.phone_number = phone_number
@@ -37,15 +40,36 @@ class SendSMSConfirmationScreen(Screen):
             id="button_group"
         )
         
-    def on_button_pressed(self, event: Button.Pressed) -> None:
+    async def on_button_pressed(self, event: Button.Pressed) -> None:
         button_id = event.button.id
         if button_id == "confirm_button":
-            success = send_text_message(
+            # Prevent a second press while the first send is in flight
+            self.query_one("#confirm_button").disabled = True
+            if await is_opted_out_async(self.phone_number):
+                self.query_one("#status_message").update(f"{self.phone_number} has opted out of SMS (replied STOP), so the message was not sent.")
+                return
+            # Goes through the outbound queue, so a throttled send is retried instead of lost
+            row, created = await queue_text_message_async(
+                participant_id=self.participant_id,
                 phone_number=self.phone_number,
-                message=self.custom_message if self.custom_message else self.premade_button_text
+                message=self.custom_message if self.custom_message else self.premade_button_text,
+                survey=None if self.custom_message else self.survey
             )
-            if not success:
-                self.query_one("#status_message").update("Failed to send SMS. Please check your credentials and try again.")
+            if not created:
+                if row["status"] == SENT:
+                    self.query_one("#status_message").update("This message was already sent to this participant today, so it was not sent again.")
+                else:
+                    self.query_one("#status_message").update("This message is already queued for this participant today and will be sent as soon as SNS accepts it.")
+                return
+            if row["status"] == OPTED_OUT:
+                self.query_one("#status_message").update(f"{self.phone_number} has opted out of SMS (replied STOP), so the message was not sent.")
+                return
+            if row["status"] == FAILED:
+                self.query_one("#status_message").update(f"Failed to send SMS: {row['last_error']}. Please check your credentials and try again.")
+                self.query_one("#confirm_button").disabled = False
+                return
+            if row["status"] != SENT:
+                self.query_one("#status_message").update("SMS is queued and will be sent as soon as SNS accepts it.")
                 return
             # Disable confirm button to prevent multiple submissions
             self.query_one("#confirm_button").disabled = True
@@ -3,9 +3,12 @@ from textual.screen import Screen
 from textual.widgets import Footer, Header, Button, Select, Input, Label, TextArea
 from textual.containers import VerticalGroup, HorizontalGroup
 from datetime import datetime, timezone
-from ..methods.dynamoDB_methods import get_item_from_dynamodb
+from ..methods.async_methods import get_participant_async
 from textual import on
 from ..elements.send_sms_confirmation_screen import SendSMSConfirmationScreen
+from ..methods.sms_segment_methods import analyze_message, transliterate_to_gsm7, price_per_segment
+from ..methods.sms_scheduler_methods import get_sms_scheduler, parse_send_time, format_send_time
+from ..methods.sms_methods import SURVEY_LABELS
 
 LINES="""Custom Message
 EMA Survey 1A (link with leaderboard)
@@ -14,6 +17,9 @@ EMA Survey 2
 EMA Survey 3
 EMA Survey 4""".splitlines()
 
+# Message type -> survey id, so premade messages share the (participant, survey, date) key with broadcasts
+SURVEY_BY_LABEL = {label: survey for survey, label in SURVEY_LABELS.items()}
+
 
 class SendSMSScreen(Screen):
     CSS_PATH = "send_sms_screen.tcss"  
@@ -39,8 +45,19 @@ class SendSMSScreen(Screen):
             Button("Send SMS", id="send_sms_button", disabled=True),
             id="action_buttons"
         )
+        yield HorizontalGroup(
+            Label("", id="segment_info"),
+            Button("Convert to GSM-7", id="convert_gsm7_button"),
+            id="segment_group"
+        )
+        yield HorizontalGroup(
+            Input(placeholder="Send later at YYYY-MM-DD HH:MM (Eastern)", id="send_at_input"),
+            Button("Schedule SMS", id="schedule_sms_button", disabled=True),
+            Label("", id="schedule_status"),
+            id="schedule_group"
+        )
 
-    def on_button_pressed(self, event) -> None:
+    async def on_button_pressed(self, event) -> None:
         button_id = event.button.id
         
         if button_id == "search_participant_button":
@@ -55,7 +72,7 @@ class SendSMSScreen(Screen):
                 return
             
             try:
-                user_data = get_item_from_dynamodb(participant_id)
+                user_data = await get_participant_async(participant_id)
                 self.user_data = user_data  # Store user_data as an instance variable
                 
                 if user_data is None:
@@ -98,6 +115,34 @@ class SendSMSScreen(Screen):
             
         elif button_id == "back_to_menu_button":
             self.app.pop_screen()
+
+        elif button_id == "schedule_sms_button":
+            schedule_status = self.query_one("#schedule_status", Label)
+            try:
+                due_at = parse_send_time(self.query_one("#send_at_input", Input).value)
+            except ValueError:
+                schedule_status.update("Enter the send time as YYYY-MM-DD HH:MM.")
+                return
+            message = self.current_message()
+            phone_number = getattr(self, "user_data", {}).get('phone_number', None)
+            if not message.strip() or not phone_number:
+                schedule_status.update("Search for a participant and choose a message first.")
+                return
+            participant_id = self.query_one("#participant_id_input", Input).value
+            try:
+                scheduler = get_sms_scheduler()
+                scheduler.start()
+                scheduler.schedule(participant_id, phone_number, message, due_at, survey=self.current_survey())
+            except Exception as e:
+                schedule_status.update(f"Could not schedule SMS: {e}")
+                return
+            schedule_status.update(f"Scheduled for {format_send_time(due_at)} ({scheduler.pending_count()} scheduled in total).")
+
+        elif button_id == "convert_gsm7_button":
+            # Replace curly quotes, dashes, emoji etc. so the message fits GSM-7 segments
+            custom_message_input = self.query_one("#custom_message_input", TextArea)
+            custom_message_input.text = transliterate_to_gsm7(custom_message_input.text)
+            self.update_segment_info()
         
         elif button_id == "send_sms_button":
             # Send Participant # and the full message to the SendSMSConfirmationScreen
@@ -109,7 +154,39 @@ class SendSMSScreen(Screen):
             premade_button_text = str(self.query_one("#premade_button_text", Label).renderable)
             if premade_button_text.strip() == "":
                 premade_button_text = None
-            self.app.push_screen(SendSMSConfirmationScreen(participant_id=participant_id, custom_message=custom_message_input, premade_button_text=premade_button_text, phone_number=phone_number))
+            self.app.push_screen(SendSMSConfirmationScreen(participant_id=participant_id, custom_message=custom_message_input, premade_button_text=premade_button_text, phone_number=phone_number, survey=self.current_survey()))
+
+    def current_message(self) -> str:
+        if self.query_one("#message_type_select", Select).value == "Custom Message":
+            return self.query_one("#custom_message_input", TextArea).text
+        return str(self.query_one("#premade_button_text", Label).renderable)
+
+    def current_survey(self) -> str | None:
+        """Survey id of the selected premade message (None for a custom message)."""
+        return SURVEY_BY_LABEL.get(self.query_one("#message_type_select", Select).value)
+
+    def update_segment_info(self) -> None:
+        """Show how many SMS segments the message will be billed as."""
+        segment_info = self.query_one("#segment_info", Label)
+        convert_button = self.query_one("#convert_gsm7_button", Button)
+        message = self.current_message()
+        if not message.strip():
+            segment_info.update("")
+            convert_button.display = False
+            return
+        info = analyze_message(message)
+        text = f"{info.summary()} - about ${info.segments * price_per_segment():.4f} per recipient"
+        is_custom = self.query_one("#message_type_select", Select).value == "Custom Message"
+        if info.encoding == "UCS-2":
+            gsm7_segments = analyze_message(transliterate_to_gsm7(message)).segments
+            text += f" (GSM-7 would use {gsm7_segments})"
+        segment_info.update(text)
+        convert_button.display = is_custom and info.encoding == "UCS-2"
+        self.query_one("#schedule_sms_button", Button).disabled = self.query_one("#send_sms_button", Button).disabled
+
+    @on(TextArea.Changed, "#custom_message_input")
+    def on_custom_message_changed(self, event: TextArea.Changed) -> None:
+        self.update_segment_info()
 
     @on(Select.Changed)
     def on_message_type_changed(self, event: Select.Changed) -> None:
@@ -184,4 +261,6 @@ class SendSMSScreen(Screen):
             premade_button_text.display = True
             self.query_one("#premade_button_text", Label).disabled = False
             self.query_one("#custom_message_input", TextArea).disabled = True
-            self.query_one("#send_sms_button", Button).disabled = False
\ No newline at end of file
+            self.query_one("#send_sms_button", Button).disabled = False
+
+        self.update_segment_info()
@@ -3,7 +3,7 @@ from textual.screen import Screen
 from textual.validation import Function
 from textual.widgets import Input, Label, Button, Header
 from textual.containers import HorizontalGroup
-from ..methods.dynamoDB_methods import get_item_from_dynamodb
+from ..methods.async_methods import get_participant_async
 
 
 class ViewUserScreen(Screen):
@@ -20,7 +20,7 @@ class ViewUserScreen(Screen):
             id="buttons_group"
         )
 
-    def on_button_pressed(self, event: Button.Pressed) -> None:
+    async def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "view_user_button":
             participant_id = self.query_one("#participant_id_input", Input).value
             user_details_label = self.query_one("#user_details_label", Label)
@@ -32,7 +32,7 @@ class ViewUserScreen(Screen):
             
             try:
                 # Implement logic to view user details
-                user_data = get_item_from_dynamodb(participant_id)
+                user_data = await get_participant_async(participant_id)
                 
                 # Simplified logic - just check None first
                 if user_data is None:
@@ -0,0 +1,83 @@
+"""Awaitable versions of the data-access functions for use from Textual handlers.
+
+boto3 is synchronous, so every call is run on a shared, bounded thread pool
+instead of the event loop; the UI keeps rendering while a request is in
+flight. The pool is smaller than MAX_POOL_CONNECTIONS so the shared clients never
+run out of HTTP connections.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ..methods.session_methods import MAX_POOL_CONNECTIONS
+from ..methods import dynamoDB_methods
+from ..methods import compliance_methods
+from ..methods import sms_queue_methods
+from ..methods.opt_out_methods import get_opt_out_cache
+
+# Maximum number of blocking data-access calls running at once
+ASYNC_MAX_WORKERS = min(16, MAX_POOL_CONNECTIONS)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=ASYNC_MAX_WORKERS, thread_name_prefix="data-access")
+        return _executor
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking function on the data-access pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+# Participants
+
+async def get_participant_async(participant_id, fresh: bool = False):
+    return await run_blocking(dynamoDB_methods.get_participant, participant_id, fresh=fresh)
+
+
+async def add_item_to_dynamodb_async(participant_id, study_start_date, study_end_date, phone_number, schedule_type, lb_link):
+    return await run_blocking(dynamoDB_methods.add_item_to_dynamodb, participant_id, study_start_date,
+                              study_end_date, phone_number, schedule_type, lb_link)
+
+
+async def update_fields_in_dynamodb_async(participant_id, updates: dict, expected_version=None) -> dict:
+    return await run_blocking(dynamoDB_methods.update_fields_in_dynamodb, participant_id, updates,
+                              expected_version=expected_version)
+
+
+async def delete_item_from_dynamodb_async(participant_id):
+    return await run_blocking(dynamoDB_methods.delete_item_from_dynamodb, participant_id)
+
+
+# SMS
+
+async def queue_text_message_async(participant_id, phone_number, message, survey: str | None = None,
+                                   timeout: float | None = 60) -> tuple[dict, bool]:
+    """Send one SMS through the durable outbound queue. Returns (queue row, created)."""
+    return await run_blocking(sms_queue_methods.queue_text_message, participant_id, phone_number, message,
+                              survey=survey, timeout=timeout)
+
+
+async def is_opted_out_async(phone_number) -> bool:
+    return await run_blocking(get_opt_out_cache().is_opted_out, phone_number)
+
+
+# Compliance
+
+async def generate_compliance_tables_async(participant_id: str):
+    return await run_blocking(compliance_methods.generate_compliance_tables, participant_id)
@@ -0,0 +1,138 @@
+import os
+import time
+import polars as pl
+from botocore.exceptions import ClientError, ConnectionError as BotocoreConnectionError
+from ..methods.session_methods import get_dynamodb_table
+from ..methods.dynamoDB_methods import get_items_from_dynamodb
+from ..methods.roster_methods import SCHEDULE_TYPES, STUDY_END_OFFSET_DAYS
+from ..methods.roster_mirror_methods import get_roster_mirror, utc_timestamp
+
+# Columns an import file must have (study_end_date is derived, like AddUserScreen)
+IMPORT_COLUMNS = ["participant_id", "study_start_date", "phone_number", "schedule_type", "lb_link"]
+
+# BatchWriteItem accepts at most 25 items per request
+BATCH_SIZE = 25
+
+# Attempts per batch when DynamoDB keeps throttling it
+MAX_BATCH_ATTEMPTS = 5
+
+# Errors worth retrying a batch for; anything else is raised straight away
+RETRYABLE_WRITE_ERROR_CODES = {
+    "ProvisionedThroughputExceededException", "ThrottlingException", "RequestLimitExceeded",
+    "InternalServerError", "ServiceUnavailable",
+}
+
+
+def read_import_file(path: str) -> pl.DataFrame:
+    """Read a CSV or Parquet file of participants, keeping every column as text."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".parquet":
+        df = pl.read_parquet(path)
+        return df.with_columns(pl.all().cast(pl.Utf8))
+    if extension in (".csv", ".txt"):
+        return pl.read_csv(path, infer_schema=False)
+    raise ValueError(f"Unsupported file type '{extension}'. Use a .csv or .parquet file.")
+
+
+def validate_import_df(df: pl.DataFrame, check_existing: bool = True) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """Validate participants and derive study_end_date.
+
+    Returns (valid_df, invalid_df). invalid_df has an extra "errors" column
+    listing every problem with that row. With check_existing, participant IDs
+    already in DynamoDB are looked up with BatchGetItem and rejected, so an
+    import never overwrites an existing participant.
+    """
+    missing_columns = [column for column in IMPORT_COLUMNS if column not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Missing columns: {', '.join(missing_columns)}")
+
+    df = df.select(IMPORT_COLUMNS).with_columns(
+        pl.col(column).cast(pl.Utf8).str.strip_chars() for column in IMPORT_COLUMNS
+    )
+    df = df.with_columns(
+        pl.col("study_start_date").str.strptime(pl.Date, format="%Y-%m-%d", strict=False).alias("_start_date"),
+        pl.col("participant_id").cast(pl.Int64, strict=False).alias("_participant_id"),
+    )
+
+    existing_ids = []
+    if check_existing:
+        candidate_ids = df["_participant_id"].drop_nulls().cast(pl.Utf8).unique().to_list()
+        existing_ids = list(get_items_from_dynamodb(candidate_ids)) if candidate_ids else []
+
+    checks = {
+        "participant_id is not a whole number": pl.col("_participant_id").is_null(),
+        "participant_id appears more than once": pl.col("participant_id").is_duplicated(),
+        "participant_id already exists": pl.col("_participant_id").cast(pl.Utf8).is_in(existing_ids).fill_null(False),
+        "study_start_date is not YYYY-MM-DD": pl.col("_start_date").is_null(),
+        "phone_number is not +1XXXXXXXXXX": ~pl.col("phone_number").str.contains(r"^\+1\d{10}$").fill_null(False),
+        "schedule_type is not a known schedule": ~pl.col("schedule_type").is_in(SCHEDULE_TYPES).fill_null(False),
+        "lb_link is empty": pl.col("lb_link").fill_null("").str.len_chars() == 0,
+    }
+    df = df.with_columns(
+        pl.concat_list(
+            pl.when(condition).then(pl.lit(message)).otherwise(pl.lit(None, dtype=pl.Utf8))
+            for message, condition in checks.items()
+        ).list.drop_nulls().list.join("; ").alias("errors")
+    )
+
+    valid_df = df.filter(pl.col("errors") == "").with_columns(
+        # Store IDs without leading zeros/whitespace, the same way the Input widget produces them
+        pl.col("_participant_id").cast(pl.Utf8).alias("participant_id"),
+        # Zero-padded like study_end_date, so the dates compare correctly as strings
+        pl.col("_start_date").dt.strftime("%Y-%m-%d").alias("study_start_date"),
+        (pl.col("_start_date") + pl.duration(days=STUDY_END_OFFSET_DAYS)).dt.strftime("%Y-%m-%d").alias("study_end_date"),
+    ).select(
+        "participant_id", "study_start_date", "study_end_date", "phone_number", "schedule_type", "lb_link"
+    )
+    invalid_df = df.filter(pl.col("errors") != "").select(IMPORT_COLUMNS + ["errors"])
+    return valid_df, invalid_df
+
+
+def _is_retryable_write_error(error: Exception) -> bool:
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code") in RETRYABLE_WRITE_ERROR_CODES
+    return isinstance(error, BotocoreConnectionError)
+
+
+def _write_batch(table, items: list[dict]) -> None:
+    """Write one batch. batch_writer resends UnprocessedItems on its own; if the
+    whole request is throttled or the connection drops, back off and try the batch again."""
+    for attempt in range(MAX_BATCH_ATTEMPTS):
+        try:
+            with table.batch_writer(overwrite_by_pkeys=["participant_id"]) as batch:
+                for item in items:
+                    batch.put_item(Item=item)
+            return
+        except Exception as e:
+            if not _is_retryable_write_error(e) or attempt == MAX_BATCH_ATTEMPTS - 1:
+                raise
+            print(f"Batch write failed ({e}), retrying...")
+            time.sleep(min(2 ** attempt * 0.5, 10))
+
+
+def import_participants(valid_df: pl.DataFrame, progress_callback=None) -> int:
+    """Write validated participants to DynamoDB in batches of 25.
+
+    progress_callback(written, total, items_per_second) is called after each batch.
+    Returns the number of participants written.
+    """
+    table = get_dynamodb_table()
+    mirror = get_roster_mirror()
+    total = valid_df.height
+    written = 0
+    started = time.monotonic()
+
+    for batch_df in valid_df.iter_slices(n_rows=BATCH_SIZE):
+        updated_at = utc_timestamp()
+        items = [{**row, "updated_at": updated_at} for row in batch_df.iter_rows(named=True)]
+        _write_batch(table, items)
+
+        for item in items:
+            mirror.upsert(item)
+
+        written += len(items)
+        if progress_callback is not None:
+            elapsed = max(time.monotonic() - started, 1e-6)
+            progress_callback(written, total, written / elapsed)
+
+    return written
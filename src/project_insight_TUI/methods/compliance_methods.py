@@ -1,8 +1,11 @@
 import polars as pl
 from great_tables import GT, style, loc
 from datetime import datetime, timedelta
-from ..methods.initialize_methods import get_env_variables
-import boto3
+from ..methods.initialize_methods import get_config
+from ..methods.schedule_methods import SCHEDULES, get_schedule
+from ..methods.send_time_methods import get_send_time_store
+from ..methods.dynamoDB_methods import get_participant
+from ..methods.report_context_methods import ReportContext, load_survey_frames
 import pytz
 import numpy as np
 import re
@@ -13,168 +16,57 @@ from pylatex.base_classes import Environment
 
 
 def get_participant_variables(participant_id: str):
-    env_vars = get_env_variables()
+    # Get the needed variables (from the local roster mirror when possible)
+    item = get_participant(participant_id)
     
-    Session = boto3.Session(
-        aws_access_key_id=env_vars['aws_access_key_id'],
-        aws_secret_access_key=env_vars['aws_secret_access_key'],
-        region_name=env_vars['region']
-    )
-    
-    # Get the needed variables
-    dynamodb = Session.resource('dynamodb')
-    table = dynamodb.Table(env_vars['table_name'])
-
-    response = table.get_item(Key={"participant_id": participant_id})
-    
-    study_start_date = response['Item']['study_start_date']
-    study_end_date = response['Item']['study_end_date']
-    schedule_type = response['Item']['schedule_type']
+    study_start_date = item['study_start_date']
+    study_end_date = item['study_end_date']
+    schedule_type = item['schedule_type']
 
     
     return study_start_date, study_end_date, schedule_type
 
 def get_log_events(schedule_type, date_range, study_start_date_converted, study_end_date_converted):
     
-    if schedule_type == "Early Bird Schedule":
-        log_group_name_list = ['/aws/lambda/early_bird_schedule_message1', 
-                               '/aws/lambda/early_bird_schedule_message2',
-                               '/aws/lambda/early_bird_schedule_message3',
-                               '/aws/lambda/early_bird_schedule_message4']
-    elif schedule_type == "Standard Schedule":
-        log_group_name_list = ['/aws/lambda/standard_schedule_message1', 
-                               '/aws/lambda/standard_schedule_message2',
-                               '/aws/lambda/standard_schedule_message3',
-                               '/aws/lambda/standard_schedule_message4']
-    elif schedule_type == "Night Owl Schedule":
-        log_group_name_list = ['/aws/lambda/night_owl_schedule_message1', 
-                               '/aws/lambda/night_owl_schedule_message2',
-                               '/aws/lambda/night_owl_schedule_message3',
-                               '/aws/lambda/night_owl_schedule_message4']
-    else:
-        raise ValueError("Invalid schedule type provided.")
+    schedule = get_schedule(schedule_type)
     
-    env_vars = get_env_variables()
+    # Send times come from the local store; only log streams newer than what it
+    # has already seen are read from CloudWatch, shared by everyone on this schedule
+    send_times_df = get_send_time_store().send_times(study_start_date_converted, study_end_date_converted, [schedule_type])
+    print(f"Start Date: {study_start_date_converted}, End Date: {study_end_date_converted}")
+    with pl.Config(tbl_rows=-1, tbl_cols=-1):
+        print(send_times_df)
     
-    Session = boto3.Session(
-        aws_access_key_id=env_vars['aws_access_key_id'],
-        aws_secret_access_key=env_vars['aws_secret_access_key'],
-        region_name=env_vars['region']
+    # Join each survey's send times onto the study calendar: one row per date,
+    # one column per survey, None where that message was not sent
+    calendar_df = pl.DataFrame({'date': date_range}).with_columns(
+        pl.col('date').str.strptime(pl.Date, "%Y-%m-%d").alias('_date')
     )
-    
-    # Create a CloudWatch Logs client
-    cloudwatch_logs = Session.client('logs')
-    
-    send_time_dict = {date: [] for date in date_range}
-    for log_group_name in log_group_name_list:
-        response = cloudwatch_logs.describe_log_streams(
-            logGroupName=log_group_name,
-            orderBy='LastEventTime',
-            descending=True
-        )
-        log_stream_df = pl.DataFrame(response['logStreams'])
-        
-        log_stream_df = log_stream_df.with_columns(
-            pl.from_epoch(pl.col('firstEventTimestamp'), time_unit="ms").alias('firstEventTimestamp'),
-            pl.from_epoch(pl.col('lastEventTimestamp'), time_unit="ms").alias('lastEventTimestamp'),
-            pl.from_epoch(pl.col('creationTime'), time_unit="ms").alias('creationTime')
-        )
-        log_stream_df = log_stream_df.with_columns(
-            pl.col('firstEventTimestamp').dt.replace_time_zone("UTC").dt.convert_time_zone("America/New_York").alias('firstEventTimestamp'),
-            pl.col('lastEventTimestamp').dt.replace_time_zone("UTC").dt.convert_time_zone("America/New_York").alias('lastEventTimestamp'),
-            pl.col('creationTime').dt.replace_time_zone("UTC").dt.convert_time_zone("America/New_York").alias('creationTime')
-        )
-        
-        print(f"Processing log group_unaltered: {log_group_name}")
-        print(log_stream_df)
-        
-        
-        # Only include log streams where the firstEventTimestamp is between the study start and end dates
-        log_stream_df = log_stream_df.filter(
-            (pl.col('firstEventTimestamp') >= study_start_date_converted) &
-            (pl.col('firstEventTimestamp') <= study_end_date_converted)
+    survey_columns = []
+    for survey in range(1, schedule.survey_count + 1):
+        survey_columns.append(f"survey_{survey}")
+        calendar_df = calendar_df.join(
+            send_times_df.filter(pl.col('survey') == survey).select(
+                pl.col('date').alias('_date'), pl.col('time').alias(f"survey_{survey}")  # "HH:MM:SS"
+            ),
+            on='_date', how='left'
         )
-        print(f"Start Date: {study_start_date_converted}, End Date: {study_end_date_converted}")
-        
-        # Convert firstEventTimestamp to string for filtering
-        log_stream_df = log_stream_df.with_columns(
-            pl.col('firstEventTimestamp').dt.strftime("%Y-%m-%dT%H:%M:%S").alias('firstEventTimestamp')
-        )
-
-        
-        print(f"Processing log group: {log_group_name}")
-        with pl.Config(tbl_rows=-1, tbl_cols=-1):
-            print(log_stream_df)
-        # For each date, find the firstEventTimestamp for this log group
-        for date in date_range:
-            match = None
-            for row in log_stream_df.iter_rows(named=True):
-                # Check if the timestamp string starts with the date (e.g., '2025-08-12')
-                if date in row['firstEventTimestamp']:
-                    match = row
-                    break
-            if match and match['firstEventTimestamp'] is not None:
-                # firstEventTimestamp is already a string in "%Y-%m-%dT%H:%M:%S" format
-                time_str = match['firstEventTimestamp'][11:19]  # Extract "HH:MM:SS"
-                send_time_dict[date].append(time_str)
-            else:
-                send_time_dict[date].append(None)
+    
+    send_time_dict = {row[0]: list(row[1:]) for row in calendar_df.select(['date'] + survey_columns).iter_rows()}
     return send_time_dict
 
 def generate_compliance_tables(participant_id: str):
-    env_vars = get_env_variables()
-    print(env_vars)
-    
-    # Initialize a session using your AWS credentials
-    Session = boto3.Session(
-        aws_access_key_id=env_vars['aws_access_key_id'],
-        aws_secret_access_key=env_vars['aws_secret_access_key'],
-        region_name=env_vars['region']
-    )
+    config = get_config()
     
     # Load in Survey CSV Files & Clean Times
     try:
-        db_df = pl.read_csv(env_vars.get("participant_db_path"))
-        survey_1a_df = pl.read_csv(env_vars.get("qualtrics_survey_1a_path"), schema_overrides={"Date/Time": str})
-        survey_1b_df = pl.read_csv(env_vars.get("qualtrics_survey_1b_path"), schema_overrides={"Date/Time": str})
-        survey_2_df = pl.read_csv(env_vars.get("qualtrics_survey_2_path"), schema_overrides={"Date/Time": str})
-        survey_3_df = pl.read_csv(env_vars.get("qualtrics_survey_3_path"), schema_overrides={"Date/Time": str})
-        survey_4_df = pl.read_csv(env_vars.get("qualtrics_survey_4_path"), schema_overrides={"Date/Time": str})
-        
-        survey_list = [survey_1a_df, survey_1b_df, survey_2_df, survey_3_df, survey_4_df]
-        
+        db_df, survey_list = load_survey_frames(config)
         print("CSV files loaded successfully.")
     except Exception as e:
         print(f"Error loading CSV files: {e}")
         message = f"Error loading CSV files: {e}. Please check if you have Google Drive open and are logged in."
         return None, None, None, message, None, None, None
     
-    for idx, survey in enumerate(survey_list):
-        survey = survey.with_columns(
-        pl.col("Date/Time").str.strptime(pl.Datetime, "%Y-%m-%d %H:%M:%S", strict=False).alias("Date/Time")
-        )
-        
-        survey = survey.with_columns(
-        pl.col("Date/Time").dt.replace_time_zone("America/Denver").dt.convert_time_zone("America/New_York").alias("Date/Time")
-        ) 
-        
-        survey = survey.with_columns(
-        pl.col("Date/Time").dt.strftime("%Y-%m-%d").alias("Date"),
-        pl.col("Date/Time").dt.strftime("%H:%M:%S").alias("Time")
-        )
-        
-        # Remove whitespace from any entry in "Name" column
-        survey = survey.with_columns(
-            pl.col("Name").str.strip_chars().alias("Name"),
-        )
-        
-        # Remove punctuation from "Name" column
-        survey = survey.with_columns(
-            pl.col("Name").str.replace_all(r"[^\w\s]", "").alias("Name"),
-        )
-        
-        survey_list[idx] = survey  # Update the original list
-    
     survey_1a_df = survey_list[0]
     survey_1b_df = survey_list[1]
     survey_2_df = survey_list[2]
@@ -572,25 +464,13 @@ def generate_compliance_tables(participant_id: str):
 
 """Compliance Report Generation Code"""
 
-def generate_compliance_report(date: str, path: str):
-    # Get environment variables
-    env_vars = get_env_variables()
-    print(env_vars)
-    
-    # Initialize a session using your AWS credentials
-    Session = boto3.Session(
-        aws_access_key_id=env_vars['aws_access_key_id'],
-        aws_secret_access_key=env_vars['aws_secret_access_key'],
-        region_name=env_vars['region']
-    )
+def generate_compliance_report(date: str, path: str, context: ReportContext | None = None):
+    # Roster, send times and survey CSVs are each loaded once for the whole report
+    context = context or ReportContext()
     
-    dynamodb = Session.resource('dynamodb')
-    table = dynamodb.Table(env_vars['table_name'])
-    
-    # Get Items
-    response = table.scan()
-    data = response['Items']
-    df = pl.DataFrame(data)
+    # Get Items (paginated, parallel-segment scan; only the report columns of
+    # non-test participants are sent back by DynamoDB)
+    df = context.roster()
     print("Initial DF:")
     print(df)
     
@@ -602,15 +482,6 @@ def generate_compliance_report(date: str, path: str):
     date_str_minus_1 = date_obj_minus_1.strftime("%Y-%m-%d")
     date_str = date_obj.strftime("%Y-%m-%d")
     
-    # Filter currently in the study
-    df = df.with_columns(pl.col('participant_id').cast(pl.Int64))
-    df = df.filter(pl.col('participant_id') < 99)
-    
-    df = df.with_columns(
-        pl.col("study_start_date").cast(pl.Utf8).str.strptime(pl.Date, format="%Y-%m-%d", strict=False),
-        pl.col("study_end_date").cast(pl.Utf8).str.strptime(pl.Date, format="%Y-%m-%d", strict=False),
-    )
-    
     filtered_df_active = df.filter(
         (pl.col("study_start_date") <= date_obj) & (pl.col("study_end_date") >= date_obj)
     )
@@ -649,7 +520,7 @@ def generate_compliance_report(date: str, path: str):
     
     # Go through the Schedule Type column and replace with abbreviations else leave blank " "
     filtered_df_active = filtered_df_active.with_columns(
-        pl.col("Schedule Type").str.replace_all("Early Bird Schedule", "EBS").str.replace_all("Standard Schedule", "SS").str.replace_all("Night Owl Schedule", "NOS")
+        pl.col("Schedule Type").replace({name: schedule.abbreviation for name, schedule in SCHEDULES.items()})
     )
 
     print("Filtered Active DF:")
@@ -759,369 +630,25 @@ def generate_compliance_report(date: str, path: str):
     )
     latex_table = gt.as_latex()
 
-    early_bird_log_dataframes = {}
-    standard_log_dataframes = {}
-    night_owl_log_dataframes = {}
-
-    early_bird_dfs, standard_dfs, night_owl_dfs, date_obj_minus_1 = get_log_events_all(Session, date_obj, early_bird_log_dataframes, standard_log_dataframes, night_owl_log_dataframes)
+    # Send times of every schedule for both days, one wide table (Date, S1..Sn) per schedule
+    send_times_df = context.send_times(date_obj_minus_1.date(), date_obj.date())
+    wide_tables = build_send_time_tables(send_times_df, [date_str_minus_1, date_str])
     
-    # Go through early bird DF
-    previous_times_early = []
-    current_times_early = []
-    
-    for df_name, df in early_bird_dfs.items():
-        print(f"DataFrame Name: {df_name}")
-        current_df = df
-
-        # Go through each item in the dataframe for 'firstEventTimestamp', if it contains date_str_minus_1, add to previous_times, else add to current_times. If it doesn't have either, put ' '.
-        for row in current_df.iter_rows(named=True):  # Add named=True here
-            timestamp = row['firstEventTimestamp']
-
-            if date_str_minus_1 in timestamp:
-                previous_times_early.append(timestamp)
-            elif date_str in timestamp:
-                current_times_early.append(timestamp)
-            else:
-                previous_times_early.append(' ')
-                current_times_early.append(' ')
-
-    while len(current_times_early) < len(previous_times_early):
-        current_times_early.append(' ')
-        
-    for i in range(len(previous_times_early)):
-        if previous_times_early[i] != ' ':
-            try:
-                dt = datetime.strptime(previous_times_early[i], "%Y-%m-%dT%H:%M:%S")
-                previous_times_early[i] = dt.strftime("%H:%M")
-            except ValueError:
-                previous_times_early[i] = ' '
-        if current_times_early[i] != ' ':
-            try:
-                dt = datetime.strptime(current_times_early[i], "%Y-%m-%dT%H:%M:%S")
-                current_times_early[i] = dt.strftime("%H:%M")
-            except ValueError:
-                current_times_early[i] = ' '
-        
-    print("Previous and Current Early Bird Times:")
-    print(previous_times_early, current_times_early)
-    
-    log_times_df_early = pl.DataFrame({
-        f"{date_str_minus_1}": previous_times_early,
-        f"{date_str}": current_times_early
-    })
-    
-    print(log_times_df_early)
-    
-    # Go through standard DF
-    previous_times_standard = []
-    current_times_standard = []
-    
-    for df_name, df in standard_dfs.items():
-        print(f"DataFrame Name: {df_name}")
-        current_df = df
-
-        # Go through each item in the dataframe for 'firstEventTimestamp', if it contains date_str_minus_1, add to previous_times, else add to current_times. If it doesn't have either, put ' '.
-        for row in current_df.iter_rows(named=True):  # Add named=True here
-            timestamp = row['firstEventTimestamp']
-
-            if date_str_minus_1 in timestamp:
-                previous_times_standard.append(timestamp)
-            elif date_str in timestamp:
-                current_times_standard.append(timestamp)
-            else:
-                previous_times_standard.append(' ')
-                current_times_standard.append(' ')
-    
-    while len(current_times_standard) < len(previous_times_standard):
-        current_times_standard.append(' ')
-    
-    for i in range(len(previous_times_standard)):
-        if previous_times_standard[i] != ' ':
-            try:
-                dt = datetime.strptime(previous_times_standard[i], "%Y-%m-%dT%H:%M:%S")
-                previous_times_standard[i] = dt.strftime("%H:%M")
-            except ValueError:
-                previous_times_standard[i] = ' '
-        if current_times_standard[i] != ' ':
-            try:
-                dt = datetime.strptime(current_times_standard[i], "%Y-%m-%dT%H:%M:%S")
-                current_times_standard[i] = dt.strftime("%H:%M")
-            except ValueError:
-                current_times_standard[i] = ' '
-                
-    print("Previous and Current Standard Times:")
-    print(previous_times_standard, current_times_standard)
-    
-    log_times_standard_df = pl.DataFrame({
-        f"{date_str_minus_1}": previous_times_standard,
-        f"{date_str}": current_times_standard
-    })
-    
-    print("Standard Log Times DF:")
-    print(log_times_standard_df)
-    
-    # Go through night owl DF
-    previous_times_night_owl = []
-    current_times_night_owl = []
-    
-    for df_name, df in night_owl_dfs.items():
-        print(f"DataFrame Name: {df_name}")
-        current_df = df
-
-        # Go through each item in the dataframe for 'firstEventTimestamp', if it contains date_str_minus_1, add to previous_times, else add to current_times. If it doesn't have either, put ' '.
-        for row in current_df.iter_rows(named=True):  # Add named=True here
-            timestamp = row['firstEventTimestamp']
-
-            if date_str_minus_1 in timestamp:
-                previous_times_night_owl.append(timestamp)
-            elif date_str in timestamp:
-                current_times_night_owl.append(timestamp)
-            else:
-                previous_times_night_owl.append(' ')
-                current_times_night_owl.append(' ')
-    
-    while len(current_times_night_owl) < len(previous_times_night_owl):
-        current_times_night_owl.append(' ')
-    
-    for i in range(len(previous_times_night_owl)):
-        if previous_times_night_owl[i] != ' ':
-            try:
-                dt = datetime.strptime(previous_times_night_owl[i], "%Y-%m-%dT%H:%M:%S")
-                previous_times_night_owl[i] = dt.strftime("%H:%M")
-            except ValueError:
-                previous_times_night_owl[i] = ' '
-        if current_times_night_owl[i] != ' ':
-            try:
-                dt = datetime.strptime(current_times_night_owl[i], "%Y-%m-%dT%H:%M:%S")
-                current_times_night_owl[i] = dt.strftime("%H:%M")
-            except ValueError:
-                current_times_night_owl[i] = ' '
-    
-    print("Previous and Current Night Owl Times:")
-    print(previous_times_night_owl, current_times_night_owl)
-    
-    log_times_night_owl_df = pl.DataFrame({
-        f"{date_str_minus_1}": previous_times_night_owl,
-        f"{date_str}": current_times_night_owl
-    })
-    
-    print("Night Owl Log Times DF:")
-    print(log_times_night_owl_df)
-    
-    # Make Wide dataframes
-    early_bird_long = log_times_df_early.with_row_index("Survey").melt(
-        id_vars=["Survey"],
-        value_vars=[f"{date_str_minus_1}", f"{date_str}"],
-        variable_name='Date',
-        value_name='Time'
-    )
-
-    # Check if early_bird_long is empty or has insufficient data
-    if early_bird_long.is_empty() or early_bird_long.height < 8:  # Should have 8 rows (4 surveys × 2 dates)
-        early_bird_wide = pl.DataFrame({
-            'Date': [date_str_minus_1, date_str],
-            'S1': [' ', ' '],
-            'S2': [' ', ' '],
-            'S3': [' ', ' '],
-            'S4': [' ', ' ']
-        })
-    else:
+    wide_latex = {}
+    for schedule_type, wide_df in wide_tables.items():
+        print(f"{schedule_type} send times:")
+        print(wide_df)
         try:
-            early_bird_wide = early_bird_long.pivot(
-                values='Time',
-                index='Date',
-                columns='Survey'
-            ).with_columns(
-                # Rename survey columns to be more descriptive
-                pl.col('0').alias('S1'),
-                pl.col('1').alias('S2'), 
-                pl.col('2').alias('S3'),
-                pl.col('3').alias('S4')
-            ).select(
-                pl.col('Date'),
-                pl.col('S1'),
-                pl.col('S2'),
-                pl.col('S3'),
-                pl.col('S4')
-            )
-
-            # Ensure both dates are present
-            expected_dates = {date_str_minus_1, date_str}
-            actual_dates = set(early_bird_wide['Date'].to_list())
-            missing_dates = expected_dates - actual_dates
-
-            if missing_dates:
-                # Add missing dates with empty values
-                for missing_date in missing_dates:
-                    missing_row = pl.DataFrame({
-                        'Date': [missing_date],
-                        'S1': [' '],
-                        'S2': [' '],
-                        'S3': [' '],
-                        'S4': [' ']
-                    })
-                    early_bird_wide = pl.concat([early_bird_wide, missing_row])
-                early_bird_wide = early_bird_wide.sort('Date')
-
+            wide_latex[schedule_type] = GT(wide_df).as_latex()
         except Exception as e:
-            print(f"Error creating early_bird_wide: {e}")
-            early_bird_wide = pl.DataFrame({
-                'Date': [date_str_minus_1, date_str],
-                'S1': [' ', ' '],
-                'S2': [' ', ' '],
-                'S3': [' ', ' '],
-                'S4': [' ', ' ']
-            })
-
-    try:
-        early_bird_wide_latex = GT(early_bird_wide).as_latex()
-    except Exception as e:
-        print(f"Error generating early bird latex: {e}")
-        early_bird_wide_latex = "\\begin{tabular}{c} No data available \\end{tabular}"
-
-    standard_long = log_times_standard_df.with_row_index("Survey").melt(
-        id_vars=["Survey"],
-        value_vars=[f"{date_str_minus_1}", f"{date_str}"],
-        variable_name='Date',
-        value_name='Time'
-    )
-
-    # Check if standard_long is empty or has insufficient data
-    if standard_long.is_empty() or standard_long.height < 8:
-        standard_wide = pl.DataFrame({
-            'Date': [date_str_minus_1, date_str],
-            'S1': [' ', ' '],
-            'S2': [' ', ' '],
-            'S3': [' ', ' '],
-            'S4': [' ', ' ']
-        })
-    else:
-        try:
-            standard_wide = standard_long.pivot(
-                values='Time',
-                index='Date',
-                columns='Survey'
-            ).with_columns(
-                # Rename survey columns to be more descriptive
-                pl.col('0').alias('S1'),
-                pl.col('1').alias('S2'), 
-                pl.col('2').alias('S3'),
-                pl.col('3').alias('S4')
-            ).select(
-                pl.col('Date'),
-                pl.col('S1'),
-                pl.col('S2'),
-                pl.col('S3'),
-                pl.col('S4')
-            )
-
-            # Ensure both dates are present
-            expected_dates = {date_str_minus_1, date_str}
-            actual_dates = set(standard_wide['Date'].to_list())
-            missing_dates = expected_dates - actual_dates
-
-            if missing_dates:
-                for missing_date in missing_dates:
-                    missing_row = pl.DataFrame({
-                        'Date': [missing_date],
-                        'S1': [' '],
-                        'S2': [' '],
-                        'S3': [' '],
-                        'S4': [' ']
-                    })
-                    standard_wide = pl.concat([standard_wide, missing_row])
-                standard_wide = standard_wide.sort('Date')
-
-        except Exception as e:
-            print(f"Error creating standard_wide: {e}")
-            standard_wide = pl.DataFrame({
-                'Date': [date_str_minus_1, date_str],
-                'S1': [' ', ' '],
-                'S2': [' ', ' '],
-                'S3': [' ', ' '],
-                'S4': [' ', ' ']
-            })
-
-    try:
-        standard_wide_latex = GT(standard_wide).as_latex()
-    except Exception as e:
-        print(f"Error generating standard latex: {e}")
-        standard_wide_latex = "\\begin{tabular}{c} No data available \\end{tabular}"
-
-    night_owl_long = log_times_night_owl_df.with_row_index("Survey").melt(
-        id_vars=["Survey"],
-        value_vars=[f"{date_str_minus_1}", f"{date_str}"],
-        variable_name='Date',
-        value_name='Time'
-    )
-
-    # Check if night_owl_long is empty or has insufficient data
-    if night_owl_long.is_empty() or night_owl_long.height < 8:
-        night_owl_wide = pl.DataFrame({
-            'Date': [date_str_minus_1, date_str],
-            'S1': [' ', ' '],
-            'S2': [' ', ' '],
-            'S3': [' ', ' '],
-            'S4': [' ', ' ']
-        })
-    else:
-        try:
-            # Step 2: Convert back to wide format with the desired structure
-            night_owl_wide = night_owl_long.pivot(
-                values='Time',
-                index='Date',
-                columns='Survey'
-            ).with_columns(
-                # Rename survey columns to be more descriptive
-                pl.col('0').alias('S1'),
-                pl.col('1').alias('S2'), 
-                pl.col('2').alias('S3'),
-                pl.col('3').alias('S4')
-            ).select(
-                pl.col('Date'),
-                pl.col('S1'),
-                pl.col('S2'),
-                pl.col('S3'),
-                pl.col('S4')
-            )
-
-            # Ensure both dates are present
-            expected_dates = {date_str_minus_1, date_str}
-            actual_dates = set(night_owl_wide['Date'].to_list())
-            missing_dates = expected_dates - actual_dates
-
-            if missing_dates:
-                for missing_date in missing_dates:
-                    missing_row = pl.DataFrame({
-                        'Date': [missing_date],
-                        'S1': [' '],
-                        'S2': [' '],
-                        'S3': [' '],
-                        'S4': [' ']
-                    })
-                    night_owl_wide = pl.concat([night_owl_wide, missing_row])
-                night_owl_wide = night_owl_wide.sort('Date')
-
-        except Exception as e:
-            print(f"Error creating night_owl_wide: {e}")
-            night_owl_wide = pl.DataFrame({
-                'Date': [date_str_minus_1, date_str],
-                'S1': [' ', ' '],
-                'S2': [' ', ' '],
-                'S3': [' ', ' '],
-                'S4': [' ', ' ']
-            })
-
-    print(night_owl_wide)
-
-    try:
-        night_owl_wide_latex = GT(night_owl_wide).as_latex()
-    except Exception as e:
-        print(f"Error generating night owl latex: {e}")
-        night_owl_wide_latex = "\\begin{tabular}{c} No data available \\end{tabular}"
+            print(f"Error generating {schedule_type} latex: {e}")
+            wide_latex[schedule_type] = "\\begin{tabular}{c} No data available \\end{tabular}"
+    
+    early_bird_wide = wide_tables["Early Bird Schedule"]
+    standard_wide = wide_tables["Standard Schedule"]
+    night_owl_wide = wide_tables["Night Owl Schedule"]
     
-    early_birds_dfs, standard_dfs, night_owl_dfs, date_obj_minus_1 = get_log_events_all(Session, date_obj, early_bird_log_dataframes, standard_log_dataframes, night_owl_log_dataframes)
-    compliance_df = compliance_check_day_level(date_obj, filtered_df_active_full, date_str, date_str_minus_1, early_bird_wide, standard_wide, night_owl_wide)
+    compliance_df = compliance_check_day_level(date_obj, filtered_df_active_full, date_str, date_str_minus_1, early_bird_wide, standard_wide, night_owl_wide, context=context)
 
     compliance_output_df = compliance_df.select([
         "participant_id_number",
@@ -1230,9 +757,7 @@ def generate_compliance_report(date: str, path: str):
             doc.append(Command('vspace', '0.2cm'))
             doc.append(NoEscape(r'\begin{center}'))
             doc.append(NoEscape(r'\begin{itemize}'))
-            doc.append(NoEscape(r'\textbf{EBS}: Early Bird Schedule; '))
-            doc.append(NoEscape(r'\textbf{SS}: Standard Schedule; '))
-            doc.append(NoEscape(r'\textbf{NOS}: Night Owl Schedule'))
+            doc.append(NoEscape('; '.join(rf'\textbf{{{schedule.abbreviation}}}: {name}' for name, schedule in SCHEDULES.items())))
             doc.append(NoEscape(r'\end{itemize}'))
             doc.append(NoEscape(r'\end{center}'))
         else:
@@ -1249,10 +774,6 @@ def generate_compliance_report(date: str, path: str):
         cleaned = re.sub(r'\\rmfamily\s*', '', cleaned)
         return cleaned
 
-    early_bird_wide_latex_clean = clean_latex(early_bird_wide_latex)
-    standard_wide_latex_clean = clean_latex(standard_wide_latex)
-    night_owl_wide_latex_clean = clean_latex(night_owl_wide_latex)
-
     doc.append(NoEscape(r'{\raggedright'))  # begin left-aligned group
 
     # Left Column with manual "Send Times" header
@@ -1264,36 +785,18 @@ def generate_compliance_report(date: str, path: str):
     doc.append(NoEscape(r'\par'))
     doc.append(Command('vspace', '0.2cm'))
 
-    with doc.create(Subsection('Early Bird', numbering=False)):
-        if early_bird_wide_latex_clean.strip():
-            doc.append(NoEscape(r'\resizebox{\linewidth}{!}{%'))
-            doc.append(NoEscape(early_bird_wide_latex_clean))
-            doc.append(NoEscape(r'}'))
-        else:
-            doc.append("No data available for Early Bird send times.")
-        doc.append(NoEscape(r'\par'))
-
-    doc.append(Command('vspace', '0.2cm'))
-
-    with doc.create(Subsection('Standard', numbering=False)):
-        if standard_wide_latex_clean.strip():
-            doc.append(NoEscape(r'\resizebox{\linewidth}{!}{%'))
-            doc.append(NoEscape(standard_wide_latex_clean))
-            doc.append(NoEscape(r'}'))
-        else:
-            doc.append("No data available for Standard send times.")
-        doc.append(NoEscape(r'\par'))
-
-    doc.append(Command('vspace', '0.2cm'))
-
-    with doc.create(Subsection('Night Owl', numbering=False)):
-        if night_owl_wide_latex_clean.strip():
-            doc.append(NoEscape(r'\resizebox{\linewidth}{!}{%'))
-            doc.append(NoEscape(night_owl_wide_latex_clean))
-            doc.append(NoEscape(r'}'))
-        else:
-            doc.append("No data available for Night Owl send times.")
-        doc.append(NoEscape(r'\par'))
+    for idx, (schedule_type, schedule) in enumerate(SCHEDULES.items()):
+        if idx > 0:
+            doc.append(Command('vspace', '0.2cm'))
+        wide_latex_clean = clean_latex(wide_latex[schedule_type])
+        with doc.create(Subsection(schedule.label, numbering=False)):
+            if wide_latex_clean.strip():
+                doc.append(NoEscape(r'\resizebox{\linewidth}{!}{%'))
+                doc.append(NoEscape(wide_latex_clean))
+                doc.append(NoEscape(r'}'))
+            else:
+                doc.append(f"No data available for {schedule.label} send times.")
+            doc.append(NoEscape(r'\par'))
 
     doc.append(NoEscape(r'\end{minipage}'))
 
@@ -1403,189 +906,51 @@ def generate_compliance_report(date: str, path: str):
             except Exception as e:
                 print(f"Could not remove file: {file}. Error: {e}")
 
-"""Auxiliary Functions"""
-
-def get_log_events_all(Session, date_obj, early_bird_log_dataframes, standard_log_dataframes, night_owl_log_dataframes):
-    early_bird_list = ['/aws/lambda/early_bird_schedule_message1', 
-                        '/aws/lambda/early_bird_schedule_message2',
-                        '/aws/lambda/early_bird_schedule_message3',
-                        '/aws/lambda/early_bird_schedule_message4']
-
-    standard_list = ['/aws/lambda/standard_schedule_message1', 
-                    '/aws/lambda/standard_schedule_message2',
-                    '/aws/lambda/standard_schedule_message3',
-                    '/aws/lambda/standard_schedule_message4']
-
-    night_owl_list = ['/aws/lambda/night_owl_schedule_message1', 
-                    '/aws/lambda/night_owl_schedule_message2',
-                    '/aws/lambda/night_owl_schedule_message3',
-                    '/aws/lambda/night_owl_schedule_message4']
-
-    # date_obj - 1
-    date_obj_minus_1 = date_obj - timedelta(days=1)
-
-    cloudwatch_logs = Session.client('logs')
-
-    # Early Bird
-    for log_group_name in early_bird_list:
-        print(log_group_name)
-        response = cloudwatch_logs.describe_log_streams(
-                logGroupName=log_group_name,
-                orderBy='LogStreamName',
-                descending=True
-            )
-        log_stream_df = pl.DataFrame(response['logStreams'])
-
-        log_stream_df = log_stream_df.with_columns(
-            pl.from_epoch(pl.col('firstEventTimestamp'), time_unit="ms").alias('firstEventTimestamp'),
-            pl.from_epoch(pl.col('lastEventTimestamp'), time_unit="ms").alias('lastEventTimestamp'),
-            pl.from_epoch(pl.col('creationTime'), time_unit="ms").alias('creationTime')
-        )
-        log_stream_df = log_stream_df.with_columns(
-            pl.col('firstEventTimestamp').dt.replace_time_zone("UTC").dt.convert_time_zone("America/New_York").alias('firstEventTimestamp'),
-            pl.col('lastEventTimestamp').dt.replace_time_zone("UTC").dt.convert_time_zone("America/New_York").alias('lastEventTimestamp'),
-            pl.col('creationTime').dt.replace_time_zone("UTC").dt.convert_time_zone("America/New_York").alias('creationTime')
-        )
-
-        print(f"Processing log group_unaltered: {log_group_name}")
-        print(log_stream_df)
-
-        log_stream_df = log_stream_df.filter(
-            (pl.col('firstEventTimestamp').dt.date() == date_obj_minus_1.date()) |
-            (pl.col('firstEventTimestamp').dt.date() == date_obj.date())
-        )
-        print(f"Start Date: {date_obj_minus_1}, End Date: {date_obj}")
-
-        # Convert firstEventTimestamp to string for filtering
-        log_stream_df = log_stream_df.with_columns(
-            pl.col('firstEventTimestamp').dt.strftime("%Y-%m-%dT%H:%M:%S").alias('firstEventTimestamp')
-        )
+    print(f"Remote fetches for this report: {context.summary()}")
 
-        early_bird_log_dataframes[log_group_name] = log_stream_df
-
-    # Standard
-    for log_group_name in standard_list:
-        print(log_group_name)
-        response = cloudwatch_logs.describe_log_streams(
-                logGroupName=log_group_name,
-                orderBy='LogStreamName',
-                descending=True
-            )
-        log_stream_df = pl.DataFrame(response['logStreams'])
-
-        log_stream_df = log_stream_df.with_columns(
-            pl.from_epoch(pl.col('firstEventTimestamp'), time_unit="ms").alias('firstEventTimestamp'),
-            pl.from_epoch(pl.col('lastEventTimestamp'), time_unit="ms").alias('lastEventTimestamp'),
-            pl.from_epoch(pl.col('creationTime'), time_unit="ms").alias('creationTime')
-        )
-        log_stream_df = log_stream_df.with_columns(
-            pl.col('firstEventTimestamp').dt.replace_time_zone("UTC").dt.convert_time_zone("America/New_York").alias('firstEventTimestamp'),
-            pl.col('lastEventTimestamp').dt.replace_time_zone("UTC").dt.convert_time_zone("America/New_York").alias('lastEventTimestamp'),
-            pl.col('creationTime').dt.replace_time_zone("UTC").dt.convert_time_zone("America/New_York").alias('creationTime')
-        )
-
-        print(f"Processing log group_unaltered: {log_group_name}")
-        print(log_stream_df)
-
-        log_stream_df = log_stream_df.filter(
-            (pl.col('firstEventTimestamp').dt.date() == date_obj_minus_1.date()) |
-            (pl.col('firstEventTimestamp').dt.date() == date_obj.date())
-        )
-        print(f"Start Date: {date_obj_minus_1}, End Date: {date_obj}")
-
-        # Convert firstEventTimestamp to string for filtering
-        log_stream_df = log_stream_df.with_columns(
-            pl.col('firstEventTimestamp').dt.strftime("%Y-%m-%dT%H:%M:%S").alias('firstEventTimestamp')
-        )
-
-        standard_log_dataframes[log_group_name] = log_stream_df
-
-    # Night Owl
-    for log_group_name in night_owl_list:
-        print(log_group_name)
-        response = cloudwatch_logs.describe_log_streams(
-                logGroupName=log_group_name,
-                orderBy='LogStreamName',
-                descending=True
-            )
-        log_stream_df = pl.DataFrame(response['logStreams'])
-
-        log_stream_df = log_stream_df.with_columns(
-            pl.from_epoch(pl.col('firstEventTimestamp'), time_unit="ms").alias('firstEventTimestamp'),
-            pl.from_epoch(pl.col('lastEventTimestamp'), time_unit="ms").alias('lastEventTimestamp'),
-            pl.from_epoch(pl.col('creationTime'), time_unit="ms").alias('creationTime')
-        )
-        log_stream_df = log_stream_df.with_columns(
-            pl.col('firstEventTimestamp').dt.replace_time_zone("UTC").dt.convert_time_zone("America/New_York").alias('firstEventTimestamp'),
-            pl.col('lastEventTimestamp').dt.replace_time_zone("UTC").dt.convert_time_zone("America/New_York").alias('lastEventTimestamp'),
-            pl.col('creationTime').dt.replace_time_zone("UTC").dt.convert_time_zone("America/New_York").alias('creationTime')
-        )
-
-        print(f"Processing log group_unaltered: {log_group_name}")
-        print(log_stream_df)
-
-        log_stream_df = log_stream_df.filter(
-            (pl.col('firstEventTimestamp').dt.date() == date_obj_minus_1.date()) |
-            (pl.col('firstEventTimestamp').dt.date() == date_obj.date())
-        )
-        print(f"Start Date: {date_obj_minus_1}, End Date: {date_obj}")
-
-        # Convert firstEventTimestamp to string for filtering
-        log_stream_df = log_stream_df.with_columns(
-            pl.col('firstEventTimestamp').dt.strftime("%Y-%m-%dT%H:%M:%S").alias('firstEventTimestamp')
-        )
+"""Auxiliary Functions"""
 
-        night_owl_log_dataframes[log_group_name] = log_stream_df
+def build_send_time_tables(send_times_df: pl.DataFrame, dates: list[str]) -> dict:
+    """Wide send-time table (Date, S1..Sn as "HH:MM", ' ' where nothing was sent)
+    for every schedule in SCHEDULES, from the long send-time frame.
 
-    return early_bird_log_dataframes, standard_log_dataframes, night_owl_log_dataframes, date_obj_minus_1
+    Every schedule/survey/date is laid out in one long calendar frame, the send
+    times are joined onto it, and a single pivot produces all the tables."""
+    calendar_df = pl.DataFrame(
+        [(schedule_type, survey, date) for schedule_type, schedule in SCHEDULES.items()
+         for survey in range(1, schedule.survey_count + 1) for date in dates],
+        schema={'schedule_type': pl.Utf8, 'survey': pl.Int64, 'Date': pl.Utf8}, orient="row"
+    )
+    long_df = calendar_df.join(
+        send_times_df.select(
+            'schedule_type', 'survey',
+            pl.col('date').dt.strftime("%Y-%m-%d").alias('Date'),
+            pl.col('time').str.slice(0, 5).alias('Time'),
+        ),
+        on=['schedule_type', 'survey', 'Date'], how='left'
+    ).with_columns(
+        pl.col('Time').fill_null(' '),
+        pl.format("S{}", pl.col('survey')).alias('Survey'),
+    )
+    
+    wide_df = long_df.pivot(on='Survey', index=['schedule_type', 'Date'], values='Time', aggregate_function='first').sort('Date')
+    return {
+        schedule_type: wide_df.filter(pl.col('schedule_type') == schedule_type).select(['Date'] + schedule.survey_columns)
+        for schedule_type, schedule in SCHEDULES.items()
+    }
 
 
-def compliance_check_day_level(date_obj, filtered_df_active_full, date_str, date_str_minus_1, early_bird_wide, standard_wide, night_owl_wide):
-    env_vars = get_env_variables()
+def compliance_check_day_level(date_obj, filtered_df_active_full, date_str, date_str_minus_1, early_bird_wide, standard_wide, night_owl_wide, context=None):
+    config = get_config()
     
     now = datetime.now()
     is_today = date_obj.date() == now.date()
     
-    try:
-            db_df = pl.read_csv(env_vars.get("participant_db_path"))
-            survey_1a_df = pl.read_csv(env_vars.get("qualtrics_survey_1a_path"), schema_overrides={"Date/Time": str})
-            survey_1b_df = pl.read_csv(env_vars.get("qualtrics_survey_1b_path"), schema_overrides={"Date/Time": str})
-            survey_2_df = pl.read_csv(env_vars.get("qualtrics_survey_2_path"), schema_overrides={"Date/Time": str})
-            survey_3_df = pl.read_csv(env_vars.get("qualtrics_survey_3_path"), schema_overrides={"Date/Time": str})
-            survey_4_df = pl.read_csv(env_vars.get("qualtrics_survey_4_path"), schema_overrides={"Date/Time": str})
-
-            survey_list = [survey_1a_df, survey_1b_df, survey_2_df, survey_3_df, survey_4_df]
-
-            print("CSV files loaded successfully.")
-    except Exception as e:
-        print(f"Error loading CSV files: {e}")
-        message = f"Error loading CSV files: {e}. Please check if you have Google Drive open and are logged in."
-        
-    for idx, survey in enumerate(survey_list):
-        survey = survey.with_columns(
-        pl.col("Date/Time").str.strptime(pl.Datetime, "%Y-%m-%d %H:%M:%S", strict=False).alias("Date/Time")
-        )
-
-        survey = survey.with_columns(
-        pl.col("Date/Time").dt.replace_time_zone("America/Denver").dt.convert_time_zone("America/New_York").alias("Date/Time")
-        ) 
-        
-        survey = survey.with_columns(
-        pl.col("Date/Time").dt.strftime("%Y-%m-%d").alias("Date"),
-        pl.col("Date/Time").dt.strftime("%H:%M:%S").alias("Time")
-        )
-        
-        # Remove whitespace from any entry in "Name" column
-        survey = survey.with_columns(
-            pl.col("Name").str.strip_chars().alias("Name")
-        )
-
-        # Remove punctuation from "Name" column
-        survey = survey.with_columns(
-            pl.col("Name").str.replace_all(r"[^\w\s]", "").alias("Name"),
-        )
-
-        survey_list[idx] = survey  # Update the original list
+    # Survey CSVs (shared with the rest of the report when a ReportContext is given)
+    if context is not None:
+        db_df, survey_list = context.survey_frames()
+    else:
+        db_df, survey_list = load_survey_frames(config)
 
     survey_1a_df = survey_list[0]
     survey_1b_df = survey_list[1]
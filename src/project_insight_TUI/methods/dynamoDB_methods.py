@@ -1,101 +1,196 @@
-import boto3
-import os
-from dotenv import load_dotenv
-from ..methods.initialize_methods import get_env_variables
+import time
+from concurrent.futures import ThreadPoolExecutor
+import polars as pl
+from ..methods.session_methods import get_dynamodb_table, get_sns_client
+from ..methods.roster_mirror_methods import get_roster_mirror, utc_timestamp
+from ..methods.roster_methods import ROSTER_COLUMNS
 
-load_dotenv()
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_SIZE = 100
 
-def add_item_to_dynamodb(participant_id, study_start_date, study_end_date, phone_number, schedule_type, lb_link):
+# Number of BatchGetItem requests in flight at once
+BATCH_GET_WORKERS = 8
 
-    env_vars = get_env_variables()
+# Attempts per chunk while DynamoDB keeps returning UnprocessedKeys
+MAX_BATCH_GET_ATTEMPTS = 6
 
-    Session = boto3.Session(
-        aws_access_key_id=env_vars['aws_access_key_id'],
-        aws_secret_access_key=env_vars['aws_secret_access_key'],
-        region_name=env_vars['region']
-    )
+def add_item_to_dynamodb(participant_id, study_start_date, study_end_date, phone_number, schedule_type, lb_link):
 
-    dynamodb = Session.resource('dynamodb')
-    table = dynamodb.Table(env_vars['table_name'])
+    table = get_dynamodb_table()
 
-    table.put_item(Item={
+    item = {
         "participant_id": participant_id,
         "study_start_date": study_start_date,
         "study_end_date": study_end_date,
         "phone_number": phone_number,
         "schedule_type": schedule_type,
-        "lb_link": lb_link
-    })
-
-def get_item_from_dynamodb(participant_id):
-    env_vars = get_env_variables()
+        "lb_link": lb_link,
+        "updated_at": utc_timestamp()
+    }
+    table.put_item(Item=item)
 
-    Session = boto3.Session(
-        aws_access_key_id=env_vars['aws_access_key_id'],
-        aws_secret_access_key=env_vars['aws_secret_access_key'],
-        region_name=env_vars['region']
-    )
+    # Write through to the local roster mirror
+    get_roster_mirror().upsert(item)
 
-    dynamodb = Session.resource('dynamodb')
-    table = dynamodb.Table(env_vars['table_name'])
+def get_item_from_dynamodb(participant_id):
+    table = get_dynamodb_table()
 
     response = table.get_item(Key={"participant_id": participant_id})
     return response.get("Item", None)
 
-def update_item_in_dynamodb(participant_id, update_field, new_value):
-    env_vars = get_env_variables()
+def _batch_get_chunk(keys: list[dict]) -> list[dict]:
+    """Fetch up to 100 keys, retrying UnprocessedKeys with exponential backoff."""
+    table = get_dynamodb_table()
+    client = table.meta.client  # The resource's client, so items come back as plain Python types
+    request_items = {table.name: {"Keys": keys}}
+    items = []
+
+    for attempt in range(MAX_BATCH_GET_ATTEMPTS):
+        response = client.batch_get_item(RequestItems=request_items)
+        items.extend(response.get("Responses", {}).get(table.name, []))
+
+        request_items = response.get("UnprocessedKeys") or {}
+        if not request_items:
+            return items
+        time.sleep(min(2 ** attempt * 0.05, 2))
+
+    raise RuntimeError(f"DynamoDB left {len(request_items[table.name]['Keys'])} key(s) unprocessed after {MAX_BATCH_GET_ATTEMPTS} attempts")
+
+def get_items_from_dynamodb(participant_ids, as_frame: bool = False):
+    """Fetch many participants with concurrent 100-key BatchGetItem requests.
+
+    Returns a dict of participant_id -> item, or a DataFrame with one row per
+    participant found when as_frame is True. IDs that do not exist are left out.
+    """
+    # Keys are stored as strings; dedupe while keeping the caller's order
+    ids = list(dict.fromkeys(str(participant_id) for participant_id in participant_ids))
+    chunks = [[{"participant_id": participant_id} for participant_id in ids[start:start + BATCH_GET_SIZE]]
+              for start in range(0, len(ids), BATCH_GET_SIZE)]
+
+    if len(chunks) <= 1:
+        results = [_batch_get_chunk(chunk) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(BATCH_GET_WORKERS, len(chunks))) as executor:
+            results = list(executor.map(_batch_get_chunk, chunks))
+
+    found = {str(item["participant_id"]): item for items in results for item in items}
+    items_by_id = {participant_id: found[participant_id] for participant_id in ids if participant_id in found}
+
+    if as_frame:
+        if not items_by_id:
+            return pl.DataFrame(schema={column: pl.Utf8 for column in ROSTER_COLUMNS})
+        return pl.DataFrame(list(items_by_id.values()), infer_schema_length=None, strict=False)
+    return items_by_id
+
+def get_participants(participant_ids) -> dict:
+    """Look up many participants in the local roster mirror, fetching any misses
+    from DynamoDB in batches. Returns a dict of participant_id -> item."""
+    mirror = get_roster_mirror()
+    ids = list(dict.fromkeys(str(participant_id) for participant_id in participant_ids))
+    participants = {}
+    missing = []
+    for participant_id in ids:
+        item = mirror.get(participant_id)
+        if item is not None:
+            participants[participant_id] = item
+        else:
+            missing.append(participant_id)
+
+    if missing:
+        for participant_id, item in get_items_from_dynamodb(missing).items():
+            mirror.upsert(item)
+            participants[participant_id] = item
+    return {participant_id: participants[participant_id] for participant_id in ids if participant_id in participants}
+
+def get_participant(participant_id, fresh: bool = False):
+    """Look up a participant in the local roster mirror, falling back to DynamoDB on a miss.
+    fresh=True always reads from DynamoDB (e.g. before editing, to get the current version)."""
+    mirror = get_roster_mirror()
+    if fresh:
+        return mirror.fetch(participant_id)
+    item = mirror.get(participant_id)
+    if item is not None:
+        return item
+    return mirror.fetch(participant_id)
+
+class ConcurrentUpdateError(Exception):
+    """Raised when a participant was changed (or deleted) by someone else since it was read."""
+
+def update_fields_in_dynamodb(participant_id, updates: dict, expected_version=None) -> dict:
+    """Update several fields of one participant in a single, atomic UpdateItem call.
+
+    Every write bumps the item's `version` attribute. Pass the version that was
+    read as expected_version to only apply the update if nobody else changed the
+    participant in the meantime (items written before versioning count as 0);
+    ConcurrentUpdateError is raised otherwise. Returns the updated item.
+    """
+    if not updates:
+        raise ValueError("No fields to update")
+
+    table = get_dynamodb_table()
+    names = {"#pk": "participant_id", "#version": "version", "#updated_at": "updated_at"}
+    values = {":updated_at": utc_timestamp(), ":zero": 0, ":one": 1}
+    assignments = []
+    for idx, (field, value) in enumerate(updates.items()):
+        if field in ("participant_id", "version", "updated_at"):
+            raise ValueError(f"{field} cannot be updated")
+        # Placeholders keep fields like "name" or "date" clear of DynamoDB reserved words
+        names[f"#f{idx}"] = field
+        values[f":v{idx}"] = value
+        assignments.append(f"#f{idx} = :v{idx}")
+    assignments.append("#updated_at = :updated_at")
+    assignments.append("#version = if_not_exists(#version, :zero) + :one")
+
+    # Never create a new item through an update
+    condition = "attribute_exists(#pk)"
+    if expected_version is not None:
+        if int(expected_version) == 0:
+            condition += " AND (attribute_not_exists(#version) OR #version = :zero)"
+        else:
+            condition += " AND #version = :expected_version"
+            values[":expected_version"] = int(expected_version)
 
-    Session = boto3.Session(
-        aws_access_key_id=env_vars['aws_access_key_id'],
-        aws_secret_access_key=env_vars['aws_secret_access_key'],
-        region_name=env_vars['region']
-    )
+    try:
+        response = table.update_item(
+            Key={"participant_id": participant_id},
+            UpdateExpression="SET " + ", ".join(assignments),
+            ConditionExpression=condition,
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values,
+            ReturnValues="ALL_NEW"
+        )
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        raise ConcurrentUpdateError(f"Participant {participant_id} was changed or deleted by someone else. Reload it and try again.")
 
-    dynamodb = Session.resource('dynamodb')
-    table = dynamodb.Table(env_vars['table_name'])
+    item = response.get("Attributes", {})
+    get_roster_mirror().upsert(item)
+    return item
 
-    # Implement logic to update item in DynamoDB
-    table.update_item(
-        Key={"participant_id": participant_id},
-        UpdateExpression=f"SET {update_field} = :val",
-        ExpressionAttributeValues={
-            ":val": new_value  # Replace with the actual value to update
-        }
-    )
+def update_item_in_dynamodb(participant_id, update_field, new_value):
+    return update_fields_in_dynamodb(participant_id, {update_field: new_value})
 
 def delete_item_from_dynamodb(participant_id):
-    env_vars = get_env_variables()
-
-    Session = boto3.Session(
-        aws_access_key_id=env_vars['aws_access_key_id'],
-        aws_secret_access_key=env_vars['aws_secret_access_key'],
-        region_name=env_vars['region']
-    )
-
-    dynamodb = Session.resource('dynamodb')
-    table = dynamodb.Table(env_vars['table_name'])
+    table = get_dynamodb_table()
 
     # Implement logic to delete item from DynamoDB
     table.delete_item(Key={"participant_id": participant_id})
 
-def send_text_message(phone_number, message):
-    env_vars = get_env_variables()
+    get_roster_mirror().delete(participant_id)
 
-    Session = boto3.Session(
-        aws_access_key_id=env_vars['aws_access_key_id'],
-        aws_secret_access_key=env_vars['aws_secret_access_key'],
-        region_name=env_vars['region']
+def publish_text_message(phone_number, message) -> str:
+    """Send one SMS through SNS and return its MessageId. Errors are raised to the caller."""
+    sns = get_sns_client()
+    response = sns.publish(
+        PhoneNumber=phone_number,
+        Message=message
     )
+    return response["MessageId"]
 
-    sns = Session.client('sns')
-
+def send_text_message(phone_number, message):
     try:
     # Implement logic to send SMS using SNS
-        sns.publish(
-            PhoneNumber=phone_number,
-            Message=message
-        )
+        publish_text_message(phone_number, message)
         return True
     except Exception as e:
         print(f"Failed to send SMS: {e}")
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,135 @@
+"""Streaming export of the participant table.
+
+The table is scanned page by page (on the same parallel scan segments as
+scan_roster) and every page is cast to the report pipeline's typed schema and
+written straight to a temporary Arrow IPC file. The final Parquet/CSV file is
+then produced with a streaming sink over those files, so no more than a page
+per segment is ever held in memory regardless of table size.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import polars as pl
+from ..methods.initialize_methods import get_cache_dir, get_config
+from ..methods.roster_methods import ROSTER_COLUMNS, DEFAULT_SCAN_SEGMENTS, normalize_roster_df, build_scan_kwargs, scan_pages
+
+EXPORT_FORMATS = ["parquet", "csv"]
+
+# Exported columns; updated_at is kept so exports can be diffed against each other
+EXPORT_COLUMNS = ROSTER_COLUMNS + ["updated_at"]
+
+EXPORT_SCHEMA = {
+    "participant_id": pl.Int64,
+    "study_start_date": pl.Date,
+    "study_end_date": pl.Date,
+    "phone_number": pl.Utf8,
+    "schedule_type": pl.Utf8,
+    "lb_link": pl.Utf8,
+    "updated_at": pl.Utf8,
+}
+
+
+def _page_to_frame(items: list[dict]) -> pl.DataFrame:
+    """Cast one scan page to EXPORT_SCHEMA so every chunk file has the same schema."""
+    df = pl.DataFrame(
+        [{column: (None if item.get(column) is None else str(item.get(column))) for column in EXPORT_COLUMNS} for item in items],
+        schema={column: pl.Utf8 for column in EXPORT_COLUMNS},
+    )
+    return normalize_roster_df(df).select(EXPORT_COLUMNS).cast(EXPORT_SCHEMA)
+
+
+def export_format_for_path(path: str) -> str:
+    """Guess the export format from a file extension (defaults to parquet)."""
+    return "csv" if os.path.splitext(path)[1].lower() == ".csv" else "parquet"
+
+
+def export_participants(output_path: str,
+                        export_format: str | None = None,
+                        test_id_cutoff: int | None = None,
+                        total_segments: int = DEFAULT_SCAN_SEGMENTS,
+                        progress_callback=None) -> int:
+    """Export the participant table to a Parquet (zstd) or CSV file.
+
+    progress_callback(rows, pages, rows_per_second) is called after each page.
+    Returns the number of rows written.
+    """
+    export_format = export_format or export_format_for_path(output_path)
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{export_format}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+
+    total_segments = max(1, int(total_segments))
+    scan_kwargs = build_scan_kwargs(EXPORT_COLUMNS, test_id_cutoff)
+    chunk_dir = tempfile.mkdtemp(prefix="export_", dir=get_cache_dir())
+
+    lock = threading.Lock()
+    counts = {"rows": 0, "pages": 0}
+    started = time.monotonic()
+
+    def export_segment(segment: int) -> None:
+        for page_number, items in enumerate(scan_pages(segment, total_segments, scan_kwargs)):
+            df = _page_to_frame(items)
+            if test_id_cutoff is not None:
+                df = df.filter(pl.col("participant_id") < test_id_cutoff)
+            df.write_ipc(os.path.join(chunk_dir, f"segment{segment:03d}_page{page_number:06d}.arrow"))
+
+            with lock:
+                counts["rows"] += df.height
+                counts["pages"] += 1
+                rows, pages = counts["rows"], counts["pages"]
+            if progress_callback is not None:
+                elapsed = max(time.monotonic() - started, 1e-6)
+                progress_callback(rows, pages, rows / elapsed)
+
+    try:
+        with ThreadPoolExecutor(max_workers=total_segments) as executor:
+            for future in [executor.submit(export_segment, segment) for segment in range(total_segments)]:
+                future.result()
+
+        chunk_files = sorted(os.listdir(chunk_dir))
+        if chunk_files:
+            lazy_df = pl.scan_ipc([os.path.join(chunk_dir, name) for name in chunk_files])
+        else:
+            lazy_df = pl.LazyFrame(schema=EXPORT_SCHEMA)
+
+        # Write next to the destination and swap it in, so a failed export never leaves a partial file
+        tmp_path = f"{output_path}.tmp"
+        try:
+            if export_format == "parquet":
+                lazy_df.sink_parquet(tmp_path, compression="zstd")
+            else:
+                lazy_df.sink_csv(tmp_path)
+            os.replace(tmp_path, output_path)
+        except Exception:
+            # Don't leave a half-written .tmp file next to the destination
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    finally:
+        shutil.rmtree(chunk_dir, ignore_errors=True)
+
+    return counts["rows"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the participant table to Parquet or CSV.")
+    parser.add_argument("output_path", help="Destination file (.parquet or .csv)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default=None, help="Output format (default: from the file extension)")
+    parser.add_argument("--exclude-test-ids", action="store_true", help="Leave out test participants (IDs at or above test_id_cutoff)")
+    parser.add_argument("--segments", type=int, default=DEFAULT_SCAN_SEGMENTS, help="Number of parallel scan segments")
+    args = parser.parse_args()
+
+    test_id_cutoff = get_config().test_id_cutoff if args.exclude_test_ids else None
+
+    def print_progress(rows: int, pages: int, rows_per_second: float) -> None:
+        print(f"\r{rows} rows from {pages} pages ({rows_per_second:.0f} rows/s)", end="", flush=True)
+
+    rows = export_participants(args.output_path, args.format, test_id_cutoff, args.segments, print_progress)
+    print(f"\nExported {rows} participants to {args.output_path}")
+
+
+if __name__ == "__main__":
+    main()
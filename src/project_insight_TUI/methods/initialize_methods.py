@@ -1,10 +1,183 @@
 import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
 
+ENV_PATH = '.env'
+
+REQUIRED_VARS = ['aws_access_key_id', 'aws_secret_access_key', 'region', 'table_name']
+PATH_VARS = ["qualtrics_survey_1a_path", "qualtrics_survey_1b_path", "qualtrics_survey_2_path",
+             "qualtrics_survey_3_path", "qualtrics_survey_4_path", "participant_db_path"]
+
+# Variables that the shared AWS session/clients are built from
+SESSION_VARS = ['aws_access_key_id', 'aws_secret_access_key', 'region', 'table_name']
+
+# Participant IDs at or above this number are test accounts and are left out
+# of reports. Override with test_id_cutoff in the .env file.
+DEFAULT_TEST_ID_CUTOFF = 99
+
+# SNS SMS sends per second allowed for the account (the SNS default is 20).
+# Override with sms_tps in the .env file if AWS raised the quota.
+DEFAULT_SMS_TPS = 20
+
+# Directory (relative to the working directory, like .env) for local caches.
+# Override with cache_dir in the .env file.
+DEFAULT_CACHE_DIR = '.insight_cache'
+
+# How often (in seconds) the cached config re-checks the .env file's mtime.
+# Writes made through this module refresh the cache immediately.
+CONFIG_RECHECK_INTERVAL = 1.0
+
+
+@dataclass(frozen=True)
+class EnvConfig:
+    """Typed, read-only view of the .env file."""
+    aws_access_key_id: str | None = None
+    aws_secret_access_key: str | None = None
+    region: str | None = None
+    table_name: str | None = None
+    qualtrics_survey_1a_path: str | None = None
+    qualtrics_survey_1b_path: str | None = None
+    qualtrics_survey_2_path: str | None = None
+    qualtrics_survey_3_path: str | None = None
+    qualtrics_survey_4_path: str | None = None
+    participant_db_path: str | None = None
+    # Every key in the file, in file order (includes the typed fields above)
+    values: dict = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_values(cls, values: dict) -> "EnvConfig":
+        typed = {name: values.get(name) or None for name in cls.__dataclass_fields__ if name != 'values'}
+        return cls(values=dict(values), **typed)
+
+    def get(self, key: str, default=None):
+        return self.values.get(key, default)
+
+    def as_dict(self) -> dict:
+        return dict(self.values)
+
+    def missing(self, names: list[str] = REQUIRED_VARS) -> list[str]:
+        return [name for name in names if not self.values.get(name)]
+
+    @property
+    def test_id_cutoff(self) -> int:
+        try:
+            return int(self.values.get('test_id_cutoff', DEFAULT_TEST_ID_CUTOFF))
+        except ValueError:
+            return DEFAULT_TEST_ID_CUTOFF
+
+    @property
+    def sms_tps(self) -> float:
+        try:
+            return float(self.values.get('sms_tps', DEFAULT_SMS_TPS))
+        except ValueError:
+            return DEFAULT_SMS_TPS
+
+
+_config_lock = threading.Lock()
+_config_cache = {
+    'config': None,
+    'mtime_ns': None,
+    'size': None,
+    'checked_at': 0.0,
+}
+
+
+def _parse_env_file(path: str) -> dict:
+    env_vars = {}
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#') and '=' in line:
+                key, value = line.split('=', 1)
+                env_vars[key.strip()] = value.strip()
+    return env_vars
+
+
+def _write_env_file(env_vars: dict) -> None:
+    """Atomically replace the .env file and refresh the cached config."""
+    env_dir = os.path.dirname(os.path.abspath(ENV_PATH))
+    fd, tmp_path = tempfile.mkstemp(prefix='.env.', suffix='.tmp', dir=env_dir)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            for key, value in env_vars.items():
+                f.write(f"{key}={value}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, ENV_PATH)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    stat = os.stat(ENV_PATH)
+    with _config_lock:
+        _config_cache['config'] = EnvConfig.from_values(env_vars)
+        _config_cache['mtime_ns'] = stat.st_mtime_ns
+        _config_cache['size'] = stat.st_size
+        _config_cache['checked_at'] = time.monotonic()
+
+
+def get_config() -> EnvConfig:
+    """Get the cached config, re-reading the .env file only when it has changed on disk.
+
+    Raises FileNotFoundError if there is no .env file.
+    """
+    now = time.monotonic()
+    with _config_lock:
+        cached = _config_cache['config']
+        if cached is not None and now - _config_cache['checked_at'] < CONFIG_RECHECK_INTERVAL:
+            return cached
+
+    try:
+        stat = os.stat(ENV_PATH)
+    except FileNotFoundError:
+        invalidate_config()
+        raise
+
+    with _config_lock:
+        if (_config_cache['config'] is None
+                or _config_cache['mtime_ns'] != stat.st_mtime_ns
+                or _config_cache['size'] != stat.st_size):
+            _config_cache['config'] = EnvConfig.from_values(_parse_env_file(ENV_PATH))
+            _config_cache['mtime_ns'] = stat.st_mtime_ns
+            _config_cache['size'] = stat.st_size
+        _config_cache['checked_at'] = now
+        return _config_cache['config']
+
+
+def invalidate_config() -> None:
+    """Force the next get_config() call to re-read the .env file."""
+    with _config_lock:
+        _config_cache['config'] = None
+        _config_cache['mtime_ns'] = None
+        _config_cache['size'] = None
+        _config_cache['checked_at'] = 0.0
+
+
+def _reset_session_if_needed(variables) -> None:
+    # Rebuild the shared AWS session/clients if the credentials changed
+    if any(variable in SESSION_VARS for variable in variables):
+        from ..methods.session_methods import reset_session
+        reset_session()
+
+
+def get_cache_dir() -> str:
+    """Get (and create) the directory used for local caches and queues."""
+    try:
+        cache_dir = get_config().get('cache_dir') or DEFAULT_CACHE_DIR
+    except FileNotFoundError:
+        cache_dir = DEFAULT_CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
 # Function to see if there is a .env file in the current directory
 def check_env_file_exists() -> bool:
     load_dotenv()  # Load environment variables from .env file if it exists
-    return os.path.exists('.env')  # Check if .env file exists in the current directory
+    return os.path.exists(ENV_PATH)  # Check if .env file exists in the current directory
 
 def check_env_variables() -> tuple[bool, str]:
     """
@@ -12,35 +185,23 @@ def check_env_variables() -> tuple[bool, str]:
     Returns (success: bool, message: str) tuple.
     """
     current_dir = os.getcwd()
-    env_path = os.path.join(current_dir, '.env')
-    
+
     # Check if .env file exists first
-    if not os.path.exists('.env'):
+    if not os.path.exists(ENV_PATH):
         return False, f"No .env file found in current directory: {current_dir}"
-    
-    # Read the .env file directly to check only those variables
-    env_vars = {}
+
+    # Check only the variables in the .env file
     try:
-        with open('.env', 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    env_vars[key.strip()] = value.strip()
+        config = get_config()
     except Exception as e:
         return False, f"Error reading .env file: {e}"
-    
-    required_vars = ['aws_access_key_id', 'aws_secret_access_key', 'region', 'table_name']
-    missing_vars = []
-    
-    for var in required_vars:
-        if var not in env_vars or not env_vars[var]:
-            missing_vars.append(var)
-    
+
+    missing_vars = config.missing(REQUIRED_VARS)
+
     if missing_vars:
         return False, f"Missing environment variables: {', '.join(missing_vars)}"
     else:
-        return True, f"All required environment variables found: {', '.join(required_vars)}"
+        return True, f"All required environment variables found: {', '.join(REQUIRED_VARS)}"
 
 def create_env_file(aws_access_key_id: str,
                     aws_secret_access_key: str,
@@ -52,80 +213,54 @@ def create_env_file(aws_access_key_id: str,
                     qualtrics_survey_4_path: str = None,
                     participant_db: str = None):
     # Create a .env file with the provided environment variables
-    with open('.env', 'w') as f:
-        f.write(f"aws_access_key_id={aws_access_key_id}\n")
-        f.write(f"aws_secret_access_key={aws_secret_access_key}\n")
-        f.write(f"region=us-east-1\n")
-        f.write(f"table_name={table_name}\n")
-        
-        # Optional Qualtrics survey paths
-        if qualtrics_survey_1a_path is not None:
-            f.write(f"qualtrics_survey_1a_path={qualtrics_survey_1a_path}\n")
-        if qualtrics_survey_1b_path is not None:
-            f.write(f"qualtrics_survey_1b_path={qualtrics_survey_1b_path}\n")
-        if qualtrics_survey_2_path is not None:
-            f.write(f"qualtrics_survey_2_path={qualtrics_survey_2_path}\n")
-        if qualtrics_survey_3_path is not None:
-            f.write(f"qualtrics_survey_3_path={qualtrics_survey_3_path}\n")
-        if qualtrics_survey_4_path is not None:
-            f.write(f"qualtrics_survey_4_path={qualtrics_survey_4_path}\n")
-        if participant_db is not None:
-            f.write(f"participant_db={participant_db}\n")
-            
+    env_vars = {
+        "aws_access_key_id": aws_access_key_id,
+        "aws_secret_access_key": aws_secret_access_key,
+        "region": "us-east-1",
+        "table_name": table_name,
+    }
+
+    # Optional Qualtrics survey paths
+    if qualtrics_survey_1a_path is not None:
+        env_vars["qualtrics_survey_1a_path"] = qualtrics_survey_1a_path
+    if qualtrics_survey_1b_path is not None:
+        env_vars["qualtrics_survey_1b_path"] = qualtrics_survey_1b_path
+    if qualtrics_survey_2_path is not None:
+        env_vars["qualtrics_survey_2_path"] = qualtrics_survey_2_path
+    if qualtrics_survey_3_path is not None:
+        env_vars["qualtrics_survey_3_path"] = qualtrics_survey_3_path
+    if qualtrics_survey_4_path is not None:
+        env_vars["qualtrics_survey_4_path"] = qualtrics_survey_4_path
+    if participant_db is not None:
+        env_vars["participant_db_path"] = participant_db
+
+    _write_env_file(env_vars)
+    _reset_session_if_needed(env_vars.keys())
+
 def check_incomplete_env_file():
     """See what required variables are missing from the .env file."""
-    # Read the .env file directly to check only those variables
-    env_vars = {}
-    with open('.env', 'r') as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#') and '=' in line:
-                key, value = line.split('=', 1)
-                env_vars[key.strip()] = value.strip()
-    
-    missing_vars = []
-    required_vars = ['aws_access_key_id', 'aws_secret_access_key', 'region', 'table_name']
-    for var in required_vars:
-        if var not in env_vars or not env_vars[var]:
-            missing_vars.append(var)
-    return missing_vars
+    return get_config().missing(REQUIRED_VARS)
 
 def update_env_variable(variable: str, value: str):
     """Update a specific environment variable in the .env file."""
-    # Load existing environment variables
-    load_dotenv()
-    
-    # Write the updated variable to the .env file
-    with open('.env', 'a') as f:
-        f.write(f"\n{variable}={value}\n")
-        
+    env_vars = get_config().as_dict()
+    env_vars[variable] = value
+    _write_env_file(env_vars)
+    _reset_session_if_needed([variable])
+
 def get_env_variables() -> dict:
     """Get all environment variables from the .env file."""
-    env_vars = {}
-    
-    load_dotenv()  # Load environment variables from .env file if it exists
-    with open('.env', 'r') as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#') and '=' in line:
-                key, value = line.split('=', 1)
-                env_vars[key.strip()] = value.strip()
-    return env_vars
+    return get_config().as_dict()
 
 def update_or_create_env_var(env_vars: dict, variable: str, value: str):
     """Update an existing environment variable or create a new one in the .env file."""
-    # Load existing environment variables
-    load_dotenv()
+    # Keep the caller's copy in sync with what gets written
+    env_vars[variable] = value
 
-    # Check if the variable already exists in the local env file
-    if variable in env_vars:
-        # Update the existing variable
-        env_vars[variable] = value
-    else:
-        # Create a new variable
-        env_vars[variable] = value
+    # Start from what is on disk so edits made elsewhere are not overwritten
+    current_vars = get_config().as_dict() if os.path.exists(ENV_PATH) else dict(env_vars)
+    current_vars[variable] = value
 
     # Write all environment variables back to the .env file
-    with open('.env', 'w') as f:
-        for key, value in env_vars.items():
-            f.write(f"{key}={value}\n")
\ No newline at end of file
+    _write_env_file(current_vars)
+    _reset_session_if_needed([variable])
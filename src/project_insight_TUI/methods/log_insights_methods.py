@@ -0,0 +1,181 @@
+"""CloudWatch Logs Insights engine for survey send times.
+
+Instead of describing every log group's streams, one Logs Insights query is
+run across all the schedule Lambda log groups for the whole window. It
+returns the earliest event of each log group per hour, and the earliest of
+those per New York date is that survey's send time. Wide date ranges then
+cost one query rather than dozens of paginated describe_log_streams calls.
+
+For offline testing, set send_time_log_file in the .env file to a JSON lines
+file with one {"log_group": ..., "timestamp": <epoch ms>} object per log
+event; it is used instead of CloudWatch.
+"""
+import json
+import os
+import time
+import polars as pl
+from ..methods.initialize_methods import get_config
+from ..methods.log_methods import LOG_TIMEZONE
+from ..methods.schedule_methods import SCHEDULES
+from ..methods.session_methods import get_logs_client
+
+# Earliest event per log group and hour. Hours (not days) because Insights bins
+# in UTC, and the study day is a New York date.
+INSIGHTS_QUERY = "fields @timestamp, @log | stats min(@timestamp) as first_event by @log, bin(1h)"
+
+# A Logs Insights query can span at most 50 log groups
+MAX_INSIGHTS_LOG_GROUPS = 50
+
+# Rows returned per query (the Logs Insights maximum)
+INSIGHTS_RESULT_LIMIT = 10000
+
+# Smallest window a truncated query is split down to. One hour holds at most
+# one row per log group, far below the result limit.
+MIN_INSIGHTS_WINDOW_MS = 60 * 60 * 1000
+
+INSIGHTS_POLL_INTERVAL = 1.0  # seconds between get_query_results calls
+INSIGHTS_TIMEOUT = 120        # seconds before a running query is stopped
+
+INSIGHTS_EVENT_SCHEMA = {"log_group": pl.Utf8, "first_event_ms": pl.Int64}
+
+SEND_TIME_ROW_SCHEMA = {
+    "schedule_type": pl.Utf8,
+    "survey": pl.Int64,
+    "log_group": pl.Utf8,
+    "send_date": pl.Utf8,
+    "first_event_ms": pl.Int64,
+}
+
+# Log group -> (schedule name, survey number)
+SURVEYS_BY_LOG_GROUP = {
+    log_group_name: (schedule_type, survey)
+    for schedule_type, schedule in SCHEDULES.items()
+    for survey, log_group_name in enumerate(schedule.log_groups, start=1)
+}
+
+
+def insights_results_to_frame(results: list[list[dict]]) -> pl.DataFrame:
+    """Turn get_query_results rows into (log_group, first_event_ms).
+
+    @log comes back as "<account id>:<log group name>" and first_event as a
+    UTC "YYYY-MM-DD HH:MM:SS.mmm" string."""
+    rows = []
+    for result in results:
+        fields = {field["field"]: field.get("value") for field in result}
+        if fields.get("@log") and fields.get("first_event"):
+            rows.append((fields["@log"].split(":", 1)[-1], fields["first_event"]))
+    if not rows:
+        return pl.DataFrame(schema=INSIGHTS_EVENT_SCHEMA)
+    return pl.DataFrame(rows, schema={"log_group": pl.Utf8, "first_event": pl.Utf8}, orient="row").select(
+        "log_group",
+        pl.col("first_event").str.strptime(pl.Datetime("ms"), "%Y-%m-%d %H:%M:%S%.f", strict=False)
+        .dt.replace_time_zone("UTC").dt.epoch(time_unit="ms").alias("first_event_ms"),
+    ).drop_nulls()
+
+
+def earliest_send_times(events_df: pl.DataFrame) -> pl.DataFrame:
+    """Earliest event per log group and New York date, labelled with its
+    schedule and survey. Log groups that are not survey messages are dropped."""
+    labels_df = pl.DataFrame(
+        [(log_group_name, schedule_type, survey) for log_group_name, (schedule_type, survey) in SURVEYS_BY_LOG_GROUP.items()],
+        schema={"log_group": pl.Utf8, "schedule_type": pl.Utf8, "survey": pl.Int64}, orient="row"
+    )
+    return events_df.join(labels_df, on="log_group", how="inner").with_columns(
+        pl.from_epoch(pl.col("first_event_ms"), time_unit="ms").dt.replace_time_zone("UTC")
+        .dt.convert_time_zone(LOG_TIMEZONE).dt.strftime("%Y-%m-%d").alias("send_date")
+    ).group_by(["schedule_type", "survey", "log_group", "send_date"]).agg(
+        pl.col("first_event_ms").min()
+    ).select(list(SEND_TIME_ROW_SCHEMA))
+
+
+class CloudWatchInsightsSource:
+    """Runs INSIGHTS_QUERY with Logs Insights and polls it until it finishes."""
+
+    def __init__(self, poll_interval: float = INSIGHTS_POLL_INTERVAL, timeout: float = INSIGHTS_TIMEOUT) -> None:
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+    def _run_query(self, log_group_names: list[str], start_ms: int, end_ms: int) -> list[list[dict]]:
+        logs = get_logs_client()
+        query_id = logs.start_query(
+            logGroupNames=log_group_names,
+            startTime=start_ms // 1000,
+            endTime=end_ms // 1000 + 1,
+            queryString=INSIGHTS_QUERY,
+            limit=INSIGHTS_RESULT_LIMIT,
+        )["queryId"]
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            response = logs.get_query_results(queryId=query_id)
+            status = response.get("status")
+            if status == "Complete":
+                return response.get("results", [])
+            if status in ("Failed", "Cancelled", "Timeout", "Unknown"):
+                raise RuntimeError(f"Logs Insights query {query_id} ended with status {status}")
+            if time.monotonic() > deadline:
+                try:
+                    logs.stop_query(queryId=query_id)
+                except Exception as e:
+                    print(f"Could not stop Logs Insights query {query_id}: {e}")
+                raise TimeoutError(f"Logs Insights query {query_id} did not finish in {self.timeout} seconds")
+            time.sleep(self.poll_interval)
+
+    def _query_window(self, log_group_names: list[str], start_ms: int, end_ms: int) -> list[list[dict]]:
+        """Rows for [start_ms, end_ms]. A result that hit the row limit may be missing
+        rows, so the window is split in half and each half queried on its own."""
+        results = self._run_query(log_group_names, start_ms, end_ms)
+        if len(results) < INSIGHTS_RESULT_LIMIT:
+            return results
+        if end_ms - start_ms <= MIN_INSIGHTS_WINDOW_MS:
+            raise RuntimeError(f"Logs Insights query for {start_ms}-{end_ms} returned {len(results)} rows "
+                               f"(the limit) and cannot be split further")
+        middle_ms = start_ms + (end_ms - start_ms) // 2
+        return (self._query_window(log_group_names, start_ms, middle_ms)
+                + self._query_window(log_group_names, middle_ms + 1, end_ms))
+
+    def query(self, log_group_names: list[str], start_ms: int, end_ms: int) -> pl.DataFrame:
+        """Earliest event per log group and hour in [start_ms, end_ms], as (log_group, first_event_ms)."""
+        frames = [
+            insights_results_to_frame(self._query_window(log_group_names[idx:idx + MAX_INSIGHTS_LOG_GROUPS], start_ms, end_ms))
+            for idx in range(0, len(log_group_names), MAX_INSIGHTS_LOG_GROUPS)
+        ]
+        return pl.concat(frames) if frames else pl.DataFrame(schema=INSIGHTS_EVENT_SCHEMA)
+
+
+class LocalInsightsSource:
+    """Answers the same query from a JSON lines file of log events."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def query(self, log_group_names: list[str], start_ms: int, end_ms: int) -> pl.DataFrame:
+        wanted = set(log_group_names)
+        rows = []
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        event = json.loads(line)
+                        timestamp = int(event["timestamp"])
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                    if event.get("log_group") in wanted and start_ms <= timestamp <= end_ms:
+                        rows.append((event["log_group"], timestamp))
+        if not rows:
+            return pl.DataFrame(schema=INSIGHTS_EVENT_SCHEMA)
+        return pl.DataFrame(rows, schema=INSIGHTS_EVENT_SCHEMA, orient="row").group_by(
+            "log_group", (pl.col("first_event_ms") // (60 * 60 * 1000)).alias("_hour")
+        ).agg(pl.col("first_event_ms").min().alias("_first")).select(
+            "log_group", pl.col("_first").alias("first_event_ms")
+        )
+
+
+def default_insights_source():
+    local_file = get_config().get("send_time_log_file")
+    if local_file:
+        return LocalInsightsSource(local_file)
+    return CloudWatchInsightsSource()
@@ -0,0 +1,132 @@
+"""CloudWatch Logs access for the Lambda send-time logs.
+
+Each schedule has four Lambda functions (one per daily survey message), and
+the first event of each day's log stream is the time that message was sent.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import polars as pl
+import pytz
+from ..methods.session_methods import get_logs_client, MAX_POOL_CONNECTIONS
+from ..methods.schedule_methods import SCHEDULES
+
+# Log groups of each schedule, survey 1 first
+LOG_GROUPS_BY_SCHEDULE = {name: schedule.log_groups for name, schedule in SCHEDULES.items()}
+
+# Log groups fetched at once; all of them share the pooled logs client
+MAX_LOG_FETCH_WORKERS = min(12, MAX_POOL_CONNECTIONS)
+
+LOG_TIMEZONE = "America/New_York"
+
+STREAM_TIMESTAMP_COLUMNS = ['firstEventTimestamp', 'lastEventTimestamp', 'creationTime']
+
+# describe_log_streams returns at most 50 streams per page
+LOG_STREAM_PAGE_SIZE = 50
+
+
+def to_epoch_ms(value: date | datetime | None) -> int | None:
+    """Epoch milliseconds for a date (midnight in America/New_York) or datetime (naive = New York time)."""
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if value.tzinfo is None:
+        value = pytz.timezone(LOG_TIMEZONE).localize(value)
+    return int(value.timestamp() * 1000)
+
+
+def log_streams_to_frame(log_streams: list[dict]) -> pl.DataFrame:
+    """Log streams from describe_log_streams as a frame, with the epoch-ms
+    timestamps converted to America/New_York datetimes."""
+    if log_streams:
+        log_stream_df = pl.DataFrame(log_streams, infer_schema_length=None)
+    else:
+        log_stream_df = pl.DataFrame(schema={'logStreamName': pl.Utf8})
+    for column in STREAM_TIMESTAMP_COLUMNS:
+        if column not in log_stream_df.columns:
+            log_stream_df = log_stream_df.with_columns(pl.lit(None, dtype=pl.Int64).alias(column))
+
+    return log_stream_df.with_columns(
+        pl.from_epoch(pl.col(column), time_unit="ms").dt.replace_time_zone("UTC").dt.convert_time_zone(LOG_TIMEZONE).alias(column)
+        for column in STREAM_TIMESTAMP_COLUMNS
+    )
+
+
+def iter_log_stream_pages(log_group_name: str, since: date | datetime | None = None):
+    """Yield pages of log streams, most recent activity first, following nextToken.
+
+    Streams are ordered by LastEventTime descending, so once a page reaches a
+    stream whose last event is before `since`, every later page is older still
+    and the iteration stops there."""
+    logs = get_logs_client()
+    since_ms = to_epoch_ms(since)
+    kwargs = {
+        'logGroupName': log_group_name,
+        'orderBy': 'LastEventTime',
+        'descending': True,
+        'limit': LOG_STREAM_PAGE_SIZE,
+    }
+    while True:
+        response = logs.describe_log_streams(**kwargs)
+        log_streams = response.get('logStreams', [])
+        if log_streams:
+            yield log_streams
+
+        if since_ms is not None and log_streams:
+            oldest = log_streams[-1].get('lastEventTimestamp', log_streams[-1].get('creationTime'))
+            if oldest is not None and oldest < since_ms:
+                break
+        next_token = response.get('nextToken')
+        if not next_token:
+            break
+        kwargs['nextToken'] = next_token
+
+
+def log_stream_prefixes(day: date) -> list[str]:
+    """logStreamNamePrefix values that cover the streams of one New York date.
+    Lambda names streams "YYYY/MM/DD/[$LATEST]..." by UTC date, so a New York
+    day can start streams on that UTC date or the next one."""
+    return [f"{utc_day:%Y/%m/%d}/[$LATEST]" for utc_day in (day, day + timedelta(days=1))]
+
+
+def describe_log_streams_prefix(log_group_name: str, prefix: str) -> list[dict]:
+    """All streams of a log group whose name starts with prefix, following nextToken."""
+    logs = get_logs_client()
+    kwargs = {
+        'logGroupName': log_group_name,
+        'logStreamNamePrefix': prefix,
+        'limit': LOG_STREAM_PAGE_SIZE,
+    }
+    log_streams = []
+    while True:
+        response = logs.describe_log_streams(**kwargs)
+        log_streams.extend(response.get('logStreams', []))
+        next_token = response.get('nextToken')
+        if not next_token:
+            return log_streams
+        kwargs['nextToken'] = next_token
+
+
+def describe_log_streams_on_dates(dates_by_group: dict) -> dict:
+    """Streams whose first event falls on the given New York dates, for several
+    log groups: {log_group_name: [dates]} -> {log_group_name: frame}.
+
+    Only the streams named for those days are requested, with one prefix query
+    per (log group, UTC day). All of them run concurrently on one bounded pool."""
+    tasks = [(log_group_name, prefix)
+             for log_group_name, dates in dates_by_group.items()
+             for prefix in sorted({prefix for day in dates for prefix in log_stream_prefixes(day)})]
+    streams_by_group = {log_group_name: [] for log_group_name in dates_by_group}
+    if tasks:
+        with ThreadPoolExecutor(max_workers=min(MAX_LOG_FETCH_WORKERS, len(tasks))) as executor:
+            futures = [(log_group_name, executor.submit(describe_log_streams_prefix, log_group_name, prefix))
+                       for log_group_name, prefix in tasks]
+            for log_group_name, future in futures:
+                streams_by_group[log_group_name].extend(future.result())
+
+    return {
+        log_group_name: log_streams_to_frame(log_streams).filter(
+            pl.col('firstEventTimestamp').dt.date().is_in(list(dates_by_group[log_group_name]))
+        )
+        for log_group_name, log_streams in streams_by_group.items()
+    }
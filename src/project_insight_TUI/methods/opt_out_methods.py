@@ -0,0 +1,96 @@
+"""Cached list of phone numbers that have opted out of SMS.
+
+SNS will not deliver to a number that replied STOP, but a publish to it still
+costs a round trip. The full opt-out list is paged through once with
+list_phone_numbers_opted_out, kept as a set and re-fetched after
+OPT_OUT_TTL_SECONDS (override with opt_out_ttl in the .env file).
+"""
+import threading
+import time
+from ..methods.initialize_methods import get_config
+from ..methods.session_methods import get_sns_client
+
+OPT_OUT_TTL_SECONDS = 60 * 60
+
+
+def normalize_phone_number(phone_number: str | None) -> str:
+    """Compare numbers as +<digits>, the way SNS lists them."""
+    if not phone_number:
+        return ""
+    digits = "".join(character for character in str(phone_number) if character.isdigit())
+    return f"+{digits}"
+
+
+class OptOutCache:
+    def __init__(self, ttl: float | None = None) -> None:
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._numbers = set()
+        self._fetched_at = None
+
+    def _ttl(self) -> float:
+        if self.ttl is not None:
+            return self.ttl
+        try:
+            return float(get_config().get("opt_out_ttl", OPT_OUT_TTL_SECONDS))
+        except ValueError:
+            return OPT_OUT_TTL_SECONDS
+
+    def refresh(self) -> set:
+        """Page through every opted-out number and replace the cached set."""
+        sns = get_sns_client()
+        numbers = set()
+        kwargs = {}
+        while True:
+            response = sns.list_phone_numbers_opted_out(**kwargs)
+            numbers.update(normalize_phone_number(number) for number in response.get("phoneNumbers", []))
+            next_token = response.get("nextToken")
+            if not next_token:
+                break
+            kwargs["nextToken"] = next_token
+        with self._lock:
+            self._numbers = numbers
+            self._fetched_at = time.monotonic()
+        return numbers
+
+    def numbers(self) -> set:
+        """The cached opt-out set, re-fetched once the TTL has passed.
+        If SNS cannot be reached the last known set (possibly empty) is used."""
+        # Only one thread re-fetches; the others wait for it and use its result
+        with self._refresh_lock:
+            with self._lock:
+                if self._fetched_at is not None and time.monotonic() - self._fetched_at < self._ttl():
+                    return self._numbers
+            try:
+                return self.refresh()
+            except Exception as e:
+                print(f"Could not load the SMS opt-out list: {e}")
+                with self._lock:
+                    # Do not retry on every message while SNS is unreachable
+                    self._fetched_at = time.monotonic()
+                    return self._numbers
+
+    def is_opted_out(self, phone_number: str) -> bool:
+        return normalize_phone_number(phone_number) in self.numbers()
+
+    def mark_opted_out(self, phone_number: str) -> None:
+        with self._lock:
+            self._numbers.add(normalize_phone_number(phone_number))
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._fetched_at = None
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_opt_out_cache() -> OptOutCache:
+    """Get the process-wide opt-out cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = OptOutCache()
+        return _cache
@@ -0,0 +1,79 @@
+"""Run-scoped state for one compliance report.
+
+A ReportContext is created at the start of generate_compliance_report and
+passed through the pipeline. It carries the AWS session and lazily loads the
+roster, the send-time frame and the survey CSVs the first time they are asked
+for, so each remote resource is read once per report however many steps use
+it. fetch_counts records how many times each resource was actually loaded.
+"""
+import threading
+from collections import Counter
+import polars as pl
+from ..methods.initialize_methods import get_config
+from ..methods.roster_methods import scan_roster, REPORT_COLUMNS
+from ..methods.send_time_methods import get_send_time_store
+from ..methods.session_methods import get_session
+
+
+def clean_survey_df(survey: pl.DataFrame) -> pl.DataFrame:
+    """Convert a Qualtrics export's Date/Time (Denver) to New York Date and Time
+    strings and strip whitespace and punctuation from Name."""
+    survey = survey.with_columns(
+        pl.col("Date/Time").str.strptime(pl.Datetime, "%Y-%m-%d %H:%M:%S", strict=False).alias("Date/Time")
+    )
+    survey = survey.with_columns(
+        pl.col("Date/Time").dt.replace_time_zone("America/Denver").dt.convert_time_zone("America/New_York").alias("Date/Time")
+    )
+    survey = survey.with_columns(
+        pl.col("Date/Time").dt.strftime("%Y-%m-%d").alias("Date"),
+        pl.col("Date/Time").dt.strftime("%H:%M:%S").alias("Time")
+    )
+    return survey.with_columns(
+        pl.col("Name").str.strip_chars().str.replace_all(r"[^\w\s]", "").alias("Name")
+    )
+
+
+def load_survey_frames(config=None) -> tuple[pl.DataFrame, list[pl.DataFrame]]:
+    """Read the participant database and the five survey CSVs.
+    Returns (db_df, [survey_1a, survey_1b, survey_2, survey_3, survey_4])."""
+    config = config or get_config()
+    db_df = pl.read_csv(config.participant_db_path)
+    survey_paths = [config.qualtrics_survey_1a_path, config.qualtrics_survey_1b_path, config.qualtrics_survey_2_path,
+                    config.qualtrics_survey_3_path, config.qualtrics_survey_4_path]
+    survey_list = [clean_survey_df(pl.read_csv(path, schema_overrides={"Date/Time": str})) for path in survey_paths]
+    return db_df, survey_list
+
+
+class ReportContext:
+    def __init__(self, session=None) -> None:
+        self.session = session or get_session()
+        self.config = get_config()
+        self.fetch_counts = Counter()
+        self._resources = {}
+        self._lock = threading.RLock()
+
+    def _fetch(self, key, loader, *args, **kwargs):
+        with self._lock:
+            if key not in self._resources:
+                self.fetch_counts[key[0] if isinstance(key, tuple) else key] += 1
+                self._resources[key] = loader(*args, **kwargs)
+            return self._resources[key]
+
+    def roster(self) -> pl.DataFrame:
+        """Non-test participants, with the attributes the report reads."""
+        return self._fetch("roster", scan_roster, columns=REPORT_COLUMNS, test_id_cutoff=self.config.test_id_cutoff)
+
+    def send_times(self, start, end) -> pl.DataFrame:
+        """Long send-time frame (schedule_type, survey, date, time) for [start, end]."""
+        return self._fetch(("send_times", str(start), str(end)), get_send_time_store().send_times, start, end)
+
+    def survey_frames(self) -> tuple[pl.DataFrame, list[pl.DataFrame]]:
+        """(db_df, cleaned survey frames), see load_survey_frames."""
+        try:
+            return self._fetch("survey_frames", load_survey_frames, self.config)
+        except Exception as e:
+            print(f"Error loading CSV files: {e}. Please check if you have Google Drive open and are logged in.")
+            raise
+
+    def summary(self) -> str:
+        return ", ".join(f"{name}: {count}" for name, count in sorted(self.fetch_counts.items()))
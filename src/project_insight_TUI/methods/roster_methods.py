@@ -0,0 +1,180 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+import polars as pl
+from boto3.dynamodb.conditions import Attr
+from ..methods.session_methods import get_dynamodb_table
+from ..methods.schedule_methods import SCHEDULES
+
+# Attributes stored for every participant in the SMS table
+ROSTER_COLUMNS = ["participant_id", "study_start_date", "study_end_date", "phone_number", "schedule_type", "lb_link"]
+
+SCHEDULE_TYPES = list(SCHEDULES)
+
+# The study runs 14 days, so the end date is 13 days after the start date
+STUDY_END_OFFSET_DAYS = 13
+
+# Attributes the report pipeline actually reads
+REPORT_COLUMNS = ["participant_id", "study_start_date", "study_end_date", "schedule_type"]
+
+# Number of parallel scan segments used to load the roster. Each segment is
+# scanned on its own thread and follows its own pagination.
+DEFAULT_SCAN_SEGMENTS = 4
+
+
+def normalize_roster_df(df: pl.DataFrame) -> pl.DataFrame:
+    """Cast a raw roster frame to the typed schema the report pipeline uses
+    (participant_id as Int64, study dates as Date)."""
+    for column in ROSTER_COLUMNS:
+        if column not in df.columns:
+            df = df.with_columns(pl.lit(None, dtype=pl.Utf8).alias(column))
+
+    return df.with_columns(
+        pl.col("participant_id").cast(pl.Utf8).str.strip_chars().cast(pl.Int64, strict=False),
+        pl.col("study_start_date").cast(pl.Utf8).str.strptime(pl.Date, format="%Y-%m-%d", strict=False),
+        pl.col("study_end_date").cast(pl.Utf8).str.strptime(pl.Date, format="%Y-%m-%d", strict=False),
+    )
+
+
+def test_id_filter(test_id_cutoff: int):
+    """DynamoDB filter that drops participant IDs that are certainly at or above
+    test_id_cutoff. It may keep a few that are not below it, so callers still
+    compare the IDs as integers after the scan.
+
+    participant_id is stored as a string, and strings compare lexicographically.
+    A plain ID is below the cutoff when it has fewer digits, or the same number
+    of digits and sorts lower. An ID with leading zeros ("005") sorts below any
+    cutoff, and one with spaces is always kept, so neither is dropped here.
+    IDs stored as numbers are compared directly.
+    """
+    cutoff_str = str(test_id_cutoff)
+    participant_id = Attr("participant_id")
+    as_string = (
+        participant_id.attribute_type("S") & (
+            participant_id.size().lt(len(cutoff_str)) |
+            participant_id.lt(cutoff_str) |
+            participant_id.contains(" ")
+        )
+    )
+    as_number = participant_id.attribute_type("N") & participant_id.lt(test_id_cutoff)
+    return as_string | as_number
+
+
+def active_on_filter(active_on: date | datetime | str):
+    """DynamoDB filter that keeps participants whose study window contains active_on.
+    Dates are stored as YYYY-MM-DD strings, which compare correctly as strings."""
+    if not isinstance(active_on, str):
+        active_on = active_on.strftime("%Y-%m-%d")
+    return Attr("study_start_date").lte(active_on) & Attr("study_end_date").gte(active_on)
+
+
+def build_scan_kwargs(columns: list[str] | None = None,
+                      test_id_cutoff: int | None = None,
+                      active_on: date | datetime | str | None = None,
+                      **scan_kwargs) -> dict:
+    """Build Table.scan() arguments with a ProjectionExpression and FilterExpression
+    so only the needed attributes of the needed participants leave DynamoDB."""
+    kwargs = dict(scan_kwargs)
+
+    if columns:
+        # Placeholders avoid clashes with DynamoDB reserved words; the #p prefix
+        # keeps them apart from the #n placeholders boto3 generates for conditions.
+        names = {f"#p{idx}": column for idx, column in enumerate(columns)}
+        kwargs["ProjectionExpression"] = ", ".join(names.keys())
+        kwargs["ExpressionAttributeNames"] = {**kwargs.get("ExpressionAttributeNames", {}), **names}
+
+    conditions = []
+    if test_id_cutoff is not None:
+        conditions.append(test_id_filter(test_id_cutoff))
+    if active_on is not None:
+        conditions.append(active_on_filter(active_on))
+    if "FilterExpression" in kwargs:
+        conditions.append(kwargs.pop("FilterExpression"))
+
+    if conditions:
+        filter_expression = conditions[0]
+        for condition in conditions[1:]:
+            filter_expression = filter_expression & condition
+        kwargs["FilterExpression"] = filter_expression
+    return kwargs
+
+
+def _items_to_frame(items: list[dict]) -> pl.DataFrame:
+    return pl.DataFrame(items, infer_schema_length=None, strict=False)
+
+
+def scan_pages(segment: int, total_segments: int, scan_kwargs: dict):
+    """Scan one segment to the end, following LastEvaluatedKey, yielding each page's items."""
+    table = get_dynamodb_table()
+    kwargs = dict(scan_kwargs)
+    if total_segments > 1:
+        kwargs["Segment"] = segment
+        kwargs["TotalSegments"] = total_segments
+
+    while True:
+        response = table.scan(**kwargs)
+        items = response.get("Items", [])
+        if items:
+            yield items
+
+        last_evaluated_key = response.get("LastEvaluatedKey")
+        if not last_evaluated_key:
+            break
+        kwargs["ExclusiveStartKey"] = last_evaluated_key
+
+
+def _scan_segment(segment: int, total_segments: int, scan_kwargs: dict) -> list[pl.DataFrame]:
+    """Scan one segment and return one frame per page."""
+    return [_items_to_frame(items) for items in scan_pages(segment, total_segments, scan_kwargs)]
+
+
+def _scan_segment_items(segment: int, total_segments: int, scan_kwargs: dict) -> list[dict]:
+    return [item for items in scan_pages(segment, total_segments, scan_kwargs) for item in items]
+
+
+def scan_items(total_segments: int = DEFAULT_SCAN_SEGMENTS, **scan_kwargs) -> list[dict]:
+    """Same paginated, parallel-segment scan as scan_roster, but returns the raw items."""
+    total_segments = max(1, int(total_segments))
+    if total_segments == 1:
+        return _scan_segment_items(0, 1, scan_kwargs)
+
+    with ThreadPoolExecutor(max_workers=total_segments) as executor:
+        futures = [executor.submit(_scan_segment_items, segment, total_segments, scan_kwargs)
+                   for segment in range(total_segments)]
+        return [item for future in futures for item in future.result()]
+
+
+def scan_roster(total_segments: int = DEFAULT_SCAN_SEGMENTS,
+                columns: list[str] | None = None,
+                test_id_cutoff: int | None = None,
+                active_on: date | datetime | str | None = None,
+                **scan_kwargs) -> pl.DataFrame:
+    """Load the participant table into one typed DataFrame.
+
+    Follows pagination so the roster is never truncated at 1 MB, and runs
+    `total_segments` DynamoDB parallel scan segments on a thread pool.
+    `columns`, `test_id_cutoff` and `active_on` are pushed down to DynamoDB as
+    a projection and filter (see build_scan_kwargs). Extra keyword arguments
+    are passed straight to Table.scan().
+    """
+    total_segments = max(1, int(total_segments))
+    scan_kwargs = build_scan_kwargs(columns, test_id_cutoff, active_on, **scan_kwargs)
+
+    if total_segments == 1:
+        frames = _scan_segment(0, 1, scan_kwargs)
+    else:
+        with ThreadPoolExecutor(max_workers=total_segments) as executor:
+            futures = [executor.submit(_scan_segment, segment, total_segments, scan_kwargs)
+                       for segment in range(total_segments)]
+            frames = [frame for future in futures for frame in future.result()]
+
+    if not frames:
+        df = normalize_roster_df(pl.DataFrame(schema={column: pl.Utf8 for column in ROSTER_COLUMNS}))
+    else:
+        df = normalize_roster_df(pl.concat(frames, how="diagonal_relaxed"))
+
+    # The server-side filter cannot see IDs with leading zeros etc., so re-check
+    if test_id_cutoff is not None:
+        df = df.filter(pl.col("participant_id") < test_id_cutoff)
+    if columns:
+        df = df.select([column for column in columns if column in df.columns])
+    return df
@@ -0,0 +1,264 @@
+"""Local mirror of the participant table.
+
+Participant lookups in the TUI read from an in-memory copy of the roster that
+is persisted to SQLite under the cache directory, so they do not need a
+DynamoDB round trip. The mirror is loaded from disk at startup and refreshed
+in the background: every REFRESH_INTERVAL seconds only items whose updated_at
+is newer than the last seen value are fetched, and every FULL_RESYNC_INTERVAL
+seconds a full scan picks up deletes and edits made outside this app.
+add/update/delete in dynamoDB_methods write through to the mirror.
+Listeners registered with add_listener are told about every participant
+that changes, whichever of these paths the change came through.
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from boto3.dynamodb.conditions import Attr
+from ..methods.initialize_methods import get_cache_dir
+from ..methods.roster_methods import ROSTER_COLUMNS, scan_items
+from ..methods.session_methods import get_dynamodb_table
+
+MIRROR_FILE_NAME = "roster.sqlite3"
+
+REFRESH_INTERVAL = 60           # seconds between incremental refreshes
+FULL_RESYNC_INTERVAL = 15 * 60  # seconds between full resyncs
+
+# Items are stamped with updated_at by this app's own clock; re-read a little
+# before the high-water mark so clock skew between machines cannot hide edits.
+UPDATED_AT_OVERLAP = timedelta(minutes=5)
+
+MIRROR_COLUMNS = ROSTER_COLUMNS + ["updated_at"]
+
+
+def utc_timestamp() -> str:
+    """Timestamp written to the updated_at attribute of participant items."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _to_row(item: dict) -> dict:
+    # DynamoDB numbers come back as Decimal; the mirror keeps everything as text
+    return {column: (None if item.get(column) is None else str(item.get(column))) for column in MIRROR_COLUMNS}
+
+
+class RosterMirror:
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self._lock = threading.RLock()
+        self._rows = {}
+        self._connection = None
+        self._high_water_mark = None
+        self._last_full_sync = None
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._listeners = []
+        # One dict per full resync in progress: participant_id -> row (None if
+        # deleted) for every write that lands while that resync is scanning
+        self._scan_writes = []
+
+    # Storage
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self.path is None:
+                self.path = os.path.join(get_cache_dir(), MIRROR_FILE_NAME)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            columns = ", ".join(f"{column} TEXT" for column in MIRROR_COLUMNS[1:])
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS participants (participant_id TEXT PRIMARY KEY, {columns})"
+            )
+            self._connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._connection.commit()
+        return self._connection
+
+    def _set_meta(self, key: str, value: str | None) -> None:
+        self._connect().execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def load(self) -> None:
+        """Load the persisted mirror into memory."""
+        with self._lock:
+            connection = self._connect()
+            cursor = connection.execute(f"SELECT {', '.join(MIRROR_COLUMNS)} FROM participants")
+            self._rows = {row[0]: dict(zip(MIRROR_COLUMNS, row)) for row in cursor.fetchall()}
+            meta = dict(connection.execute("SELECT key, value FROM meta").fetchall())
+            self._high_water_mark = meta.get("high_water_mark")
+            self._last_full_sync = meta.get("last_full_sync")
+
+    @property
+    def is_synced(self) -> bool:
+        """True once the mirror has completed at least one full sync."""
+        return self._last_full_sync is not None
+
+    # Lookups
+
+    def get(self, participant_id) -> dict | None:
+        with self._lock:
+            row = self._rows.get(str(participant_id))
+            if row is None:
+                return None
+            # Drop missing attributes so callers can use .get(key, default) like on a DynamoDB item
+            return {key: value for key, value in row.items() if value is not None}
+
+    def all(self) -> list[dict]:
+        with self._lock:
+            return [dict(row) for row in self._rows.values()]
+
+    # Change listeners
+
+    def add_listener(self, callback) -> None:
+        """Call callback(old_row, new_row) whenever a participant is added, changed
+        or deleted (old_row is None for adds, new_row is None for deletes).
+        Callbacks run on the writing thread, so they should return quickly."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def _notify(self, old_row: dict | None, new_row: dict | None) -> None:
+        if old_row == new_row:
+            return
+        for callback in list(self._listeners):
+            try:
+                callback(old_row, new_row)
+            except Exception as e:
+                print(f"Roster listener failed: {e}")
+
+    # Write-through
+
+    def upsert(self, item: dict) -> None:
+        row = _to_row(item)
+        if row["participant_id"] is None:
+            return
+        with self._lock:
+            old_row = self._rows.get(row["participant_id"])
+            self._rows[row["participant_id"]] = row
+            for writes in self._scan_writes:
+                writes[row["participant_id"]] = row
+            connection = self._connect()
+            connection.execute(
+                f"INSERT OR REPLACE INTO participants ({', '.join(MIRROR_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in MIRROR_COLUMNS)})",
+                [row[column] for column in MIRROR_COLUMNS],
+            )
+            connection.commit()
+        self._notify(old_row, row)
+
+    def delete(self, participant_id) -> None:
+        with self._lock:
+            old_row = self._rows.pop(str(participant_id), None)
+            for writes in self._scan_writes:
+                writes[str(participant_id)] = None
+            connection = self._connect()
+            connection.execute("DELETE FROM participants WHERE participant_id = ?", (str(participant_id),))
+            connection.commit()
+        if old_row is not None:
+            self._notify(old_row, None)
+
+    # Refresh
+
+    def refresh(self, full: bool = False) -> int:
+        """Pull changes from DynamoDB. Returns the number of items received."""
+        if full or self._high_water_mark is None:
+            writes = {}
+            with self._lock:
+                self._scan_writes.append(writes)
+            try:
+                items = scan_items()
+                rows = {row["participant_id"]: row for row in map(_to_row, items) if row["participant_id"] is not None}
+            except Exception:
+                with self._lock:
+                    self._scan_writes.remove(writes)
+                raise
+            with self._lock:
+                # Writes and deletes made while the scan ran are newer than what it read
+                self._scan_writes.remove(writes)
+                for participant_id, row in writes.items():
+                    if row is None:
+                        rows.pop(participant_id, None)
+                    else:
+                        rows[participant_id] = row
+                old_rows = self._rows
+                self._rows = rows
+                connection = self._connect()
+                connection.execute("DELETE FROM participants")
+                connection.executemany(
+                    f"INSERT INTO participants ({', '.join(MIRROR_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' for _ in MIRROR_COLUMNS)})",
+                    [[row[column] for column in MIRROR_COLUMNS] for row in rows.values()],
+                )
+                self._last_full_sync = utc_timestamp()
+                self._set_meta("last_full_sync", self._last_full_sync)
+                self._update_high_water_mark(rows.values())
+                connection.commit()
+            for participant_id in set(old_rows) | set(rows):
+                self._notify(old_rows.get(participant_id), rows.get(participant_id))
+            return len(items)
+
+        since = datetime.strptime(self._high_water_mark, "%Y-%m-%dT%H:%M:%S.%fZ") - UPDATED_AT_OVERLAP
+        items = scan_items(FilterExpression=Attr("updated_at").gt(since.strftime("%Y-%m-%dT%H:%M:%S.%fZ")))
+        rows = [row for row in map(_to_row, items) if row["participant_id"] is not None]
+        # upsert notifies listeners, so it must not run under the mirror lock
+        for row in rows:
+            self.upsert(row)
+        with self._lock:
+            self._update_high_water_mark(rows)
+            self._connect().commit()
+        return len(items)
+
+    def _update_high_water_mark(self, rows) -> None:
+        stamps = [row["updated_at"] for row in rows if row.get("updated_at")]
+        if self._high_water_mark:
+            stamps.append(self._high_water_mark)
+        # Fall back to "now" so the next refresh is incremental even if no item has updated_at yet
+        self._high_water_mark = max(stamps) if stamps else utc_timestamp()
+        self._set_meta("high_water_mark", self._high_water_mark)
+
+    def fetch(self, participant_id) -> dict | None:
+        """Read one participant straight from DynamoDB and store it in the mirror."""
+        response = get_dynamodb_table().get_item(Key={"participant_id": participant_id})
+        item = response.get("Item", None)
+        if item:
+            self.upsert(item)
+        else:
+            self.delete(participant_id)
+        return item
+
+    # Background worker
+
+    def start(self) -> None:
+        """Load the persisted mirror and start the background refresh thread."""
+        self.load()
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="roster-mirror", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _run(self) -> None:
+        last_full = time.monotonic() if self.is_synced else None
+        while not self._stop_event.is_set():
+            try:
+                full = last_full is None or time.monotonic() - last_full >= FULL_RESYNC_INTERVAL
+                count = self.refresh(full=full)
+                if full:
+                    last_full = time.monotonic()
+                print(f"Roster mirror {'resynced' if full else 'refreshed'} ({count} items).")
+            except Exception as e:
+                print(f"Roster mirror refresh failed: {e}")
+            self._stop_event.wait(REFRESH_INTERVAL)
+
+
+_mirror = None
+_mirror_lock = threading.Lock()
+
+
+def get_roster_mirror() -> RosterMirror:
+    """Get the process-wide roster mirror."""
+    global _mirror
+    with _mirror_lock:
+        if _mirror is None:
+            _mirror = RosterMirror()
+        return _mirror
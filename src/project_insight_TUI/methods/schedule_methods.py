@@ -0,0 +1,49 @@
+"""Registry of the study's message schedules.
+
+Everything that differs between schedules (display name, abbreviation used in
+reports, Lambda log groups, number of daily survey messages) lives here, so
+code that handles every schedule loops over SCHEDULES instead of repeating
+itself per schedule. Adding a schedule only needs a new entry below.
+"""
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Schedule:
+    name: str
+    abbreviation: str
+    # Lambda function names are "<log_prefix>_schedule_message<n>"
+    log_prefix: str
+    survey_count: int = 4
+
+    @property
+    def label(self) -> str:
+        """Short name used for headings, e.g. "Early Bird"."""
+        return self.name.removesuffix(" Schedule")
+
+    @property
+    def log_groups(self) -> list[str]:
+        """CloudWatch log group of each survey message, survey 1 first."""
+        return [f"/aws/lambda/{self.log_prefix}_schedule_message{survey}" for survey in range(1, self.survey_count + 1)]
+
+    @property
+    def survey_columns(self) -> list[str]:
+        """Column names of the survey send times in the report's wide tables."""
+        return [f"S{survey}" for survey in range(1, self.survey_count + 1)]
+
+
+SCHEDULES = {
+    schedule.name: schedule for schedule in [
+        Schedule("Early Bird Schedule", "EBS", "early_bird"),
+        Schedule("Standard Schedule", "SS", "standard"),
+        Schedule("Night Owl Schedule", "NOS", "night_owl"),
+    ]
+}
+
+
+def get_schedule(schedule_type: str) -> Schedule:
+    """Look up a schedule by name, raising ValueError for unknown names."""
+    try:
+        return SCHEDULES[schedule_type]
+    except KeyError:
+        raise ValueError("Invalid schedule type provided.")
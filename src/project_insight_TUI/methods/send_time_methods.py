@@ -0,0 +1,309 @@
+"""Local store of survey send times.
+
+Once a Lambda has fired, the send time for a (schedule, survey, date) never
+changes, so send times are kept in SQLite under the cache directory instead
+of being re-read from CloudWatch for every check and report. For each log
+group the store remembers how far back it has read (covered_from) and the
+newest event it has seen (high-water mark); a refresh only reads the log
+stream pages newer than the mark, or older pages the first time a caller
+asks for dates before covered_from. Refreshes of a group are skipped for
+REFRESH_INTERVAL seconds, so every participant on a schedule shares one
+lookup. New send times are read by describing log streams, with one Logs
+Insights query (log_insights_methods), or by describing only the streams
+named for the dates asked for, chosen with send_time_engine.
+"""
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import polars as pl
+import pytz
+from ..methods.initialize_methods import get_cache_dir, get_config
+from ..methods.log_insights_methods import default_insights_source, earliest_send_times
+from ..methods.log_methods import (LOG_GROUPS_BY_SCHEDULE, LOG_TIMEZONE, MAX_LOG_FETCH_WORKERS,
+                                   describe_log_streams_on_dates, iter_log_stream_pages, log_streams_to_frame,
+                                   to_epoch_ms)
+
+SEND_TIME_FILE_NAME = "send_times.sqlite3"
+
+REFRESH_INTERVAL = 60
+
+# How new send times are read: "describe" pages through each log group's
+# streams, "insights" runs one Logs Insights query across all of them, and
+# "prefix" only describes the streams named for the dates asked for.
+# Override with send_time_engine in the .env file.
+SEND_TIME_ENGINES = ["describe", "insights", "prefix"]
+DEFAULT_SEND_TIME_ENGINE = "describe"
+
+# lastEventTimestamp in describe_log_streams can lag by up to an hour, and
+# today's stream keeps growing, so re-read a day before the high-water mark.
+HIGH_WATER_OVERLAP_MS = 24 * 60 * 60 * 1000
+
+# With the prefix engine a date is read once more after it has been over this
+# long (log events can arrive a few minutes late), and never again after that.
+DATE_SETTLE_MS = 60 * 60 * 1000
+
+SEND_TIME_SCHEMA = {
+    "schedule_type": pl.Utf8,
+    "survey": pl.Int64,
+    "date": pl.Date,
+    "time": pl.Utf8,
+}
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+class SendTimeStore:
+    def __init__(self, path: str | None = None, engine: str | None = None, insights_source=None) -> None:
+        self.path = path
+        self.engine = engine or get_config().get("send_time_engine", DEFAULT_SEND_TIME_ENGINE)
+        if self.engine not in SEND_TIME_ENGINES:
+            raise ValueError(f"Unknown send_time_engine '{self.engine}'. Use one of: {', '.join(SEND_TIME_ENGINES)}")
+        self.insights_source = insights_source
+        self._lock = threading.RLock()
+        self._insights_lock = threading.Lock()
+        self._group_locks = {}
+        self._connection = None
+        self._refreshed_at = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self.path is None:
+                self.path = os.path.join(get_cache_dir(), SEND_TIME_FILE_NAME)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS send_times (schedule_type TEXT NOT NULL, survey INTEGER NOT NULL, "
+                "send_date TEXT NOT NULL, first_event_ms INTEGER NOT NULL, log_group TEXT NOT NULL, "
+                "PRIMARY KEY (schedule_type, survey, send_date))"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS log_groups (log_group TEXT PRIMARY KEY, covered_from_ms INTEGER, high_water_ms INTEGER)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS fetched_dates (log_group TEXT NOT NULL, send_date TEXT NOT NULL, "
+                "fetched_ms INTEGER NOT NULL, PRIMARY KEY (log_group, send_date))"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def _group_lock(self, log_group_name: str) -> threading.Lock:
+        with self._lock:
+            return self._group_locks.setdefault(log_group_name, threading.Lock())
+
+    # Refreshing from CloudWatch
+
+    def _plan_refresh(self, log_group_name: str, start_ms: int, force: bool) -> tuple:
+        """Return (since_ms, covered_from_ms, high_water_ms) for a log group;
+        since_ms is None when the group does not need refreshing."""
+        with self._lock:
+            row = self._connect().execute("SELECT covered_from_ms, high_water_ms FROM log_groups WHERE log_group = ?",
+                                          (log_group_name,)).fetchone()
+        covered_from_ms, high_water_ms = row if row else (None, None)
+        needs_older = covered_from_ms is None or start_ms < covered_from_ms
+        recently = time.monotonic() - self._refreshed_at.get(log_group_name, float("-inf")) < REFRESH_INTERVAL
+        if not force and not needs_older and recently:
+            return None, covered_from_ms, high_water_ms
+
+        if needs_older or high_water_ms is None:
+            since_ms = start_ms
+        else:
+            since_ms = max(high_water_ms - HIGH_WATER_OVERLAP_MS, start_ms)
+        return since_ms, covered_from_ms, high_water_ms
+
+    def _upsert_send_times(self, log_group_name: str, rows: list[tuple]) -> None:
+        """Insert (schedule_type, survey, send_date, first_event_ms) rows, keeping the earlier time on conflicts."""
+        with self._lock:
+            self._connect().executemany(
+                "INSERT INTO send_times (schedule_type, survey, send_date, first_event_ms, log_group) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (schedule_type, survey, send_date) DO UPDATE SET "
+                "first_event_ms = MIN(first_event_ms, excluded.first_event_ms)",
+                [(*row, log_group_name) for row in rows],
+            )
+
+    def _save(self, log_group_name: str, rows: list[tuple], start_ms: int, covered_from_ms: int | None,
+              newest_ms: int | None) -> None:
+        """Store (schedule_type, survey, send_date, first_event_ms) rows read from a
+        log group and move its coverage and high-water mark."""
+        with self._lock:
+            connection = self._connect()
+            self._upsert_send_times(log_group_name, rows)
+            connection.execute(
+                "INSERT OR REPLACE INTO log_groups (log_group, covered_from_ms, high_water_ms) VALUES (?, ?, ?)",
+                (log_group_name, min(start_ms, covered_from_ms) if covered_from_ms is not None else start_ms, newest_ms),
+            )
+            connection.commit()
+        self._refreshed_at[log_group_name] = time.monotonic()
+
+    def refresh_group(self, schedule_type: str, survey: int, log_group_name: str, start: date, force: bool = False) -> int:
+        """Read new log streams for one group. Returns the number of streams read."""
+        start_ms = to_epoch_ms(start)
+        with self._group_lock(log_group_name):
+            since_ms, covered_from_ms, high_water_ms = self._plan_refresh(log_group_name, start_ms, force)
+            if since_ms is None:
+                return 0
+
+            since = datetime.fromtimestamp(since_ms / 1000, pytz.timezone(LOG_TIMEZONE))
+            log_streams = [log_stream for page in iter_log_stream_pages(log_group_name, since=since) for log_stream in page]
+
+            # Earliest stream of each day is that day's send time
+            log_stream_df = log_streams_to_frame(log_streams).filter(pl.col('firstEventTimestamp').is_not_null())
+            earliest_df = log_stream_df.group_by(
+                pl.col('firstEventTimestamp').dt.strftime("%Y-%m-%d").alias('send_date')
+            ).agg(
+                pl.col('firstEventTimestamp').min().dt.epoch(time_unit="ms").alias('first_event_ms')
+            )
+            newest = log_stream_df.select(
+                pl.coalesce(pl.col('lastEventTimestamp'), pl.col('firstEventTimestamp')).dt.epoch(time_unit="ms").max()
+            ).item() if log_stream_df.height else None
+            newest_ms = max((ms for ms in (newest, high_water_ms) if ms is not None), default=None)
+
+            rows = [(schedule_type, survey, send_date, first_ms) for send_date, first_ms in earliest_df.iter_rows()]
+            self._save(log_group_name, rows, start_ms, covered_from_ms, newest_ms)
+            return len(log_streams)
+
+    def refresh_insights(self, log_group_names: list[str], start: date, force: bool = False) -> int:
+        """Refresh log groups with one Logs Insights query covering all of them.
+        Returns the number of send times read."""
+        start_ms = to_epoch_ms(start)
+        with self._insights_lock:
+            plans = {log_group_name: self._plan_refresh(log_group_name, start_ms, force) for log_group_name in log_group_names}
+            plans = {log_group_name: plan for log_group_name, plan in plans.items() if plan[0] is not None}
+            if not plans:
+                return 0
+
+            since_ms = min(since_ms for since_ms, _, _ in plans.values())
+            end_ms = int(time.time() * 1000)
+            if self.insights_source is None:
+                self.insights_source = default_insights_source()
+            send_times_df = earliest_send_times(self.insights_source.query(list(plans), since_ms, end_ms))
+
+            for log_group_name, (_, covered_from_ms, high_water_ms) in plans.items():
+                group_df = send_times_df.filter(pl.col("log_group") == log_group_name)
+                newest = group_df["first_event_ms"].max() if group_df.height else None
+                newest_ms = max((ms for ms in (newest, high_water_ms) if ms is not None), default=None)
+                rows = list(group_df.select("schedule_type", "survey", "send_date", "first_event_ms").iter_rows())
+                self._save(log_group_name, rows, start_ms, covered_from_ms, newest_ms)
+            return send_times_df.height
+
+    def _dates_to_fetch(self, log_group_name: str, dates: list[date], force: bool) -> list[date]:
+        """Dates of a log group the prefix engine still has to read: never read,
+        or read before the day had settled and not within REFRESH_INTERVAL."""
+        with self._lock:
+            fetched = dict(self._connect().execute("SELECT send_date, fetched_ms FROM fetched_dates WHERE log_group = ?",
+                                                   (log_group_name,)).fetchall())
+        now_ms = int(time.time() * 1000)
+        needed = []
+        for day in dates:
+            fetched_ms = fetched.get(day.strftime("%Y-%m-%d"))
+            if fetched_ms is None:
+                needed.append(day)
+            elif fetched_ms < to_epoch_ms(day + timedelta(days=1)) + DATE_SETTLE_MS:
+                if force or now_ms - fetched_ms >= REFRESH_INTERVAL * 1000:
+                    needed.append(day)
+        return needed
+
+    def refresh_prefix(self, groups: list[tuple], start: date, end: date | None = None, force: bool = False) -> int:
+        """Read only the streams named for the dates in [start, end] (end defaults
+        to today) that are not settled yet (see describe_log_streams_on_dates).
+        Returns the number of streams read."""
+        today = datetime.now(pytz.timezone(LOG_TIMEZONE)).date()
+        end = min(end or today, today)
+        dates = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+        needed = {log_group_name: self._dates_to_fetch(log_group_name, dates, force) for _, _, log_group_name in groups}
+        needed = {log_group_name: days for log_group_name, days in needed.items() if days}
+        if not needed:
+            return 0
+
+        fetched_ms = int(time.time() * 1000)
+        log_stream_dfs = describe_log_streams_on_dates(needed)
+
+        count = 0
+        for schedule_type, survey, log_group_name in groups:
+            if log_group_name not in log_stream_dfs:
+                continue
+            log_stream_df = log_stream_dfs[log_group_name]
+            count += log_stream_df.height
+            earliest_df = log_stream_df.group_by(
+                pl.col('firstEventTimestamp').dt.strftime("%Y-%m-%d").alias('send_date')
+            ).agg(
+                pl.col('firstEventTimestamp').min().dt.epoch(time_unit="ms").alias('first_event_ms')
+            )
+            with self._lock:
+                self._upsert_send_times(log_group_name, [(schedule_type, survey, send_date, first_ms)
+                                                         for send_date, first_ms in earliest_df.iter_rows()])
+                self._connect().executemany(
+                    "INSERT OR REPLACE INTO fetched_dates (log_group, send_date, fetched_ms) VALUES (?, ?, ?)",
+                    [(log_group_name, day.strftime("%Y-%m-%d"), fetched_ms) for day in needed[log_group_name]],
+                )
+                self._connect().commit()
+        return count
+
+    def refresh(self, schedule_types: list[str], start: date, force: bool = False, end: date | None = None) -> None:
+        """Refresh every log group of the given schedules, with the describe engine
+        (each group concurrently), the insights engine (one query) or the prefix
+        engine (only the days in [start, end])."""
+        groups = [(schedule_type, survey, log_group_name)
+                  for schedule_type in schedule_types
+                  for survey, log_group_name in enumerate(LOG_GROUPS_BY_SCHEDULE[schedule_type], start=1)]
+        if self.engine == "insights":
+            self.refresh_insights([log_group_name for _, _, log_group_name in groups], start, force)
+            return
+        if self.engine == "prefix":
+            self.refresh_prefix(groups, start, end, force)
+            return
+
+        with ThreadPoolExecutor(max_workers=min(MAX_LOG_FETCH_WORKERS, len(groups))) as executor:
+            futures = [executor.submit(self.refresh_group, schedule_type, survey, log_group_name, start, force)
+                       for schedule_type, survey, log_group_name in groups]
+            for future in futures:
+                future.result()
+
+    # Reading
+
+    def send_times(self, start, end, schedule_types: list[str] | None = None, refresh: bool = True) -> pl.DataFrame:
+        """Long frame of send times (schedule_type, survey, date, time "HH:MM:SS")
+        for dates in [start, end], refreshing from CloudWatch first if needed."""
+        start, end = _as_date(start), _as_date(end)
+        schedule_types = schedule_types or list(LOG_GROUPS_BY_SCHEDULE)
+        if refresh:
+            self.refresh(schedule_types, start, end=end)
+
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT schedule_type, survey, send_date, first_event_ms FROM send_times "
+                f"WHERE send_date BETWEEN ? AND ? AND schedule_type IN ({', '.join('?' for _ in schedule_types)}) "
+                f"ORDER BY schedule_type, survey, send_date",
+                [start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"), *schedule_types],
+            ).fetchall()
+
+        if not rows:
+            return pl.DataFrame(schema=SEND_TIME_SCHEMA)
+        df = pl.DataFrame(rows, schema=["schedule_type", "survey", "send_date", "first_event_ms"], orient="row")
+        return df.with_columns(
+            pl.col("send_date").str.strptime(pl.Date, "%Y-%m-%d").alias("date"),
+            pl.from_epoch(pl.col("first_event_ms"), time_unit="ms").dt.replace_time_zone("UTC")
+            .dt.convert_time_zone(LOG_TIMEZONE).dt.strftime("%H:%M:%S").alias("time"),
+        ).select(list(SEND_TIME_SCHEMA))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_send_time_store() -> SendTimeStore:
+    """Get the process-wide send-time store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SendTimeStore()
+        return _store
@@ -0,0 +1,105 @@
+"""Process-wide AWS session and client registry.
+
+boto3 sessions and clients are expensive to build (botocore loads its service
+models and opens a new TLS connection), so they are built once per credential
+set and shared by every data-access function. Clients are thread-safe and
+shared across threads; DynamoDB resources are not, so each thread gets its own.
+"""
+import threading
+import boto3
+from botocore.config import Config
+from ..methods.initialize_methods import EnvConfig, get_config
+
+CREDENTIAL_VARS = ['aws_access_key_id', 'aws_secret_access_key', 'region']
+
+# Size of the urllib3 connection pool per client. Needs to be at least as large
+# as the biggest thread pool that shares a client.
+MAX_POOL_CONNECTIONS = 32
+
+_CLIENT_CONFIG = Config(
+    max_pool_connections=MAX_POOL_CONNECTIONS,
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    tcp_keepalive=True,
+)
+
+_lock = threading.Lock()
+_registry = {
+    'key': None,
+    'session': None,
+    'clients': {},
+    'generation': 0,
+}
+_thread_local = threading.local()
+
+
+def _credential_key(config: EnvConfig) -> tuple:
+    return tuple(config.get(var) for var in CREDENTIAL_VARS)
+
+
+def _current_registry(config: EnvConfig | None = None) -> tuple:
+    """Return (session, generation), rebuilding the session if the credentials changed."""
+    if config is None:
+        config = get_config()
+    key = _credential_key(config)
+
+    with _lock:
+        if _registry['session'] is None or _registry['key'] != key:
+            _registry['session'] = boto3.Session(
+                aws_access_key_id=config.aws_access_key_id,
+                aws_secret_access_key=config.aws_secret_access_key,
+                region_name=config.region
+            )
+            _registry['key'] = key
+            _registry['clients'] = {}
+            _registry['generation'] += 1
+        return _registry['session'], _registry['generation']
+
+
+def get_session() -> boto3.Session:
+    """Get the shared boto3 Session for the current credentials."""
+    session, _ = _current_registry()
+    return session
+
+
+def get_client(service_name: str):
+    """Get a shared, connection-pooled low-level client (e.g. 'sns', 'logs', 'dynamodb')."""
+    session, _ = _current_registry()
+    with _lock:
+        client = _registry['clients'].get(service_name)
+        if client is None:
+            client = session.client(service_name, config=_CLIENT_CONFIG)
+            _registry['clients'][service_name] = client
+        return client
+
+
+def get_dynamodb_table():
+    """Get the participant DynamoDB Table for the calling thread."""
+    config = get_config()
+    session, generation = _current_registry(config)
+    table_name = config.table_name
+
+    cached = getattr(_thread_local, 'table', None)
+    if cached is None or cached[0] != generation or cached[1] != table_name:
+        # The Session itself is not thread-safe, so resources are built under the same lock as clients
+        with _lock:
+            dynamodb = session.resource('dynamodb', config=_CLIENT_CONFIG)
+        cached = (generation, table_name, dynamodb.Table(table_name))
+        _thread_local.table = cached
+    return cached[2]
+
+
+def get_sns_client():
+    return get_client('sns')
+
+
+def get_logs_client():
+    return get_client('logs')
+
+
+def reset_session() -> None:
+    """Drop the cached session and clients so the next call rebuilds them."""
+    with _lock:
+        _registry['session'] = None
+        _registry['key'] = None
+        _registry['clients'] = {}
+        _registry['generation'] += 1
@@ -0,0 +1,276 @@
+"""SMS delivery status tracking.
+
+SNS only tells us a message was accepted. When SMS delivery status logging is
+enabled for the account, SNS writes one JSON event per message to the
+CloudWatch log groups sns/<region>/<account>/DirectPublishToPhoneNumber and
+.../DirectPublishToPhoneNumber/Failure. The tracker takes the MessageIds of
+sent messages from the outbound SMS queue, looks them up in those log groups
+in batches (one filter_log_events query per batch, following nextToken) and
+caches the results in SQLite so each message is only resolved once.
+
+For offline testing, set sms_delivery_log_file in the .env file to a JSON
+lines file of delivery events in the same format; it is used instead of
+CloudWatch.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from ..methods.initialize_methods import get_cache_dir, get_config
+from ..methods.session_methods import get_client, get_logs_client
+from ..methods.sms_queue_methods import get_sms_queue
+
+DELIVERY_FILE_NAME = "sms_delivery.sqlite3"
+
+DELIVERED = "SUCCESS"
+NOT_DELIVERED = "FAILURE"
+PENDING = "PENDING"
+UNKNOWN = "UNKNOWN"  # No delivery event showed up (e.g. delivery logging is off)
+
+# Messages without a delivery event after this long are marked UNKNOWN
+RESOLVE_WINDOW_SECONDS = 72 * 60 * 60
+
+# CloudWatch filter patterns are limited to 1024 characters, which fits about 14 MessageIds
+MAX_FILTER_PATTERN_LENGTH = 1024
+
+# Look a little before the send time in case the two clocks disagree
+START_TIME_MARGIN_SECONDS = 5 * 60
+
+DELIVERY_COLUMNS = ["message_id", "participant_id", "phone_number", "survey", "sent_at", "status",
+                    "provider_response", "price_usd", "dwell_time_ms", "resolved_at"]
+
+
+def parse_delivery_event(event: dict) -> dict | None:
+    """Turn one SNS SMS delivery log event into a status row (None if it is not one)."""
+    message_id = event.get("notification", {}).get("messageId")
+    if not message_id:
+        return None
+    delivery = event.get("delivery", {})
+    return {
+        "message_id": message_id,
+        "status": event.get("status", UNKNOWN),
+        "provider_response": delivery.get("providerResponse"),
+        "price_usd": delivery.get("priceInUSD"),
+        "dwell_time_ms": delivery.get("dwellTimeMs"),
+    }
+
+
+def _filter_pattern(message_ids: list[str]) -> str:
+    return "{ " + " || ".join(f'($.notification.messageId = "{message_id}")' for message_id in message_ids) + " }"
+
+
+def build_filter_patterns(message_ids: list[str]) -> list[tuple[str, list[str]]]:
+    """Split MessageIds into (filter pattern, ids) batches that fit the pattern length limit."""
+    batches = []
+    current = []
+    length = len("{  }")
+    for message_id in message_ids:
+        term_length = len(f'($.notification.messageId = "{message_id}")') + (len(" || ") if current else 0)
+        if current and length + term_length > MAX_FILTER_PATTERN_LENGTH:
+            batches.append(current)
+            current = []
+            length = len("{  }")
+            term_length -= len(" || ")
+        current.append(message_id)
+        length += term_length
+    if current:
+        batches.append(current)
+    return [(_filter_pattern(batch), batch) for batch in batches]
+
+
+class CloudWatchDeliveryLogSource:
+    """Reads delivery events from the SNS SMS delivery status log groups."""
+
+    def __init__(self, log_group_names: list[str] | None = None) -> None:
+        self._log_group_names = log_group_names
+
+    def log_group_names(self) -> list[str]:
+        if self._log_group_names is None:
+            config = get_config()
+            base = config.get("sms_delivery_log_group")
+            if not base:
+                account_id = get_client("sts").get_caller_identity()["Account"]
+                base = f"sns/{config.region}/{account_id}/DirectPublishToPhoneNumber"
+            self._log_group_names = [base, f"{base}/Failure"]
+        return self._log_group_names
+
+    def fetch(self, message_ids: list[str], start_time_ms: int):
+        """Yield the delivery events for message_ids logged after start_time_ms."""
+        logs = get_logs_client()
+        for log_group_name in self.log_group_names():
+            for pattern, _ in build_filter_patterns(message_ids):
+                kwargs = {"logGroupName": log_group_name, "filterPattern": pattern, "startTime": start_time_ms}
+                while True:
+                    try:
+                        response = logs.filter_log_events(**kwargs)
+                    except logs.exceptions.ResourceNotFoundException:
+                        # The Failure group only exists once a message has failed
+                        break
+                    for event in response.get("events", []):
+                        try:
+                            yield json.loads(event["message"])
+                        except (KeyError, ValueError):
+                            continue
+                    next_token = response.get("nextToken")
+                    if not next_token:
+                        break
+                    kwargs["nextToken"] = next_token
+
+
+class LocalDeliveryLogSource:
+    """Reads delivery events from a JSON lines file (one SNS delivery event per line)."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def fetch(self, message_ids: list[str], start_time_ms: int):
+        wanted = set(message_ids)
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if event.get("notification", {}).get("messageId") in wanted:
+                    yield event
+
+
+def default_delivery_log_source():
+    local_file = get_config().get("sms_delivery_log_file")
+    if local_file:
+        return LocalDeliveryLogSource(local_file)
+    return CloudWatchDeliveryLogSource()
+
+
+class DeliveryStatusTracker:
+    def __init__(self, source=None, path: str | None = None, queue=None) -> None:
+        self.source = source
+        self.path = path
+        self.queue = queue
+        self._lock = threading.RLock()
+        self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self.path is None:
+                self.path = os.path.join(get_cache_dir(), DELIVERY_FILE_NAME)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.row_factory = sqlite3.Row
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS delivery_status ("
+                "message_id TEXT PRIMARY KEY, participant_id TEXT, phone_number TEXT, survey TEXT, sent_at REAL, "
+                "status TEXT NOT NULL, provider_response TEXT, price_usd REAL, dwell_time_ms INTEGER, resolved_at REAL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS delivery_status_pending ON delivery_status (status, sent_at)")
+            self._connection.commit()
+        return self._connection
+
+    def record(self, message_id: str, participant_id=None, phone_number: str | None = None,
+               survey: str | None = None, sent_at: float | None = None) -> None:
+        """Start tracking a published message."""
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR IGNORE INTO delivery_status (message_id, participant_id, phone_number, survey, sent_at, status) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (message_id, None if participant_id is None else str(participant_id), phone_number, survey,
+                 sent_at or time.time(), PENDING),
+            )
+            connection.commit()
+
+    def import_sent_messages(self) -> int:
+        """Track every message the outbound queue has sent. Returns how many were new."""
+        queue = self.queue or get_sms_queue()
+        with self._lock:
+            connection = self._connect()
+            before = connection.total_changes
+            connection.executemany(
+                "INSERT OR IGNORE INTO delivery_status (message_id, participant_id, phone_number, survey, sent_at, status) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(row["message_id"], row["participant_id"], row["phone_number"], row["survey"], row["updated_at"], PENDING)
+                 for row in queue.sent_messages()],
+            )
+            connection.commit()
+            return connection.total_changes - before
+
+    def resolve_pending(self) -> int:
+        """Look up delivery events for every PENDING message. Returns how many were resolved."""
+        if self.source is None:
+            self.source = default_delivery_log_source()
+
+        with self._lock:
+            pending = [dict(row) for row in self._connect().execute(
+                "SELECT message_id, sent_at FROM delivery_status WHERE status = ? ORDER BY sent_at", (PENDING,)
+            )]
+        if not pending:
+            return 0
+
+        start_time_ms = int((min(row["sent_at"] for row in pending) - START_TIME_MARGIN_SECONDS) * 1000)
+        results = {}
+        for event in self.source.fetch([row["message_id"] for row in pending], start_time_ms):
+            parsed = parse_delivery_event(event)
+            if parsed is not None:
+                results[parsed["message_id"]] = parsed
+
+        now = time.time()
+        expired = [row["message_id"] for row in pending
+                   if row["message_id"] not in results and now - row["sent_at"] > RESOLVE_WINDOW_SECONDS]
+        with self._lock:
+            connection = self._connect()
+            connection.executemany(
+                "UPDATE delivery_status SET status = ?, provider_response = ?, price_usd = ?, dwell_time_ms = ?, "
+                "resolved_at = ? WHERE message_id = ?",
+                [(result["status"], result["provider_response"], result["price_usd"], result["dwell_time_ms"], now,
+                  message_id) for message_id, result in results.items()],
+            )
+            connection.executemany(
+                "UPDATE delivery_status SET status = ?, resolved_at = ? WHERE message_id = ?",
+                [(UNKNOWN, now, message_id) for message_id in expired],
+            )
+            connection.commit()
+        return len(results) + len(expired)
+
+    def refresh(self) -> int:
+        """Pick up newly sent messages and resolve everything still pending."""
+        self.import_sent_messages()
+        return self.resolve_pending()
+
+    def get_statuses(self, message_ids: list[str]) -> dict:
+        with self._lock:
+            connection = self._connect()
+            statuses = {}
+            for start in range(0, len(message_ids), 500):
+                chunk = message_ids[start:start + 500]
+                cursor = connection.execute(
+                    f"SELECT * FROM delivery_status WHERE message_id IN ({', '.join('?' for _ in chunk)})", chunk)
+                statuses.update({row["message_id"]: dict(row) for row in cursor})
+            return statuses
+
+    def recent(self, limit: int = 200) -> list[dict]:
+        with self._lock:
+            return [dict(row) for row in self._connect().execute(
+                "SELECT * FROM delivery_status ORDER BY sent_at DESC LIMIT ?", (limit,))]
+
+    def counts(self) -> dict:
+        with self._lock:
+            return dict(self._connect().execute("SELECT status, COUNT(*) FROM delivery_status GROUP BY status").fetchall())
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_delivery_tracker() -> DeliveryStatusTracker:
+    """Get the process-wide delivery status tracker."""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = DeliveryStatusTracker()
+        return _tracker
@@ -0,0 +1,130 @@
+import time
+from datetime import date
+import polars as pl
+from ..methods.initialize_methods import get_config
+from ..methods.roster_methods import ROSTER_COLUMNS, normalize_roster_df, scan_roster
+from ..methods.roster_mirror_methods import get_roster_mirror
+from ..methods.sms_queue_methods import get_sms_queue, study_today, STUDY_TIMEZONE, SENT, FAILED, OPTED_OUT
+from ..methods.opt_out_methods import get_opt_out_cache
+
+SURVEY_MESSAGE_TEMPLATE = "Hello from the Project INSIGHT Team at Rowan University. At your earliest convenience please take this survey: {link}. If you have any questions please reach out to us at projectinsight@rowan.edu. Thank you!"
+
+# Survey -> Qualtrics link. Survey 1A links to the participant's own leaderboard (lb_link).
+SURVEY_LINKS = {
+    "1A": None,
+    "1B": "https://rowan.co1.qualtrics.com/jfe/form/SV_869PIgLB4XwPD5s",
+    "2": "https://rowan.co1.qualtrics.com/jfe/form/SV_aWBwIQVfSMS3kk6",
+    "3": "https://rowan.co1.qualtrics.com/jfe/form/SV_efH33MAvT9pkTr0",
+    "4": "https://rowan.co1.qualtrics.com/jfe/form/SV_bC8e4N2Nqu3234i",
+}
+
+SURVEY_LABELS = {
+    "1A": "EMA Survey 1A (link with leaderboard)",
+    "1B": "EMA Survey 1B (link without leaderboard)",
+    "2": "EMA Survey 2",
+    "3": "EMA Survey 3",
+    "4": "EMA Survey 4",
+}
+
+def render_survey_message(survey: str, lb_link: str | None = None) -> str | None:
+    """Text for a survey reminder. Returns None for survey 1A when there is no lb_link."""
+    link = SURVEY_LINKS[survey] if survey != "1A" else lb_link
+    if not link:
+        return None
+    return SURVEY_MESSAGE_TEMPLATE.format(link=link)
+
+
+def get_roster_df() -> pl.DataFrame:
+    """The typed roster, from the local mirror when it has synced, otherwise from a scan."""
+    mirror = get_roster_mirror()
+    if mirror.is_synced:
+        rows = mirror.all()
+        df = pl.DataFrame(rows, schema={column: pl.Utf8 for column in ROSTER_COLUMNS}, strict=False) if rows \
+            else pl.DataFrame(schema={column: pl.Utf8 for column in ROSTER_COLUMNS})
+        return normalize_roster_df(df)
+    return scan_roster(columns=ROSTER_COLUMNS)
+
+
+def select_recipients(schedule_type: str | None = None,
+                      days_in_study: list[int] | None = None,
+                      on_date: date | None = None,
+                      roster_df: pl.DataFrame | None = None) -> pl.DataFrame:
+    """Participants active on on_date (default: today), optionally limited to a
+    schedule type and to certain days in study (day 1 = study_start_date).
+    Test IDs are always left out. Adds a day_in_study column."""
+    on_date = on_date or study_today()
+    df = roster_df if roster_df is not None else get_roster_df()
+
+    df = df.with_columns(
+        ((pl.lit(on_date) - pl.col("study_start_date")).dt.total_days() + 1).cast(pl.Int64).alias("day_in_study")
+    ).filter(
+        (pl.col("study_start_date") <= on_date) &
+        (pl.col("study_end_date") >= on_date) &
+        (pl.col("participant_id") < get_config().test_id_cutoff) &
+        pl.col("phone_number").is_not_null()
+    )
+    if schedule_type:
+        df = df.filter(pl.col("schedule_type") == schedule_type)
+    if days_in_study:
+        df = df.filter(pl.col("day_in_study").is_in(days_in_study))
+    return df.sort("participant_id")
+
+
+def broadcast_sms(recipients_df: pl.DataFrame,
+                  survey: str | None = None,
+                  custom_message: str | None = None,
+                  progress_callback=None,
+                  timeout: float | None = None) -> list[dict]:
+    """Send a survey reminder (or custom_message) to every recipient.
+
+    Messages go through the outbound SMS queue, which publishes them from a
+    thread pool at up to sms_tps per second and retries throttled sends; a
+    survey already sent to a participant today is not sent again.
+    progress_callback(done, total, messages_per_second, result) is called
+    after every recipient. Returns one result dict per recipient:
+    participant_id, phone_number, status ("sent", "failed", "duplicate",
+    "opted_out" or "skipped"), message_id and error. Opted-out numbers are
+    screened out before anything is queued.
+    """
+    if survey is None and not custom_message:
+        raise ValueError("Pick a survey or enter a custom message")
+
+    queue = get_sms_queue()
+    queue.start()
+    send_date = study_today()
+    started = time.monotonic()
+    total = recipients_df.height
+    results = {}
+    row_ids = {}
+
+    def report(result: dict) -> None:
+        results[result["participant_id"]] = result
+        if progress_callback is not None:
+            elapsed = max(time.monotonic() - started, 1e-6)
+            progress_callback(len(results), total, len(results) / elapsed, result)
+
+    recipients = recipients_df.select("participant_id", "phone_number", "lb_link").to_dicts()
+    opted_out = get_opt_out_cache()
+    for recipient in recipients:
+        if opted_out.is_opted_out(recipient["phone_number"]):
+            report({"participant_id": recipient["participant_id"], "phone_number": recipient["phone_number"],
+                    "status": OPTED_OUT, "message_id": None, "error": "Phone number has opted out of SMS"})
+            continue
+        message = custom_message if custom_message else render_survey_message(survey, recipient.get("lb_link"))
+        if message is None:
+            report({"participant_id": recipient["participant_id"], "phone_number": recipient["phone_number"],
+                    "status": "skipped", "message_id": None, "error": "No leaderboard link"})
+            continue
+        row_id, created = queue.enqueue(recipient["participant_id"], recipient["phone_number"], message,
+                                        survey=survey, send_date=send_date)
+        row_ids[row_id] = created
+
+    def on_row_done(row: dict) -> None:
+        status = row["status"]
+        if status == SENT and not row_ids[row["id"]]:
+            status = "duplicate"
+        report({"participant_id": int(row["participant_id"]), "phone_number": row["phone_number"], "status": status,
+                "message_id": row["message_id"], "error": row["last_error"] if status in (FAILED, OPTED_OUT) else None})
+
+    queue.wait(list(row_ids), timeout=timeout, progress_callback=on_row_done)
+    return [results[recipient["participant_id"]] for recipient in recipients if recipient["participant_id"] in results]
@@ -0,0 +1,360 @@
+"""Durable outbound SMS queue.
+
+Every SMS the app sends is first written to a SQLite journal under the cache
+directory and then published by a background drain worker. Each message has
+an idempotency key built from (participant, survey, date), so queueing the
+same survey twice for a participant on the same day is a no-op; a message
+that finally failed can be queued again and is retried. Throttling and other
+transient SNS errors are retried with exponential backoff. Messages that were
+being sent when the app stopped are put back in the queue on the next start
+(delivery is at-least-once for those few messages).
+"""
+import hashlib
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+import pytz
+from botocore.exceptions import ClientError, ConnectionError as BotocoreConnectionError
+from ..methods.initialize_methods import get_cache_dir, get_config
+from ..methods.dynamoDB_methods import publish_text_message
+from ..methods.session_methods import MAX_POOL_CONNECTIONS
+from ..methods.opt_out_methods import get_opt_out_cache
+
+QUEUE_FILE_NAME = "sms_queue.sqlite3"
+
+# Idempotency keys use the study's calendar date, not the machine's
+STUDY_TIMEZONE = "America/New_York"
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+OPTED_OUT = "opted_out"
+FINAL_STATUSES = (SENT, FAILED, OPTED_OUT)
+
+MAX_SEND_ATTEMPTS = 8
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 5 * 60
+
+DRAIN_BATCH_SIZE = 100
+DRAIN_WORKERS = min(16, MAX_POOL_CONNECTIONS)
+IDLE_WAIT_SECONDS = 30  # The worker also wakes up as soon as something is queued
+
+# SNS error codes worth retrying; anything else (invalid number, opted out...) fails right away.
+# SNS reports throttling as "Throttled" / "KMSThrottling"; the *Exception names are the
+# modeled exception classes, kept in case the code comes back in that form.
+RETRYABLE_ERROR_CODES = {
+    "Throttled", "Throttling", "ThrottlingException", "ThrottledException", "TooManyRequestsException",
+    "KMSThrottling", "KMSThrottlingException", "InternalError", "InternalFailure", "ServiceUnavailable",
+}
+
+QUEUE_COLUMNS = ["id", "idempotency_key", "participant_id", "phone_number", "survey", "send_date", "message",
+                 "status", "attempts", "next_attempt_at", "message_id", "last_error", "created_at", "updated_at"]
+
+
+class TokenBucket:
+    """Thread-safe token bucket: acquire() blocks until a token is available.
+    Tokens refill at `rate` per second up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = max(float(rate), 0.001)
+        self.capacity = max(float(capacity if capacity is not None else rate), 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def study_today() -> date:
+    return datetime.now(pytz.timezone(STUDY_TIMEZONE)).date()
+
+
+def make_idempotency_key(participant_id, survey: str | None, send_date: date | str | None = None, message: str | None = None) -> str:
+    """Key for one message: participant, survey and date. Messages that are not a
+    survey reminder use a hash of their text in place of the survey."""
+    if send_date is None:
+        send_date = study_today()
+    if not isinstance(send_date, str):
+        send_date = send_date.strftime("%Y-%m-%d")
+    if not survey:
+        survey = "message-" + hashlib.sha1((message or "").encode("utf-8")).hexdigest()[:12]
+    return f"{participant_id}:{survey}:{send_date}"
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Throttling, server-side and connection errors; a 429 or 5xx status counts
+    even when the error code is not one we know."""
+    if isinstance(error, ClientError):
+        if error.response.get("Error", {}).get("Code") in RETRYABLE_ERROR_CODES:
+            return True
+        status_code = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode") or 0
+        return status_code == 429 or status_code >= 500
+    return isinstance(error, BotocoreConnectionError)
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempts))
+
+
+class OutboundSMSQueue:
+    def __init__(self, path: str | None = None, send_function=publish_text_message) -> None:
+        self.path = path
+        self.send_function = send_function
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._connection = None
+        self._bucket = None
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._recovered = False
+
+    # Storage
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self.path is None:
+                self.path = os.path.join(get_cache_dir(), QUEUE_FILE_NAME)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.row_factory = sqlite3.Row
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "idempotency_key TEXT NOT NULL UNIQUE, "
+                "participant_id TEXT, phone_number TEXT NOT NULL, survey TEXT, send_date TEXT, message TEXT NOT NULL, "
+                "status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL, "
+                "message_id TEXT, last_error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at)")
+            self._connection.commit()
+        return self._connection
+
+    def _set_status(self, row_id: int, **fields) -> None:
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._changed:
+            connection = self._connect()
+            connection.execute(f"UPDATE outbox SET {assignments} WHERE id = ?", [*fields.values(), row_id])
+            connection.commit()
+            self._changed.notify_all()
+
+    def get(self, row_id: int) -> dict | None:
+        with self._lock:
+            row = self._connect().execute("SELECT * FROM outbox WHERE id = ?", (row_id,)).fetchone()
+            return dict(row) if row is not None else None
+
+    def get_many(self, row_ids: list[int]) -> list[dict]:
+        with self._lock:
+            connection = self._connect()
+            rows = {}
+            # Stay well below SQLite's bound parameter limit
+            for start in range(0, len(row_ids), 500):
+                chunk = row_ids[start:start + 500]
+                cursor = connection.execute(f"SELECT * FROM outbox WHERE id IN ({', '.join('?' for _ in chunk)})", chunk)
+                rows.update({row["id"]: dict(row) for row in cursor})
+            return [rows[row_id] for row_id in row_ids if row_id in rows]
+
+    def sent_messages(self) -> list[dict]:
+        """Rows that were sent and have an SNS MessageId."""
+        with self._lock:
+            return [dict(row) for row in self._connect().execute(
+                "SELECT * FROM outbox WHERE status = ? AND message_id IS NOT NULL", (SENT,))]
+
+    def counts(self) -> dict:
+        with self._lock:
+            return dict(self._connect().execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+
+    # Queueing
+
+    def enqueue(self, participant_id, phone_number: str, message: str, survey: str | None = None,
+                send_date: date | str | None = None) -> tuple[int, bool]:
+        """Queue one message. Returns (row id, True if it was newly queued).
+
+        If a message with the same idempotency key exists it is not queued again,
+        unless it had failed, in which case it is reset and retried."""
+        key = make_idempotency_key(participant_id, survey, send_date, message)
+        send_date = key.rsplit(":", 1)[1]
+        now = time.time()
+        with self._changed:
+            connection = self._connect()
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO outbox (idempotency_key, participant_id, phone_number, survey, send_date, message, "
+                "status, attempts, next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?, ?, ?)",
+                (key, str(participant_id), phone_number, survey, send_date, message, PENDING, now, now, now),
+            )
+            created = cursor.rowcount == 1
+            row = connection.execute("SELECT id, status FROM outbox WHERE idempotency_key = ?", (key,)).fetchone()
+            if not created and row["status"] in (FAILED, OPTED_OUT):
+                connection.execute(
+                    "UPDATE outbox SET status = ?, attempts = 0, next_attempt_at = ?, phone_number = ?, message = ?, "
+                    "last_error = NULL, updated_at = ? WHERE id = ?",
+                    (PENDING, now, phone_number, message, now, row["id"]),
+                )
+                created = True
+            connection.commit()
+            self._changed.notify_all()
+        self._wake_event.set()
+        return row["id"], created
+
+    def wait(self, row_ids: list[int], timeout: float | None = None, progress_callback=None) -> list[dict]:
+        """Block until every row has been sent or has failed (or timeout passes).
+
+        progress_callback(row) is called once for each row as it finishes.
+        Returns the rows in the order of row_ids. The callback runs without the
+        queue lock held, so it may block (e.g. on the UI thread)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        reported = set()
+        while True:
+            with self._changed:
+                rows = self.get_many(row_ids)
+                finished = [row for row in rows if row["status"] in FINAL_STATUSES and row["id"] not in reported]
+                reported.update(row["id"] for row in finished)
+                remaining = None if deadline is None else deadline - time.monotonic()
+                done = len(reported) == len(rows) or (remaining is not None and remaining <= 0)
+                if not done and not finished:
+                    self._changed.wait(timeout=1.0 if remaining is None else min(1.0, remaining))
+            if progress_callback is not None:
+                for row in finished:
+                    progress_callback(row)
+            if done:
+                return rows
+
+    # Draining
+
+    def recover(self) -> int:
+        """Put messages that were mid-send when the app stopped back in the queue."""
+        with self._changed:
+            connection = self._connect()
+            cursor = connection.execute("UPDATE outbox SET status = ?, updated_at = ? WHERE status = ?",
+                                        (PENDING, time.time(), SENDING))
+            connection.commit()
+            self._changed.notify_all()
+            return cursor.rowcount
+
+    def _claim_due(self) -> list[dict]:
+        with self._lock:
+            connection = self._connect()
+            rows = [dict(row) for row in connection.execute(
+                "SELECT * FROM outbox WHERE status = ? AND next_attempt_at <= ? ORDER BY next_attempt_at, id LIMIT ?",
+                (PENDING, time.time(), DRAIN_BATCH_SIZE),
+            )]
+            if rows:
+                connection.executemany("UPDATE outbox SET status = ?, updated_at = ? WHERE id = ?",
+                                       [(SENDING, time.time(), row["id"]) for row in rows])
+                connection.commit()
+            return rows
+
+    def _send(self, row: dict) -> None:
+        # Skip numbers that replied STOP instead of paying for a publish that cannot be delivered
+        if get_opt_out_cache().is_opted_out(row["phone_number"]):
+            self._set_status(row["id"], status=OPTED_OUT, last_error="Phone number has opted out of SMS")
+            return
+        if self._bucket is None:
+            self._bucket = TokenBucket(get_config().sms_tps)
+        self._bucket.acquire()
+        attempts = row["attempts"] + 1
+        try:
+            message_id = self.send_function(row["phone_number"], row["message"])
+        except Exception as e:
+            if isinstance(e, ClientError) and e.response.get("Error", {}).get("Code") == "OptedOut":
+                get_opt_out_cache().mark_opted_out(row["phone_number"])
+                self._set_status(row["id"], status=OPTED_OUT, attempts=attempts, last_error=str(e))
+            elif is_retryable_error(e) and attempts < MAX_SEND_ATTEMPTS:
+                self._set_status(row["id"], status=PENDING, attempts=attempts, last_error=str(e),
+                                 next_attempt_at=time.time() + backoff_seconds(attempts))
+            else:
+                print(f"Failed to send SMS to participant {row['participant_id']}: {e}")
+                self._set_status(row["id"], status=FAILED, attempts=attempts, last_error=str(e))
+            return
+        self._set_status(row["id"], status=SENT, attempts=attempts, message_id=message_id, last_error=None)
+
+    def drain_once(self) -> int:
+        """Send every message that is due now. Returns the number of send attempts made."""
+        attempted = 0
+        with ThreadPoolExecutor(max_workers=DRAIN_WORKERS) as executor:
+            while not self._stop_event.is_set():
+                rows = self._claim_due()
+                if not rows:
+                    break
+                list(executor.map(self._send, rows))
+                attempted += len(rows)
+        return attempted
+
+    def _next_due_in(self) -> float:
+        with self._lock:
+            row = self._connect().execute("SELECT MIN(next_attempt_at) FROM outbox WHERE status = ?", (PENDING,)).fetchone()
+        if row[0] is None:
+            return IDLE_WAIT_SECONDS
+        return min(IDLE_WAIT_SECONDS, max(0.0, row[0] - time.time()))
+
+    # Background worker
+
+    def start(self) -> None:
+        """Recover interrupted sends and start the background drain worker."""
+        with self._lock:
+            if not self._recovered:
+                recovered = self.recover()
+                if recovered:
+                    print(f"Re-queued {recovered} SMS that were being sent when the app last stopped.")
+                self._recovered = True
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="sms-queue", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.drain_once()
+                wait = self._next_due_in()
+            except Exception as e:
+                print(f"SMS queue drain failed: {e}")
+                wait = IDLE_WAIT_SECONDS
+            self._wake_event.wait(wait)
+            self._wake_event.clear()
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_sms_queue() -> OutboundSMSQueue:
+    """Get the process-wide outbound SMS queue."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = OutboundSMSQueue()
+        return _queue
+
+
+def queue_text_message(participant_id, phone_number: str, message: str, survey: str | None = None,
+                       timeout: float | None = 60) -> tuple[dict, bool]:
+    """Queue one SMS, make sure the drain worker is running and wait for the result row.
+    Returns (row, created); created is False when the same message was already
+    queued or sent today, in which case nothing new is sent."""
+    queue = get_sms_queue()
+    queue.start()
+    row_id, created = queue.enqueue(participant_id, phone_number, message, survey, send_date=study_today())
+    return queue.wait([row_id], timeout=timeout)[0], created
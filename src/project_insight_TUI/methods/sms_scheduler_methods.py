@@ -0,0 +1,234 @@
+"""Send-later scheduling for SMS.
+
+Scheduled messages are stored in SQLite under the cache directory (indexed
+by due time) and mirrored in an in-memory min-heap of (due_at, id). The
+scheduler thread sleeps until the earliest due time (or until an earlier
+message is scheduled), then hands every message due in that same second to
+the outbound SMS queue in one batch. Nothing polls the full table: the heap
+is only rebuilt from the index when the app starts, and messages that came
+due while the app was closed are sent right away.
+"""
+import heapq
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+import pytz
+from ..methods.initialize_methods import get_cache_dir
+from ..methods.sms_methods import STUDY_TIMEZONE
+from ..methods.sms_queue_methods import get_sms_queue
+
+SCHEDULER_FILE_NAME = "sms_schedule.sqlite3"
+
+SCHEDULED = "scheduled"
+DISPATCHED = "dispatched"
+CANCELLED = "cancelled"
+DUPLICATE = "duplicate"  # The same survey was already queued for that participant and day
+
+
+def parse_send_time(text: str) -> float:
+    """Parse "YYYY-MM-DD HH:MM" in the study's time zone into a UNIX timestamp."""
+    naive = datetime.strptime(text.strip(), "%Y-%m-%d %H:%M")
+    return pytz.timezone(STUDY_TIMEZONE).localize(naive).timestamp()
+
+
+def format_send_time(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, pytz.timezone(STUDY_TIMEZONE)).strftime("%Y-%m-%d %H:%M")
+
+
+class SMSScheduler:
+    def __init__(self, path: str | None = None, queue=None) -> None:
+        self.path = path
+        self.queue = queue
+        self._lock = threading.RLock()
+        self._wakeup = threading.Condition(self._lock)
+        self._connection = None
+        self._heap = []
+        self._loaded = False
+        self._stopping = False
+        self._thread = None
+
+    # Storage
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self.path is None:
+                self.path = os.path.join(get_cache_dir(), SCHEDULER_FILE_NAME)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.row_factory = sqlite3.Row
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS scheduled_sms ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, due_at REAL NOT NULL, participant_id TEXT, "
+                "phone_number TEXT NOT NULL, message TEXT NOT NULL, survey TEXT, status TEXT NOT NULL, "
+                "queue_row_id INTEGER, created_at REAL NOT NULL, dispatched_at REAL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS scheduled_sms_due ON scheduled_sms (status, due_at)")
+            self._connection.commit()
+        return self._connection
+
+    def _load(self) -> None:
+        """Rebuild the heap from the scheduled rows (once per process)."""
+        with self._lock:
+            if self._loaded:
+                return
+            cursor = self._connect().execute("SELECT due_at, id FROM scheduled_sms WHERE status = ? ORDER BY due_at",
+                                             (SCHEDULED,))
+            # Rows come back sorted, which is already a valid heap
+            self._heap = [(row["due_at"], row["id"]) for row in cursor]
+            self._loaded = True
+
+    # Scheduling
+
+    def schedule(self, participant_id, phone_number: str, message: str, due_at: float, survey: str | None = None) -> int:
+        """Schedule one SMS for due_at (a UNIX timestamp). Returns its id.
+
+        With a survey id the message shares the (participant, survey, date) key with
+        every other send of that survey; without one each scheduled message is sent."""
+        if due_at < time.time():
+            raise ValueError(f"{format_send_time(due_at)} is in the past. Pick a later send time.")
+        with self._wakeup:
+            self._load()
+            connection = self._connect()
+            cursor = connection.execute(
+                "INSERT INTO scheduled_sms (due_at, participant_id, phone_number, message, survey, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (due_at, str(participant_id), phone_number, message, survey, SCHEDULED, time.time()),
+            )
+            connection.commit()
+            schedule_id = cursor.lastrowid
+            is_earliest = not self._heap or due_at < self._heap[0][0]
+            heapq.heappush(self._heap, (due_at, schedule_id))
+            if is_earliest:
+                self._wakeup.notify_all()
+            return schedule_id
+
+    def cancel(self, schedule_id: int) -> bool:
+        """Cancel a message that has not been sent yet. Its heap entry is skipped when it comes up."""
+        with self._lock:
+            connection = self._connect()
+            cursor = connection.execute("UPDATE scheduled_sms SET status = ? WHERE id = ? AND status = ?",
+                                        (CANCELLED, schedule_id, SCHEDULED))
+            connection.commit()
+            return cursor.rowcount == 1
+
+    def pending(self, limit: int = 200) -> list[dict]:
+        with self._lock:
+            return [dict(row) for row in self._connect().execute(
+                "SELECT * FROM scheduled_sms WHERE status = ? ORDER BY due_at LIMIT ?", (SCHEDULED, limit))]
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM scheduled_sms WHERE status = ?", (SCHEDULED,)).fetchone()[0]
+
+    # Dispatching
+
+    def _pop_due_batch(self, now: float) -> list[tuple[float, int]]:
+        """Pop every heap entry due in the same second as the earliest one, if that second has come."""
+        if not self._heap or self._heap[0][0] > now:
+            return []
+        batch_second = math.floor(self._heap[0][0])
+        batch = []
+        while self._heap and math.floor(self._heap[0][0]) <= batch_second:
+            batch.append(heapq.heappop(self._heap))
+        return batch
+
+    def _dispatch(self, schedule_ids: list[int]) -> int:
+        """Hand a batch to the outbound SMS queue and mark it dispatched in one transaction."""
+        queue = self.queue or get_sms_queue()
+        with self._lock:
+            connection = self._connect()
+            rows = [dict(row) for row in connection.execute(
+                f"SELECT * FROM scheduled_sms WHERE status = ? AND id IN ({', '.join('?' for _ in schedule_ids)})",
+                [SCHEDULED, *schedule_ids])]
+        dispatched = []
+        for row in rows:
+            send_date = datetime.fromtimestamp(row["due_at"], pytz.timezone(STUDY_TIMEZONE)).date()
+            # Messages without a survey get a key of their own, so two scheduled
+            # messages with the same text are both sent. Either way the key makes
+            # a re-dispatch after a crash harmless.
+            queue_row_id, created = queue.enqueue(row["participant_id"], row["phone_number"], row["message"],
+                                                  survey=row["survey"] or f"scheduled-{row['id']}", send_date=send_date)
+            if created or not row["survey"]:
+                status = DISPATCHED
+            else:
+                status = DUPLICATE
+                print(f"Scheduled SMS {row['id']} not sent: survey {row['survey']} was already sent to participant {row['participant_id']} on {send_date}.")
+            dispatched.append((status, queue_row_id, time.time(), row["id"]))
+        with self._lock:
+            connection = self._connect()
+            connection.executemany("UPDATE scheduled_sms SET status = ?, queue_row_id = ?, dispatched_at = ? WHERE id = ?",
+                                   dispatched)
+            connection.commit()
+        return len(dispatched)
+
+    def run_due(self, now: float | None = None) -> int:
+        """Dispatch every message that is due. Returns how many were handed to the queue."""
+        now = time.time() if now is None else now
+        total = 0
+        while True:
+            with self._lock:
+                self._load()
+                batch = self._pop_due_batch(now)
+            if not batch:
+                return total
+            try:
+                total += self._dispatch([schedule_id for _, schedule_id in batch])
+            except Exception:
+                # Put the batch back so it is retried instead of waiting for a restart
+                with self._lock:
+                    for entry in batch:
+                        heapq.heappush(self._heap, entry)
+                raise
+
+    # Background worker
+
+    def start(self) -> None:
+        """Load the schedule and start the scheduler thread (makes sure the SMS queue runs too)."""
+        (self.queue or get_sms_queue()).start()
+        with self._lock:
+            self._load()
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="sms-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._wakeup:
+                if self._stopping:
+                    return
+                # Sleep until the earliest message is due; schedule() wakes us for an earlier one
+                timeout = None if not self._heap else max(0.0, self._heap[0][0] - time.time())
+                if timeout is None or timeout > 0:
+                    self._wakeup.wait(timeout=timeout)
+                    continue
+            try:
+                count = self.run_due()
+                if count:
+                    print(f"Dispatched {count} scheduled SMS.")
+            except Exception as e:
+                print(f"Scheduled SMS dispatch failed: {e}")
+                # Back off briefly so a persistent error does not spin
+                time.sleep(5)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_sms_scheduler() -> SMSScheduler:
+    """Get the process-wide SMS scheduler."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = SMSScheduler()
+        return _scheduler
@@ -0,0 +1,136 @@
+"""SMS segment counting for GSM-7 and UCS-2 messages.
+
+A message made only of GSM-7 characters is billed per 160 characters (153 per
+part once it is split). A single character outside GSM-7, such as a curly
+quote or an emoji, switches the whole message to UCS-2, which fits only 70
+UTF-16 code units (67 per part), so the same text can cost two or three times
+as many segments. transliterate_to_gsm7 replaces the usual offenders with
+GSM-7 look-alikes.
+"""
+import unicodedata
+from dataclasses import dataclass
+from ..methods.initialize_methods import get_config
+
+GSM7_BASIC = set(
+    "@£$¥èéùìòÇ\nØø\rÅåΔ_ΦΓΛΩΠΨΣΘΞ ÆæßÉ !\"#¤%&'()*+,-./0123456789:;<=>?"
+    "¡ABCDEFGHIJKLMNOPQRSTUVWXYZÄÖÑÜ§¿abcdefghijklmnopqrstuvwxyzäöñüà"
+)
+# Extension table characters take an escape plus the character (2 septets)
+GSM7_EXTENDED = set("^{}\\[~]|€\f")
+
+GSM7_SINGLE_SEGMENT = 160
+GSM7_MULTI_SEGMENT = 153
+UCS2_SINGLE_SEGMENT = 70
+UCS2_MULTI_SEGMENT = 67
+
+# US price per outbound SMS segment; override with sms_price_per_segment in the .env file
+DEFAULT_PRICE_PER_SEGMENT = 0.00645
+
+TRANSLITERATIONS = {
+    "‘": "'", "’": "'", "‚": "'", "‛": "'", "′": "'",
+    "“": '"', "”": '"', "„": '"', "‟": '"', "″": '"',
+    "–": "-", "—": "-", "―": "-", "−": "-", "‐": "-", "‑": "-",
+    "…": "...", "•": "-", "·": "-",
+    "\u00a0": " ", "\u2002": " ", "\u2003": " ", "\u2009": " ", "\u200a": " ", "\u202f": " ",
+    "\u200b": "", "\u200c": "", "\u200d": "", "\ufeff": "",
+    "\t": " ", "«": '"', "»": '"', "‹": "'", "›": "'",
+    "©": "(c)", "®": "(R)", "™": "TM", "°": " deg",
+}
+
+
+@dataclass(frozen=True)
+class SegmentInfo:
+    encoding: str          # "GSM-7" or "UCS-2"
+    characters: int        # characters as the user sees them
+    units: int             # septets (GSM-7) or UTF-16 code units (UCS-2)
+    segments: int
+    per_segment: int       # capacity of each segment for this message
+    non_gsm_characters: str  # distinct characters that forced UCS-2
+
+    def summary(self) -> str:
+        text = f"{self.characters} chars, {self.encoding}, {self.segments} segment{'s' if self.segments != 1 else ''}"
+        if self.non_gsm_characters:
+            text += f" (non-GSM: {self.non_gsm_characters})"
+        return text
+
+
+def is_gsm7(text: str) -> bool:
+    return all(character in GSM7_BASIC or character in GSM7_EXTENDED for character in text)
+
+
+def _count_segments(unit_sizes: list[int], single: int, multi: int) -> int:
+    """Count parts, never splitting a character (escape sequence or surrogate pair) across two."""
+    total = sum(unit_sizes)
+    if total == 0:
+        return 0
+    if total <= single:
+        return 1
+    segments = 1
+    used = 0
+    for size in unit_sizes:
+        if used + size > multi:
+            segments += 1
+            used = 0
+        used += size
+    return segments
+
+
+def analyze_message(text: str) -> SegmentInfo:
+    text = text or ""
+    if is_gsm7(text):
+        sizes = [2 if character in GSM7_EXTENDED else 1 for character in text]
+        return SegmentInfo("GSM-7", len(text), sum(sizes),
+                           _count_segments(sizes, GSM7_SINGLE_SEGMENT, GSM7_MULTI_SEGMENT),
+                           GSM7_SINGLE_SEGMENT if sum(sizes) <= GSM7_SINGLE_SEGMENT else GSM7_MULTI_SEGMENT, "")
+
+    sizes = [2 if ord(character) > 0xFFFF else 1 for character in text]
+    non_gsm = "".join(dict.fromkeys(character for character in text
+                                    if character not in GSM7_BASIC and character not in GSM7_EXTENDED))
+    return SegmentInfo("UCS-2", len(text), sum(sizes),
+                       _count_segments(sizes, UCS2_SINGLE_SEGMENT, UCS2_MULTI_SEGMENT),
+                       UCS2_SINGLE_SEGMENT if sum(sizes) <= UCS2_SINGLE_SEGMENT else UCS2_MULTI_SEGMENT, non_gsm)
+
+
+def transliterate_to_gsm7(text: str) -> str:
+    """Replace characters outside GSM-7 with the closest GSM-7 text; anything
+    without a sensible replacement (e.g. emoji) is dropped."""
+    result = []
+    for character in text or "":
+        if character in GSM7_BASIC or character in GSM7_EXTENDED:
+            result.append(character)
+        elif character in TRANSLITERATIONS:
+            result.append(TRANSLITERATIONS[character])
+        else:
+            # Strip accents: "ç" -> "c", "ō" -> "o" (GSM-7 accented letters were kept above)
+            decomposed = unicodedata.normalize("NFKD", character)
+            stripped = "".join(part for part in decomposed if not unicodedata.combining(part))
+            if stripped and is_gsm7(stripped):
+                result.append(stripped)
+    return "".join(result)
+
+
+def price_per_segment() -> float:
+    try:
+        return float(get_config().get("sms_price_per_segment", DEFAULT_PRICE_PER_SEGMENT))
+    except (ValueError, FileNotFoundError):
+        return DEFAULT_PRICE_PER_SEGMENT
+
+
+def project_cohort_cost(messages: list[str]) -> dict:
+    """Projected segments and cost for sending each message in `messages` once
+    (one entry per recipient, since per-participant links change the length)."""
+    total_segments = 0
+    ucs2_messages = 0
+    for message in messages:
+        info = analyze_message(message)
+        total_segments += info.segments
+        ucs2_messages += info.encoding == "UCS-2"
+    gsm7_segments = sum(analyze_message(transliterate_to_gsm7(message)).segments for message in messages) if ucs2_messages else total_segments
+    return {
+        "recipients": len(messages),
+        "segments": total_segments,
+        "cost": total_segments * price_per_segment(),
+        "ucs2_messages": ucs2_messages,
+        "gsm7_segments": gsm7_segments,
+        "gsm7_cost": gsm7_segments * price_per_segment(),
+    }
@@ -0,0 +1,229 @@
+"""Optional per-schedule SNS topics for group messages.
+
+When sns_topic_mode is turned on in the .env file, every schedule type gets an
+SNS topic whose SMS subscriptions are the phone numbers of that schedule's
+active participants. A message for a whole schedule is then one publish to
+the topic instead of one publish per phone number.
+
+The subscriptions we created are recorded in SQLite under the cache
+directory. sync_subscriptions() diffs the roster against that record and
+only calls SNS for the differences; the roster mirror also reports every
+added, edited or deleted participant, and the affected phone numbers are
+re-checked on a background thread.
+"""
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ..methods.initialize_methods import get_cache_dir, get_config
+from ..methods.roster_methods import SCHEDULE_TYPES
+from ..methods.roster_mirror_methods import get_roster_mirror
+from ..methods.session_methods import get_sns_client
+from ..methods.sms_methods import select_recipients, study_today
+
+TOPICS_FILE_NAME = "sns_topics.sqlite3"
+
+
+def topic_mode_enabled() -> bool:
+    return str(get_config().get("sns_topic_mode", "")).strip().lower() in ("1", "true", "yes", "on")
+
+
+def topic_name(schedule_type: str) -> str:
+    """SNS topic name for a schedule, e.g. "<table_name>-early-bird-schedule".
+    The prefix can be changed with sns_topic_prefix in the .env file."""
+    config = get_config()
+    prefix = config.get("sns_topic_prefix") or config.table_name or "project-insight"
+    slug = re.sub(r"[^a-z0-9]+", "-", schedule_type.lower()).strip("-")
+    return re.sub(r"[^A-Za-z0-9_-]", "-", f"{prefix}-{slug}")[:256]
+
+
+def _report_failure(future) -> None:
+    if future.exception() is not None:
+        print(f"Topic subscription update failed: {future.exception()}")
+
+
+def _is_active(row: dict | None, today: str) -> bool:
+    """Whether a mirror row (all text) should be subscribed to its schedule's topic today."""
+    if not row or not row.get("phone_number") or row.get("schedule_type") not in SCHEDULE_TYPES:
+        return False
+    try:
+        if int(row["participant_id"]) >= get_config().test_id_cutoff:
+            return False
+    except (TypeError, ValueError):
+        return False
+    return (row.get("study_start_date") or "9999") <= today <= (row.get("study_end_date") or "")
+
+
+class ScheduleTopics:
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self._lock = threading.RLock()
+        self._connection = None
+        self._topic_arns = {}
+        self._executor = None
+        self._pending_pairs = set()
+
+    # Storage
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self.path is None:
+                self.path = os.path.join(get_cache_dir(), TOPICS_FILE_NAME)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS subscriptions (schedule_type TEXT NOT NULL, phone_number TEXT NOT NULL, "
+                "subscription_arn TEXT NOT NULL, PRIMARY KEY (schedule_type, phone_number))"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def _recorded(self) -> dict:
+        """{(schedule_type, phone_number): subscription_arn} for the subscriptions we made."""
+        with self._lock:
+            cursor = self._connect().execute("SELECT schedule_type, phone_number, subscription_arn FROM subscriptions")
+            return {(schedule_type, phone_number): arn for schedule_type, phone_number, arn in cursor}
+
+    # Topics
+
+    def topic_arn(self, schedule_type: str) -> str:
+        """ARN of the schedule's topic, creating the topic if needed (CreateTopic is idempotent)."""
+        with self._lock:
+            arn = self._topic_arns.get(schedule_type)
+            if arn is None:
+                arn = get_sns_client().create_topic(Name=topic_name(schedule_type))["TopicArn"]
+                self._topic_arns[schedule_type] = arn
+            return arn
+
+    def _subscribe(self, schedule_type: str, phone_number: str) -> None:
+        response = get_sns_client().subscribe(TopicArn=self.topic_arn(schedule_type), Protocol="sms",
+                                              Endpoint=phone_number, ReturnSubscriptionArn=True)
+        with self._lock:
+            connection = self._connect()
+            connection.execute("INSERT OR REPLACE INTO subscriptions VALUES (?, ?, ?)",
+                               (schedule_type, phone_number, response["SubscriptionArn"]))
+            connection.commit()
+
+    def _unsubscribe(self, schedule_type: str, phone_number: str, subscription_arn: str) -> None:
+        sns = get_sns_client()
+        try:
+            sns.unsubscribe(SubscriptionArn=subscription_arn)
+        except sns.exceptions.NotFoundException:
+            pass
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM subscriptions WHERE schedule_type = ? AND phone_number = ?",
+                               (schedule_type, phone_number))
+            connection.commit()
+
+    def reload_from_sns(self) -> None:
+        """Replace the local record with the SMS subscriptions SNS actually has on our topics."""
+        sns = get_sns_client()
+        recorded = []
+        for schedule_type in SCHEDULE_TYPES:
+            paginator = sns.get_paginator("list_subscriptions_by_topic")
+            for page in paginator.paginate(TopicArn=self.topic_arn(schedule_type)):
+                for subscription in page.get("Subscriptions", []):
+                    if subscription.get("Protocol") == "sms" and subscription["SubscriptionArn"].startswith("arn:"):
+                        recorded.append((schedule_type, subscription["Endpoint"], subscription["SubscriptionArn"]))
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM subscriptions")
+            connection.executemany("INSERT OR REPLACE INTO subscriptions VALUES (?, ?, ?)", recorded)
+            connection.commit()
+
+    # Syncing
+
+    def desired_subscriptions(self) -> set:
+        """{(schedule_type, phone_number)} for every active participant."""
+        recipients = select_recipients()
+        return set(recipients.select("schedule_type", "phone_number").iter_rows())
+
+    def sync_subscriptions(self, full: bool = False, schedule_types: list[str] | None = None) -> dict:
+        """Make the topics (all of them, or only schedule_types) match the roster.
+        full=True first re-reads the real subscriptions from SNS instead of
+        trusting the local record. The diff is taken under the lock; the SNS
+        calls are made after releasing it (both are idempotent)."""
+        if full:
+            self.reload_from_sns()
+        desired = self.desired_subscriptions()
+        if schedule_types is not None:
+            desired = {key for key in desired if key[0] in schedule_types}
+        with self._lock:
+            recorded = self._recorded()
+            if schedule_types is not None:
+                recorded = {key: arn for key, arn in recorded.items() if key[0] in schedule_types}
+            to_add = desired - set(recorded)
+            to_remove = {key: arn for key, arn in recorded.items() if key not in desired}
+
+        for schedule_type, phone_number in sorted(to_add):
+            self._subscribe(schedule_type, phone_number)
+        for (schedule_type, phone_number), arn in sorted(to_remove.items()):
+            self._unsubscribe(schedule_type, phone_number, arn)
+        return {"subscribed": len(to_add), "unsubscribed": len(to_remove), "total": len(desired)}
+
+    def _sync_pairs(self, pairs: set) -> None:
+        """Re-check only the given (schedule_type, phone_number) pairs against the roster."""
+        today = study_today().strftime("%Y-%m-%d")
+        active = {(row["schedule_type"], row["phone_number"]) for row in get_roster_mirror().all() if _is_active(row, today)}
+        recorded = self._recorded()
+        for schedule_type, phone_number in pairs:
+            if (schedule_type, phone_number) in active and (schedule_type, phone_number) not in recorded:
+                self._subscribe(schedule_type, phone_number)
+            elif (schedule_type, phone_number) not in active and (schedule_type, phone_number) in recorded:
+                self._unsubscribe(schedule_type, phone_number, recorded[(schedule_type, phone_number)])
+
+    def on_participant_changed(self, old_row: dict | None, new_row: dict | None) -> None:
+        """Roster mirror listener: queue a re-check of the schedule/phone pairs a change touched."""
+        pairs = {(row.get("schedule_type"), row.get("phone_number")) for row in (old_row, new_row)
+                 if row and row.get("schedule_type") in SCHEDULE_TYPES and row.get("phone_number")}
+        if not pairs:
+            return
+        with self._lock:
+            # Changes that arrive while a re-check is queued are folded into it
+            scheduled = bool(self._pending_pairs)
+            self._pending_pairs |= pairs
+            if not scheduled:
+                self._submit(self._sync_pending)
+
+    def _sync_pending(self) -> None:
+        with self._lock:
+            pairs = self._pending_pairs
+            self._pending_pairs = set()
+        self._sync_pairs(pairs)
+
+    def _submit(self, func) -> None:
+        with self._lock:
+            if self._executor is None:
+                # One worker keeps the changes in order
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sns-topics")
+            future = self._executor.submit(func)
+        future.add_done_callback(_report_failure)
+
+    def start(self) -> None:
+        """Follow roster changes and bring the topics in line with the roster."""
+        get_roster_mirror().add_listener(self.on_participant_changed)
+        self._submit(self.sync_subscriptions)
+
+    # Sending
+
+    def publish(self, schedule_type: str, message: str) -> str:
+        """Send one message to every active participant on a schedule. Returns the MessageId.
+        The schedule's subscriptions are synced first, since participants start and finish without a roster edit."""
+        self.sync_subscriptions(schedule_types=[schedule_type])
+        response = get_sns_client().publish(TopicArn=self.topic_arn(schedule_type), Message=message)
+        return response["MessageId"]
+
+
+_topics = None
+_topics_lock = threading.Lock()
+
+
+def get_schedule_topics() -> ScheduleTopics:
+    """Get the process-wide schedule topic manager."""
+    global _topics
+    with _topics_lock:
+        if _topics is None:
+            _topics = ScheduleTopics()
+        return _topics
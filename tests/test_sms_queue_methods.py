@@ -0,0 +1,48 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+from botocore.exceptions import ClientError
+from project_insight_TUI.methods import sms_queue_methods
+from project_insight_TUI.methods.sms_queue_methods import OutboundSMSQueue, TokenBucket, PENDING
+
+
+class NotOptedOut:
+    def is_opted_out(self, phone_number) -> bool:
+        return False
+
+
+class SendRetryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        patcher = mock.patch.object(sms_queue_methods, "get_opt_out_cache", return_value=NotOptedOut())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_queue(self, error: Exception) -> OutboundSMSQueue:
+        def send_function(phone_number, message):
+            raise error
+
+        queue = OutboundSMSQueue(path=os.path.join(self.tmp_dir.name, "queue.sqlite3"), send_function=send_function)
+        queue._bucket = TokenBucket(1000)
+        return queue
+
+    def test_throttled_publish_is_retried(self) -> None:
+        error = ClientError({"Error": {"Code": "Throttled", "Message": "Rate exceeded"},
+                             "ResponseMetadata": {"HTTPStatusCode": 400}}, "Publish")
+        queue = self.make_queue(error)
+        row_id, _ = queue.enqueue("1001", "+15555550100", "Reminder", survey="survey_1", send_date="2026-01-05")
+
+        before = time.time()
+        queue._send(queue.get(row_id))
+
+        row = queue.get(row_id)
+        self.assertEqual(row["status"], PENDING)
+        self.assertEqual(row["attempts"], 1)
+        self.assertGreaterEqual(row["next_attempt_at"], before)
+
+
+if __name__ == "__main__":
+    unittest.main()